@@ -0,0 +1,172 @@
+import queue
+import threading
+import time
+from collections import Counter, namedtuple
+
+from config import SOUND_CONFIG, AUDIO_CHANNELS, AUDIO_MERGE_WINDOW, AUDIO_QUEUE_SIZE
+
+# 一次播放请求：音效名称、请求时间戳（游戏线程的time.perf_counter()）
+SoundEvent = namedtuple('SoundEvent', ['name', 'timestamp'])
+
+
+class NullAudioBackend:
+    """空音频后端：无音频设备（或未安装pygame）时使用，只统计各音效的播放次数"""
+    available = False
+
+    def __init__(self):
+        self.played = Counter()
+
+    def load(self, name, path, volume):
+        return name
+
+    def play(self, sound):
+        self.played[sound] += 1
+
+    def voices(self, sound):
+        return 0
+
+    def close(self):
+        pass
+
+
+class PygameAudioBackend:
+    """pygame混音器后端（只在音频线程中加载和播放）"""
+    available = True
+
+    def __init__(self, channels=AUDIO_CHANNELS):
+        import pygame
+        self.mixer = pygame.mixer
+        self.mixer.init()
+        self.mixer.set_num_channels(channels)
+
+    def load(self, name, path, volume):
+        sound = self.mixer.Sound(path)
+        sound.set_volume(volume)
+        return sound
+
+    def play(self, sound):
+        sound.play()
+
+    def voices(self, sound):
+        """该音效正在播放的声部数"""
+        return sound.get_num_channels()
+
+    def close(self):
+        self.mixer.quit()
+
+
+def create_backend(channels=AUDIO_CHANNELS):
+    """创建pygame音频后端，没有音频设备或未安装pygame时退回空后端"""
+    try:
+        return PygameAudioBackend(channels)
+    except Exception as e:
+        print(f"提示: 音频不可用，已静音 - {e}")
+        return NullAudioBackend()
+
+
+class AudioMixer(threading.Thread):
+    """
+    异步音频线程：游戏循环调用play()只把事件放入有界队列（永不阻塞），
+    音频线程负责在首次播放时加载音效、合并重复事件并按声部上限与冷却时间限流后播放
+    """
+    def __init__(self, backend, paths, sounds=SOUND_CONFIG, merge_window=AUDIO_MERGE_WINDOW,
+                 queue_size=AUDIO_QUEUE_SIZE):
+        """
+        :param backend: 音频后端（PygameAudioBackend或NullAudioBackend）
+        :param paths: 音效文件路径：名称 -> 路径
+        :param sounds: 音效参数：名称 -> {'volume', 'voices', 'cooldown'}
+        :param merge_window: 同一音效的重复事件合并窗口（秒）
+        :param queue_size: 事件队列容量
+        """
+        super().__init__(name='audio', daemon=True)
+        self.backend = backend
+        self.paths = dict(paths)
+        self.config = sounds
+        self.merge_window = merge_window
+        self.sounds = {}                 # 已加载的音效：名称 -> 后端音效对象（加载失败为None）
+        self.last_event = {}             # 各音效最近一次被接受的事件时间戳（用于合并）
+        self.last_played = {}            # 各音效最近一次实际播放的时间（用于冷却）
+        self.played = 0                  # 实际播放次数
+        self.merged = 0                  # 被合并的重复事件数
+        self.throttled = 0               # 因冷却时间未到被跳过的事件数
+        self.voice_limited = 0           # 因达到声部上限被跳过的事件数
+        self.dropped = 0                 # 队列满时丢弃的事件数
+        self._queue = queue.Queue(queue_size)
+        self._stop_event = threading.Event()
+
+    def play(self, name, timestamp=None):
+        """投递一次播放请求（游戏线程调用，队列满时直接丢弃）"""
+        if name not in self.paths:
+            return
+        try:
+            self._queue.put_nowait(SoundEvent(name, time.perf_counter() if timestamp is None else timestamp))
+        except queue.Full:
+            self.dropped += 1
+
+    def run(self):
+        # 音效在首次播放时才在音频线程中解码（不拖慢启动，也不阻塞游戏循环）
+        while not self._stop_event.is_set():
+            try:
+                events = [self._queue.get(timeout=0.1)]
+            except queue.Empty:
+                continue
+            # 取出已到达的全部事件，同一帧内的多次切割一起处理
+            while True:
+                try:
+                    events.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            for event in events:
+                self._handle(event)
+
+    def _handle(self, event):
+        """合并、限流并播放一个事件"""
+        name = event.name
+        last = self.last_event.get(name)
+        if last is not None and 0 <= event.timestamp - last < self.merge_window:
+            self.merged += 1
+            return
+        self.last_event[name] = event.timestamp
+
+        config = self.config.get(name, {})
+        now = time.perf_counter()
+        if now - self.last_played.get(name, -1e9) < config.get('cooldown', 0.0):
+            self.throttled += 1
+            return
+        sound = self._sound(name)
+        if sound is None:
+            return
+        if self.backend.voices(sound) >= config.get('voices', AUDIO_CHANNELS):
+            self.voice_limited += 1
+            return
+        self.backend.play(sound)
+        self.last_played[name] = now
+        self.played += 1
+
+    def _sound(self, name):
+        """获取已加载的音效（首次使用时加载，失败时记为None，不再重试）"""
+        if name not in self.sounds:
+            sound = None
+            try:
+                sound = self.backend.load(name, self.paths[name], self.config.get(name, {}).get('volume', 1.0))
+            except Exception as e:
+                print(f"警告: 音效加载失败 - {e}")
+            self.sounds[name] = sound
+        return self.sounds[name]
+
+    def stop(self, timeout=1.0):
+        """停止音频线程并关闭后端"""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+        self.backend.close()
+
+    def stats(self):
+        return {
+            'backend': type(self.backend).__name__,
+            'played': self.played,
+            'merged': self.merged,
+            'throttled': self.throttled,
+            'voice_limited': self.voice_limited,
+            'dropped': self.dropped,
+        }
@@ -0,0 +1,84 @@
+"""
+透明叠加微基准：对比旧版浮点逐通道混合、定点整数混合与预乘alpha混合（旋转缓存路径）
+使用 assets/*.png 中的真实精灵，校验像素差不超过1并输出耗时
+运行方式（项目根目录）：python benchmarks/bench_composite.py
+"""
+import glob
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import composite_bgra, composite_premultiplied, premultiply  # noqa: E402
+
+
+def legacy_composite(roi, overlay):
+    """旧版混合逻辑（float64归一化 + 逐通道循环）"""
+    alpha = overlay[:, :, 3] / 255.0
+    overlay_rgb = overlay[:, :, :3]
+    alpha_inv = 1.0 - alpha
+    for c in range(3):
+        roi[:, :, c] = (alpha * overlay_rgb[:, :, c] + alpha_inv * roi[:, :, c])
+
+
+def time_it(fn, background, sprite, repeat):
+    h, w = sprite.shape[:2]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(background[100:100 + h, 100:100 + w], sprite)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main(repeat=2000):
+    rng = np.random.default_rng(0)
+    paths = sorted(glob.glob(os.path.join('assets', '*.png')))
+    if not paths:
+        print("未找到 assets/*.png，请在项目根目录运行。")
+        return
+
+    print(f"{'sprite':<20}{'size':>10}{'legacy us':>12}{'fixed us':>12}{'premul us':>12}"
+          f"{'speedup':>10}{'max diff':>10}")
+    total_legacy = total_fixed = total_premul = 0.0
+    for path in paths:
+        sprite = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+        if sprite is None or sprite.ndim != 3 or sprite.shape[2] != 4:
+            continue
+        # 与游戏中一致，先缩放到90像素以内
+        scale = 90 / max(sprite.shape[:2])
+        sprite = cv2.resize(sprite, (int(sprite.shape[1] * scale), int(sprite.shape[0] * scale)),
+                            interpolation=cv2.INTER_AREA)
+        h, w = sprite.shape[:2]
+        background = rng.integers(0, 256, (h + 200, w + 200, 3), dtype=np.uint8)
+
+        premul, alpha_inv = premultiply(sprite)
+
+        def premul_composite(roi, _):
+            composite_premultiplied(roi, premul, alpha_inv)
+
+        # 正确性校验
+        a, b, c = background.copy(), background.copy(), background.copy()
+        legacy_composite(a[100:100 + h, 100:100 + w], sprite)
+        composite_bgra(b[100:100 + h, 100:100 + w], sprite)
+        premul_composite(c[100:100 + h, 100:100 + w], sprite)
+        diff = max(int(np.abs(a.astype(np.int16) - b).max()), int(np.abs(a.astype(np.int16) - c).max()))
+
+        legacy_us = time_it(legacy_composite, background.copy(), sprite, repeat)
+        fixed_us = time_it(composite_bgra, background.copy(), sprite, repeat)
+        premul_us = time_it(premul_composite, background.copy(), sprite, repeat)
+        total_legacy += legacy_us
+        total_fixed += fixed_us
+        total_premul += premul_us
+        print(f"{os.path.basename(path):<20}{f'{w}x{h}':>10}{legacy_us:>12.1f}{fixed_us:>12.1f}{premul_us:>12.1f}"
+              f"{legacy_us / fixed_us:>9.2f}x{diff:>10}")
+        assert diff <= 1, f"{path}: 像素差 {diff} 超过1"
+
+    print(f"{'total':<20}{'':>10}{total_legacy:>12.1f}{total_fixed:>12.1f}{total_premul:>12.1f}"
+          f"{total_legacy / total_fixed:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
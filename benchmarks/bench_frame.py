@@ -0,0 +1,161 @@
+"""
+帧耗时基准：按难度等级和场上实体数量运行脚本化对局，统计各阶段耗时分位数
+阶段：simulate（固定步模拟）、collide（切割检测与回收）、sprites（水果/碎片合成）、
+particles（粒子）、hud（得分/生命/连击）、tutorial（教程界面）
+不需要摄像头和窗口，指尖使用合成轨迹；结果保存为JSON，便于跨提交对比
+
+运行方式（项目根目录）：
+    python benchmarks/bench_frame.py
+    python benchmarks/bench_frame.py --tiers 0 5 10 --entities 10 30 60 --frames 300
+    python benchmarks/bench_frame.py --compare benchmarks/results/frame_<旧提交>.json
+    python benchmarks/bench_frame.py --render-scale 0.5
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import WIDTH, HEIGHT, SIM_HZ, OUTPUT_SIZE, RENDER_SCALE  # noqa: E402
+from engine import GameEngine, PLAYING  # noqa: E402
+from headless import synthetic_inputs  # noqa: E402
+from resources import ResourceManager, render_size  # noqa: E402
+import ui  # noqa: E402
+
+STAGES = ('simulate', 'collide', 'sprites', 'particles', 'hud', 'tutorial')
+
+
+def top_up(engine, count, rng):
+    """补充对象，使场上至少有count个对象（随机分布在屏幕内）"""
+    while len(engine.objects) < count:
+        obj = engine.spawn()
+        obj.x = rng.uniform(60, WIDTH - 60)
+        obj.y = rng.uniform(60, HEIGHT - 60)
+        obj.speed_y = rng.uniform(-12, 0)
+        obj.save_previous()
+
+
+def run_scenario(R, tier, entities, frames, seed=0):
+    """运行一个场景，返回各阶段每帧耗时（毫秒）"""
+    engine = GameEngine(R, seed=seed)
+    engine.game_state = PLAYING
+    engine.spawner.seek(tier * engine.spawner.table.level_interval)
+    rng = random.Random(seed)
+    inputs = synthetic_inputs(seed, start_key=None)
+    samples = {stage: [] for stage in STAGES}
+    # 教程界面与游戏中一样使用缓存图层：图层在计时前生成，之后每帧只测一次混合
+    def draw_tutorial(f):
+        return ui.draw_tutorial(f, R)
+    menu_frame = R.background.copy()
+    engine.layers.composite(menu_frame, ('tutorial',), draw_tutorial)
+
+    for n in range(frames):
+        top_up(engine, entities, rng)
+        for player in engine.players:
+            player.lives = 3  # 保持对局进行
+        engine.feed(next(inputs).tip, n / SIM_HZ)
+        frame = R.background.copy()
+        np.copyto(menu_frame, R.background)
+
+        t0 = time.perf_counter()
+        engine.step()
+        t1 = time.perf_counter()
+        engine.collide([p.take_blade() for p in engine.players])
+        engine.compact()
+        t2 = time.perf_counter()
+        for obj in engine.objects:
+            obj.draw(frame, R)
+        for d in engine.debris:
+            d.draw(frame, R)
+        t3 = time.perf_counter()
+        engine.particles.draw(frame, 1.0, R.scale)
+        t4 = time.perf_counter()
+        engine.draw_overlay(frame)
+        t5 = time.perf_counter()
+        engine.layers.composite(menu_frame, ('tutorial',), draw_tutorial)
+        t6 = time.perf_counter()
+
+        for stage, (a, b) in zip(STAGES, ((t0, t1), (t1, t2), (t2, t3), (t3, t4), (t4, t5), (t5, t6))):
+            samples[stage].append((b - a) * 1000)
+    return samples
+
+
+def summarize(values):
+    arr = np.asarray(values)
+    return {
+        'mean': float(arr.mean()),
+        'p50': float(np.percentile(arr, 50)),
+        'p95': float(np.percentile(arr, 95)),
+        'p99': float(np.percentile(arr, 99)),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(current, baseline_path):
+    """按场景和阶段对比p95耗时"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    base = {(s['tier'], s['entities']): s for s in baseline['scenarios']}
+    print(f"\n对比基线 {baseline.get('commit')}（p95，毫秒）")
+    for scenario in current['scenarios']:
+        old = base.get((scenario['tier'], scenario['entities']))
+        if old is None:
+            continue
+        parts = []
+        for stage in STAGES + ('total',):
+            a, b = old['stages'][stage]['p95'], scenario['stages'][stage]['p95']
+            parts.append(f"{stage} {a:.2f}->{b:.2f}")
+        print(f"tier={scenario['tier']:<3} entities={scenario['entities']:<4} " + '  '.join(parts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='帧耗时基准')
+    parser.add_argument('--tiers', type=int, nargs='+', default=[0, 3, 6, 10], help='难度等级')
+    parser.add_argument('--entities', type=int, nargs='+', default=[5, 20, 40], help='场上最少对象数')
+    parser.add_argument('--frames', type=int, default=300, help='每个场景运行的帧数')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='结果JSON路径（默认benchmarks/results/frame_<commit>.json）')
+    parser.add_argument('--compare', help='与之前保存的结果JSON对比')
+    parser.add_argument('--render-scale', type=float, default=RENDER_SCALE, help='内部渲染缩放（相对输出分辨率）')
+    args = parser.parse_args()
+
+    R = ResourceManager(audio=False, size=render_size(OUTPUT_SIZE, args.render_scale))
+    commit = git_commit()
+    result = {'commit': commit, 'timestamp': time.time(), 'frames': args.frames, 'seed': args.seed,
+              'render_size': list(R.size), 'scenarios': []}
+
+    print(f"{'tier':>4}{'ents':>6}" + ''.join(f'{s:>11}' for s in STAGES) + f"{'total':>11}   (p50/p95 ms)")
+    for tier in args.tiers:
+        for entities in args.entities:
+            samples = run_scenario(R, tier, entities, args.frames, args.seed)
+            samples['total'] = [sum(v) for v in zip(*(samples[s] for s in STAGES))]
+            stages = {stage: summarize(values) for stage, values in samples.items()}
+            result['scenarios'].append({'tier': tier, 'entities': entities, 'stages': stages})
+            print(f"{tier:>4}{entities:>6}" + ''.join(
+                f"{stages[s]['p50']:>5.2f}/{stages[s]['p95']:<5.2f}" for s in STAGES + ('total',)))
+
+    output = args.output or os.path.join('benchmarks', 'results', f'frame_{commit}.json')
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+    print(f"结果已保存到 {output}")
+
+    if args.compare:
+        compare(result, args.compare)
+
+
+if __name__ == '__main__':
+    main()
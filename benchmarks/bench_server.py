@@ -0,0 +1,90 @@
+"""
+多会话服务扩展性基准：工作进程数从1增加到CPU核数，每个进程承载相同数量的机器人会话，
+统计整体每秒模拟步数与并行效率（相对单进程吞吐乘以进程数），确认吞吐随核数接近线性增长
+结果保存为JSON，便于跨提交、跨机器对比
+
+运行方式（项目根目录）：
+    python benchmarks/bench_server.py
+    python benchmarks/bench_server.py --workers 1 2 4 8 --per-worker 4 --seconds 60
+    python benchmarks/bench_server.py --render --min-efficiency 0.7
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server import run_bots  # noqa: E402
+from bench_frame import git_commit  # noqa: E402
+
+
+def default_workers():
+    """1、2、4……直到CPU核数"""
+    cores = os.cpu_count() or 1
+    counts = []
+    n = 1
+    while n < cores:
+        counts.append(n)
+        n *= 2
+    return counts + [cores]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='多会话服务扩展性基准')
+    parser.add_argument('--workers', type=int, nargs='+', default=default_workers(), help='工作进程数')
+    parser.add_argument('--per-worker', type=int, default=4, help='每个工作进程承载的会话数')
+    parser.add_argument('--seconds', type=float, default=60.0, help='每个会话运行的模拟时长（秒）')
+    parser.add_argument('--batch', type=int, default=8, help='每次批量下发的帧数')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--render', action='store_true', help='工作进程中同时绘制画面（需要assets）')
+    parser.add_argument('--min-efficiency', type=float, default=0.8,
+                        help='进程数不超过CPU核数时要求的最低并行效率，低于该值时返回非零退出码')
+    parser.add_argument('--output', help='结果JSON路径（默认benchmarks/results/server_<commit>.json）')
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    # 只有1个核时只能和单进程自身比较，效率恒为100%，结果没有意义
+    if cores < 2:
+        print(f"错误: 扩展性基准需要至少2个CPU核（当前{cores}个），无法比较并行效率")
+        sys.exit(2)
+    if not any(1 < workers <= cores for workers in args.workers):
+        print(f"错误: 进程数 {args.workers} 中没有2~{cores}之间的值，无法比较并行效率")
+        sys.exit(2)
+    commit = git_commit()
+    result = {'commit': commit, 'timestamp': time.time(), 'cores': cores, 'per_worker': args.per_worker,
+              'seconds': args.seconds, 'batch': args.batch, 'render': args.render, 'runs': []}
+
+    print(f"{'workers':>7}{'sessions':>9}{'steps/s':>11}{'per session':>13}{'efficiency':>12}")
+    baseline = None
+    failed = False
+    for workers in args.workers:
+        sessions = workers * args.per_worker
+        metrics = run_bots(sessions, workers, args.seconds, args.batch, args.seed, render=args.render)
+        throughput = metrics['steps_per_sec']
+        per_session = sum(m['steps_per_sec'] for m in metrics['sessions'].values()) / sessions
+        if baseline is None:
+            baseline = throughput / workers
+        efficiency = throughput / (baseline * workers)
+        if workers <= cores and efficiency < args.min_efficiency:
+            failed = True
+        result['runs'].append({'workers': workers, 'sessions': sessions, 'steps': metrics['steps'],
+                               'wall': metrics['wall'], 'steps_per_sec': throughput,
+                               'session_steps_per_sec': per_session, 'efficiency': efficiency})
+        print(f"{workers:>7}{sessions:>9}{throughput:>11.0f}{per_session:>13.0f}{efficiency:>11.0%}"
+              + ('' if workers <= cores else '  (超过CPU核数)'))
+
+    output = args.output or os.path.join('benchmarks', 'results', f'server_{commit}.json')
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+    print(f"结果已保存到 {output}")
+
+    if failed:
+        print(f"并行效率低于 {args.min_efficiency:.0%}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+import time
+
+from config import SIM_HZ, MAX_SIM_STEPS
+
+
+class SimulationClock:
+    """固定步长模拟时钟：累加真实流逝时间，按固定步长推进物理与计时"""
+    def __init__(self, hz=SIM_HZ, max_steps=MAX_SIM_STEPS):
+        self.step = 1.0 / hz          # 每个模拟步的时长（秒）
+        self.max_steps = max_steps    # 单帧最多补算的步数（避免卡顿后雪崩）
+        self.reset()
+
+    def reset(self):
+        """重置累加器与模拟时间"""
+        self.accumulator = 0.0
+        self.time = 0.0               # 已模拟的总时长（秒）
+        self.alpha = 0.0              # 渲染插值系数（0~1，当前状态在两步之间的位置）
+        self._last = None
+
+    def tick(self, now=None):
+        """
+        推进时钟，返回本帧需要执行的模拟步数
+        :param now: 当前时间（秒），默认使用time.perf_counter()
+        """
+        now = time.perf_counter() if now is None else now
+        if self._last is None:
+            self._last = now
+        self.accumulator += now - self._last
+        self._last = now
+
+        steps = int(self.accumulator / self.step)
+        if steps > self.max_steps:
+            # 卡顿过久时丢弃多余时间，而不是一次补算过多步
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.step
+        self.time += steps * self.step
+        self.alpha = self.accumulator / self.step
+        return steps
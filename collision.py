@@ -0,0 +1,120 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+# 一次切割命中：对象下标、刀光线段下标、命中时间戳、命中点坐标、刀刃（玩家）下标
+SliceHit = namedtuple('SliceHit', ['index', 'segment', 'time', 'x', 'y', 'blade'], defaults=(0,))
+
+
+class UniformGrid:
+    """均匀网格宽阶段：把圆形包围盒登记到覆盖的格子，按线段包围盒查询候选对象"""
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def build(self, xs, ys, radii):
+        """根据对象圆心与半径重建网格"""
+        self.cells = {}
+        cs = self.cell_size
+        gx0 = np.floor((xs - radii) / cs).astype(int)
+        gy0 = np.floor((ys - radii) / cs).astype(int)
+        gx1 = np.floor((xs + radii) / cs).astype(int)
+        gy1 = np.floor((ys + radii) / cs).astype(int)
+        for i in range(len(xs)):
+            for gx in range(gx0[i], gx1[i] + 1):
+                for gy in range(gy0[i], gy1[i] + 1):
+                    self.cells.setdefault((gx, gy), []).append(i)
+
+    def query(self, x0, y0, x1, y1):
+        """返回与矩形[x0,x1]x[y0,y1]覆盖格子相交的候选对象下标"""
+        cs = self.cell_size
+        found = set()
+        for gx in range(math.floor(x0 / cs), math.floor(x1 / cs) + 1):
+            for gy in range(math.floor(y0 / cs), math.floor(y1 / cs) + 1):
+                found.update(self.cells.get((gx, gy), ()))
+        return found
+
+
+def segment_circle(ax, ay, bx, by, cx, cy, r):
+    """
+    胶囊-圆形窄阶段检测（线段ab与圆心c的最近距离是否小于r）
+    支持对多个圆批量计算
+    :return: (是否命中的布尔数组, 最近点在线段上的参数u∈[0,1])
+    """
+    dx, dy = bx - ax, by - ay
+    length_sq = dx * dx + dy * dy
+    if length_sq > 0:
+        u = np.clip(((cx - ax) * dx + (cy - ay) * dy) / length_sq, 0.0, 1.0)
+    else:
+        # 退化为一个点（两次采样之间手指未移动）
+        u = np.zeros_like(np.asarray(cx, dtype=np.float64))
+    px = ax + u * dx
+    py = ay + u * dy
+    return (cx - px) ** 2 + (cy - py) ** 2 < r * r, u
+
+
+def find_slices(points, times, xs, ys, radii, active=None, blade_radius=0.0, grid=None):
+    """
+    用刀光折线的每条线段对所有对象做扫掠检测，一次返回本轮全部命中
+    :param points: 刀光折线顶点，形状(M, 2)；只有一个点时按单点检测
+    :param times: 每个顶点的采样时间戳，形状(M,)
+    :param xs: 对象圆心x坐标数组
+    :param ys: 对象圆心y坐标数组
+    :param radii: 对象碰撞半径数组
+    :param active: 对象活跃掩码（可选，非活跃对象不参与检测）
+    :param blade_radius: 刀刃半径（胶囊半径）
+    :param grid: 复用的UniformGrid实例（可选）
+    :return: 按命中时间排序的SliceHit列表，每个对象最多命中一次
+    """
+    return find_blade_slices([(points, times)], xs, ys, radii, active, blade_radius, grid)
+
+
+def find_blade_slices(blades, xs, ys, radii, active=None, blade_radius=0.0, grid=None):
+    """
+    多把刀刃一次批量检测：所有刀光线段共用一次网格构建，耗时随刀光线段总数线性增长
+    :param blades: 每把刀刃的(顶点, 时间戳)，顶点为空的刀刃不参与检测
+    :return: 按命中时间排序的SliceHit列表（blade为刀刃下标），每个对象只记录最早的命中
+    """
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    radii = np.asarray(radii, dtype=np.float64) + blade_radius
+    if len(xs) == 0 or not any(len(points) for points, _ in blades):
+        return []
+
+    candidates_mask = radii > blade_radius
+    if active is not None:
+        candidates_mask &= np.asarray(active, dtype=bool)
+
+    grid = grid if grid is not None else UniformGrid()
+    live = np.flatnonzero(candidates_mask)
+    grid.build(xs[live], ys[live], radii[live])
+
+    hits = {}
+    for blade, (points, times) in enumerate(blades):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if len(points) == 0:
+            continue
+        # 只有一个顶点时视为长度为0的线段
+        if len(points) == 1:
+            points = np.vstack([points, points])
+            times = [times[0], times[0]]
+
+        for seg in range(len(points) - 1):
+            (ax, ay), (bx, by) = points[seg], points[seg + 1]
+            found = grid.query(min(ax, bx), min(ay, by), max(ax, bx), max(ay, by))
+            if not found:
+                continue
+            local = np.fromiter(found, dtype=int, count=len(found))
+            idx = live[local]
+            mask, u = segment_circle(ax, ay, bx, by, xs[idx], ys[idx], radii[idx])
+            t0, t1 = times[seg], times[seg + 1]
+            for i, ui in zip(idx[mask], u[mask]):
+                i = int(i)
+                t = float(t0 + (t1 - t0) * ui)
+                # 同一对象只记录最早的命中（多把刀刃同时命中时归属最先切到的一把）
+                if i in hits and hits[i].time <= t:
+                    continue
+                hits[i] = SliceHit(i, seg, t, float(ax + (bx - ax) * ui), float(ay + (by - ay) * ui), blade)
+
+    return sorted(hits.values(), key=lambda hit: hit.time)
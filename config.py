@@ -1,7 +1,76 @@
-# 屏幕与物理配置
+# 屏幕与物理配置（WIDTH/HEIGHT为逻辑分辨率：模拟、生成范围和界面布局都使用该坐标系）
 WIDTH, HEIGHT = 1280, 720
 GRAVITY = 0.25
 
+# 窗口输出分辨率（可任意设置，画面最终一次缩放到该尺寸；宽高比与逻辑分辨率不同时保持比例并补黑边）
+OUTPUT_SIZE = (1280, 720)
+# 内部渲染缩放（相对输出分辨率，例如0.5表示以一半分辨率合成，最后一次放大输出）
+RENDER_SCALE = 1.0
+# 摄像头采集分辨率、手部追踪输入分辨率（较小的输入可降低推理开销）
+CAMERA_SIZE = (1280, 720)
+INFERENCE_SIZE = (640, 360)
+
+# 资源加载：并行解码的线程数（None表示按CPU核数），预处理精灵的磁盘缓存目录（None表示不使用缓存）
+ASSET_WORKERS = None
+ASSET_CACHE_DIR = '.asset_cache'
+
+# 玩家数量：每只手对应一把刀刃和一名玩家（各自的刀光、得分、连击和生命值），按屏幕左右区域分配
+# 双人展台设为2；手部追踪最多检测的手数与玩家数相同
+PLAYERS = 1
+# 各玩家的刀光颜色（BGR）
+PLAYER_COLORS = [(255, 255, 255), (80, 200, 255), (120, 255, 120), (255, 120, 255)]
+
+# 刀光：环形缓冲区容量（采样点数）、采样点保留时长（秒，超过后淡出消失）、头部最大半宽（逻辑像素）、
+# 每段Catmull-Rom平滑插值的点数（1表示不平滑）
+TRAIL_CAPACITY = 32
+TRAIL_MAX_AGE = 0.3
+TRAIL_WIDTH = 12
+TRAIL_SMOOTHING = 4
+
+# 手部追踪推理调度：推理频率随指尖速度在最低与最高频率之间自适应，跳过的帧用常速度预测补齐
+TRACKING_MIN_HZ = 10          # 指尖静止或未检测到手时的推理频率
+TRACKING_MAX_HZ = 30          # 快速挥动时的推理频率（每个实例的推理预算上限）
+TRACKING_FAST_SPEED = 1500    # 达到最高推理频率的指尖速度（逻辑像素/秒）
+TRACKING_ROI_SCALE = 0.5      # 锁定手部后ROI裁剪区域的边长（相对摄像头画面高度）
+TRACKING_ROI_INPUT = 256      # ROI送入MediaPipe前缩放到的边长（像素）
+TRACKING_REDETECT = 1.0       # 锁定期间每隔多少秒做一次全帧检测（发现新出现的手）
+TRACKING_MAX_PREDICT = 0.15   # 预测指尖最多外推的时长（秒），超过后不再发布预测点
+
+# 音效：游戏循环只投递播放事件，由独立音频线程合并、限流后播放
+# 每个音效的音量、最多同时播放的声部数、两次播放的最小间隔（秒）
+SOUND_CONFIG = {
+    'slice': {'volume': 0.6, 'voices': 3, 'cooldown': 0.05},
+    'bomb': {'volume': 1.0, 'voices': 1, 'cooldown': 0.25},
+}
+AUDIO_CHANNELS = 8            # 混音器声道总数
+AUDIO_MERGE_WINDOW = 1 / 30   # 同一音效在该时间窗口内的重复事件合并为一次播放（秒）
+AUDIO_QUEUE_SIZE = 64         # 事件队列容量，队列满时丢弃新事件（游戏循环永不阻塞）
+
+# 渲染循环目标帧率（菜单、暂停、结算等静止界面使用较低帧率以节省CPU）
+RENDER_FPS = 60
+IDLE_FPS = 20
+# 固定步长模拟频率（物理参数按每秒30步设计）与单帧最多补算步数
+SIM_HZ = 30
+MAX_SIM_STEPS = 5
+
+# 性能分析：是否默认开启（游戏中按F键切换）、退出时导出的Chrome trace路径（None表示不导出）
+PROFILE = False
+PROFILE_TRACE = None
+
+# 录制：输出路径前缀（None表示不录制），生成<前缀>.mp4画面与<前缀>.jsonl输入/事件日志（可按任意分辨率重新渲染）
+RECORD_PATH = None
+RECORD_FPS = 30               # 录制帧率（渲染帧率更高时按时间间隔抽帧）
+RECORD_SIZE = None            # 录制分辨率（None表示与窗口输出分辨率相同）
+RECORD_BUFFERS = 8            # 预分配的帧缓冲数量（编码跟不上时的最大积压帧数）
+RECORD_DROP = 'newest'        # 缓冲用尽时的丢帧策略：'newest'丢弃新帧，'oldest'覆盖最早的待编码帧
+RECORD_FOURCC = 'mp4v'        # 视频编码器
+
+# 旋转精灵缓存配置（角度量化步长/缓存上限，None表示按已加载精灵数×每个精灵的量化角度数，全部角度都能常驻）
+ROTATION_STEP = 5
+ROTATION_CACHE_SIZE = None
+# 文字/HUD贴图缓存上限（每个不同的文字、字号、颜色、线宽组合一个贴图）
+TEXT_CACHE_SIZE = 256
+
 # 颜色配置
 PALETTE = {
     'text': (240, 240, 240),
@@ -12,11 +81,46 @@ PALETTE = {
     'combo_text': (0, 255, 255)
 }
 
+# 粒子系统：全局粒子上限（预分配容量）与单种特效的粒子上限，超出时优先淘汰最早喷发的粒子
+PARTICLE_BUDGET = 512
+PARTICLE_EFFECT_BUDGET = 160
+# 默认切割粒子喷发参数：数量、生命周期（模拟步）、初始尺寸范围（像素）、最大速度（像素/步）
+# FRUIT_CONFIG中可以用'particles'覆盖其中任意几项
+PARTICLE_EMITTER = {'count': 10, 'life': 10, 'size': (4, 10), 'speed': 10}
+
 # 水果配置清单
 FRUIT_CONFIG = {
     'apple': {'scale': 70, 'score': 1, 'color': (50, 200, 50), 'label': 'Apple'},
     'banana': {'scale': 75, 'score': 2, 'color': (150, 230, 255), 'label': 'Banana'},
     'peach': {'scale': 70, 'score': 3, 'color': (150, 150, 255), 'label': 'Peach'},
-    'watermelon': {'scale': 90, 'score': 4, 'color': (50, 200, 50), 'label': 'Melon'},
-    'strawberry': {'scale': 50, 'score': 5, 'color': (50, 50, 200), 'label': 'Berry'},
-}
\ No newline at end of file
+    'watermelon': {'scale': 90, 'score': 4, 'color': (50, 200, 50), 'label': 'Melon',
+                   'particles': {'count': 16, 'life': 12}},
+    'strawberry': {'scale': 50, 'score': 5, 'color': (50, 50, 200), 'label': 'Berry',
+                   'particles': {'count': 8, 'size': (3, 7)}},
+}
+
+# 生成配置（由spawner.SpawnTable编译为查找表，SpawnScheduler按模拟时间调度）
+# 难度曲线为分段线性关键点[(难度等级, 值), ...]，超出最后一个关键点后保持不变；难度每level_interval秒提升一级
+SPAWN_CONFIG = {
+    'level_interval': 10.0,                      # 每级难度的持续时间（秒）
+    'max_entities': 24,                          # 场上水果/炸弹的数量上限（达到上限时跳过本次生成）
+    'interval': [(0, 35 / 30), (12.5, 10 / 30)],  # 两次生成的间隔（秒）
+    'speed_bonus': [(0, 0), (10, 5)],            # 额外上抛速度（像素/步）
+    'burst_chance': [(0, 0), (12, 0.6)],         # 一次生成改为按连发模式生成的概率
+    'bomb_chance': 0.15,                         # 生成炸弹的概率（其余按水果权重分配，水果默认权重1）
+    'x_margin': 100,                             # 生成位置距屏幕左右边缘的距离
+    'launch_speed': (18, 24),                    # 上抛速度范围（像素/步）
+    'drift_speed': (3, 6),                       # 水平速度范围（像素/步，方向随机）
+    'spin': (-8, 8, -5, 5),                      # 可选的旋转速度（度/步）
+}
+# 连发模式：每次生成相对本次生成时间的偏移（秒），值为出现权重
+SPAWN_BURSTS = {
+    'pair': {'offsets': (0.0, 0.0), 'weight': 1.0},          # 同时生成两个
+    'volley': {'offsets': (0.0, 0.12, 0.24), 'weight': 0.0},  # 快速连续三个（默认只在水果雨阶段出现）
+}
+# 波次：按顺序循环，每个波次可覆盖生成间隔倍率、炸弹概率、水果权重（weights）、连发概率倍率与连发模式权重（bursts）
+SPAWN_WAVES = [
+    {'name': 'normal', 'duration': 50.0},
+    {'name': 'fruit_rain', 'duration': 8.0, 'interval': 0.5, 'bomb_chance': 0.0, 'burst_chance': 1.5,
+     'bursts': {'pair': 1.0, 'volley': 2.0}},
+]
@@ -0,0 +1,458 @@
+import math
+import random
+
+import numpy as np
+
+from config import WIDTH, FRUIT_CONFIG, SIM_HZ, PLAYERS, PLAYER_COLORS
+from entities import GameObject
+from entity_pool import EntityPool
+from particles import ParticleSystem
+from spawner import SpawnScheduler
+from trail import BladeTrail
+from collision import find_blade_slices
+from profiler import NULL_PROFILER
+from layers import LayerCache
+from renderer import NULL_DIRTY
+import ui
+
+# 游戏状态定义: 0=菜单, 1=游戏中, 2=游戏结束, 3=倒计时, 4=暂停
+MENU, PLAYING, GAME_OVER, COUNTDOWN, PAUSED = 0, 1, 2, 3, 4
+
+COMBO_TIMEOUT = 2.5   # 连击超时时间（秒）
+
+
+# 空刀光（没有指尖或玩家已出局）
+NO_BLADE = np.zeros((0, 3))
+
+
+def _pressed(key, *chars):
+    """判断按键码是否为指定字符之一"""
+    return key in [ord(c) for c in chars]
+
+
+class Player:
+    """玩家：一把刀刃（指尖与刀光轨迹）以及各自的得分、生命值和连击状态"""
+    def __init__(self, index, region=(0, WIDTH)):
+        """
+        :param index: 玩家下标
+        :param region: 玩家所在的屏幕区域(x0, x1)（逻辑坐标），用于分配检测到的手和布局HUD
+        """
+        self.index = index
+        self.region = region
+        self.color = PLAYER_COLORS[index % len(PLAYER_COLORS)]  # 刀光颜色
+        self.trail = BladeTrail()  # 手指追踪轨迹（刀光），带时间戳的采样点环形缓冲区
+        self.tip = None            # 当前食指指尖坐标
+        self.now = None            # 最近一次输入的时间（与采样时间戳同一时间基准，用于刀光淡出）
+        self.last_slice_check = -math.inf  # 已做过切割检测的最新采样时间戳
+        self.reset()
+
+    def reset(self):
+        """重置得分、生命值与连击"""
+        self.score = 0                     # 得分
+        self.lives = 3                     # 生命值（切到炸弹扣血）
+        self.combo_count = 0               # 连击数
+        self.last_slice_step = -math.inf   # 上一次切割时的游戏步数（GameEngine.play_steps）
+        self.combo_display_timer = 0       # 连击文字剩余显示步数
+
+    @property
+    def alive(self):
+        """是否还有生命值（生命值耗尽的玩家不再参与切割）"""
+        return self.lives > 0
+
+    def feed(self, tip, timestamp=None, now=None):
+        """
+        输入当前指尖位置
+        :param tip: 食指指尖坐标(x, y)，未检测到手时为None
+        :param timestamp: 采样时间戳，只有比轨迹中最新点更新的采样才会加入轨迹
+        :param now: 当前时间（默认为采样时间戳），早于now - TRAIL_MAX_AGE的轨迹点过期
+        """
+        self.tip = tip
+        if tip is not None:
+            self.trail.add(tip[0], tip[1], timestamp)
+        now = timestamp if now is None else now
+        if now is not None:
+            self.now = now
+            self.trail.expire(now)
+
+    def take_blade(self):
+        """
+        取出本帧参与切割检测的刀光折线：上次检测之后的新采样点（连同前一个点组成线段），
+        没有新采样时退化为当前指尖单点
+        :return: (n, 3)数组，每行为(x, y, 采样时间戳)
+        """
+        if not self.tip or not len(self.trail):
+            return NO_BLADE
+        blade = self.trail.since(self.last_slice_check)
+        self.last_slice_check = blade[-1, 2]
+        return blade
+
+
+class GameEngine:
+    """
+    游戏引擎：持有全部游戏状态（实体、玩家、状态机）
+    逻辑更新与绘制分离，不依赖摄像头、MediaPipe和窗口，可无界面运行
+    """
+    def __init__(self, resources=None, seed=None, profiler=None, players=PLAYERS):
+        """
+        :param resources: 资源管理器（为None时不播放音效，也不能调用draw）
+        :param seed: 随机种子（相同种子+相同输入=相同结果）
+        :param profiler: 分阶段耗时分析器（默认不记录）
+        :param players: 玩家（刀刃）数量，屏幕按玩家数等分为左右区域
+        """
+        self.R = resources
+        self.seed = random.randrange(1 << 32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.profiler = profiler or NULL_PROFILER
+        # 菜单/暂停/倒计时/结算等静态界面的预渲染图层
+        self.layers = LayerCache()
+
+        # 实体池：水果/炸弹与碎片共用一个池，每个模拟步批量更新
+        self.object_pool = EntityPool()
+        # 切割特效粒子：固定容量、有上限的粒子系统（批量更新与绘制）
+        self.particles = ParticleSystem()
+        # 生成调度：按配置的波次、难度曲线与连发模式生成水果/炸弹（独立的随机序列，可按种子预生成时间线）
+        self.spawner = SpawnScheduler(self.seed)
+
+        # 游戏对象列表管理（元素是实体池槽位的视图）
+        self.objects = []          # 活跃的水果/炸弹对象
+        self.debris = []           # 被切开的半果碎片
+        # 玩家列表：每名玩家一把刀刃，各自的得分、生命值与连击
+        self.players = [Player(i, (WIDTH * i / players, WIDTH * (i + 1) / players)) for i in range(players)]
+
+        self.game_state = MENU
+        self.running = True        # 为False时表示玩家选择退出
+        self.time = 0.0            # 已模拟的总时长（秒，包括菜单、暂停等状态）
+        self.play_steps = 0        # 游戏中实际执行的模拟步数（暂停等状态下不增加，用于连击超时）
+        self.flash = False         # 本帧是否切到炸弹（绘制红色闪屏）
+        self.events = []           # 本帧发生的游戏事件（切割、状态切换），供录制日志使用
+        self._hud_key = None       # 画布上当前HUD对应的(得分, 生命值, 连击数)，用于只在变化时重绘
+
+        # 游戏核心数据
+        self.rounds = 0            # 已开始的局数（每局的生成序列不同）
+        self.countdown_timer = 0   # 倒计时剩余模拟步数
+
+    @property
+    def score(self):
+        """全部玩家的总得分"""
+        return sum(p.score for p in self.players)
+
+    @property
+    def lives(self):
+        """全部玩家剩余的生命值之和（为0时游戏结束）"""
+        return sum(p.lives for p in self.players)
+
+    # ==================== 输入 ====================
+    def feed(self, tip, timestamp=None, player=0, now=None):
+        """
+        输入一名玩家当前的指尖位置
+        :param tip: 食指指尖坐标(x, y)，未检测到手时为None
+        :param timestamp: 采样时间戳，只有比轨迹中最新点更新的采样才会加入轨迹
+        :param player: 玩家下标
+        :param now: 当前时间（默认为采样时间戳），用于淘汰过期的刀光轨迹点
+        """
+        self.players[player].feed(tip, timestamp, now)
+
+    def feed_hands(self, tips, timestamp=None, now=None):
+        """
+        输入本帧检测到的全部指尖，按所在屏幕区域分配给玩家
+        同一区域出现多只手时，保留离该玩家上一个指尖最近的一只；没有手的玩家输入None
+        :param now: 当前时间（默认为采样时间戳），没有检测到手时也应传入，刀光才会按时间淡出
+        """
+        players = self.players
+        if len(players) == 1:
+            players[0].feed(tips[0] if tips else None, timestamp, now)
+            return
+        assigned = [None] * len(players)
+        for tip in tips or ():
+            i = min(max(int(tip[0] * len(players) // WIDTH), 0), len(players) - 1)
+            current, last = assigned[i], players[i].tip
+            if current is None or (last is not None and math.dist(tip, last) < math.dist(current, last)):
+                assigned[i] = tip
+        for player, tip in zip(players, assigned):
+            player.feed(tip, timestamp, now)
+
+    # ==================== 逻辑 ====================
+    def update(self, key=-1, steps=1):
+        """
+        推进一帧游戏逻辑
+        :param key: 本帧按键码（无按键时为-1或255）
+        :param steps: 本帧需要执行的固定模拟步数
+        """
+        self.flash = False
+        self.events = []
+        self.time += steps / SIM_HZ
+        blades = [p.take_blade() for p in self.players]
+
+        if self.game_state == MENU:
+            # 按S/空格开始游戏，进入倒计时状态
+            if _pressed(key, 's', 'S', ' '):
+                self.game_state = COUNTDOWN
+                self._event('start')
+                self.countdown_timer = 3 * SIM_HZ  # 3秒倒计时（模拟步数）
+                self.spawner.reset(self.rounds)
+                self.rounds += 1
+                for player in self.players:
+                    player.combo_count = 0
+
+        elif self.game_state == PLAYING:
+            with self.profiler.scope('simulate'):
+                for _ in range(steps):
+                    self.step()
+            with self.profiler.scope('collide'):
+                self.collide(blades)
+                self.compact()
+
+            # 全部玩家生命值耗尽，进入游戏结束状态
+            if not any(p.alive for p in self.players):
+                self.game_state = GAME_OVER
+                self._event('game_over', scores=[p.score for p in self.players])
+            # 按P键暂停游戏
+            if _pressed(key, 'p', 'P'):
+                self.game_state = PAUSED
+                self._event('pause')
+
+        elif self.game_state == GAME_OVER:
+            # 按R重启游戏
+            if _pressed(key, 'r', 'R'):
+                self.restart()
+            # 按Q退出游戏
+            elif _pressed(key, 'q', 'Q'):
+                self.running = False
+
+        elif self.game_state == COUNTDOWN:
+            self.countdown_timer -= steps
+            if self.countdown_timer <= 0:
+                self.game_state = PLAYING  # 倒计时结束，进入游戏中状态
+
+        elif self.game_state == PAUSED:
+            # 按P恢复游戏
+            if _pressed(key, 'p', 'P'):
+                self.game_state = PLAYING
+                self._event('resume')
+
+        # 按Q键强制退出
+        if _pressed(key, 'q'):
+            self.running = False
+
+    def restart(self):
+        """清空场上对象并重新开始游戏"""
+        for player in self.players:
+            player.reset()
+        self.objects.clear()
+        self.debris.clear()
+        self.particles.clear()
+        self.object_pool.clear()
+        self.spawner.reset(self.rounds)
+        self.rounds += 1
+        self.game_state = PLAYING
+        self._event('restart')
+
+    def step(self):
+        """执行一个固定模拟步：生成、批量物理更新与计时"""
+        # 按生成调度发放到期的水果/炸弹（场上数量达到上限时跳过）
+        self.play_steps += 1
+        for event in self.spawner.advance(1.0 / SIM_HZ):
+            if self.spawner.admit(len(self.objects)):
+                self.spawn(event)
+
+        # 批量更新对象、碎片和粒子的位置
+        self.object_pool.step()
+        self.particles.step()
+
+        for player in self.players:
+            if player.combo_display_timer > 0:
+                player.combo_display_timer -= 1
+
+    def spawn(self, event=None):
+        """
+        生成一个新的水果/炸弹
+        :param event: 生成调度给出的SpawnEvent（默认按当前波次与难度额外抽样一次，不影响调度的随机序列）
+        """
+        if event is None:
+            event = self.spawner.table.launch(self.spawner.time, self.rng)
+        obj = GameObject(pool=self.object_pool, spawn=event)
+        self.objects.append(obj)
+        return obj
+
+    def collide(self, blades):
+        """
+        用全部玩家刀光的每条线段对对象做一次批量扫掠检测，按命中时间顺序处理切割
+        :param blades: 每名玩家本帧的刀光折线（与self.players一一对应），生命值耗尽的玩家不参与
+        """
+        blades = [blade if player.alive else NO_BLADE for player, blade in zip(self.players, blades)]
+        if not any(len(blade) for blade in blades) or not self.objects:
+            return
+        pool = self.object_pool
+        slots = [obj.slot for obj in self.objects]
+        hits = find_blade_slices([(blade[:, :2], blade[:, 2]) for blade in blades],
+                                 pool.x[slots], pool.y[slots], pool.radius[slots], pool.active[slots])
+        for hit in hits:
+            self.slice(self.objects[hit.index], self.players[hit.blade])
+
+    def slice(self, obj, player=None):
+        """
+        处理一次切割命中
+        :param player: 切到该对象的玩家（默认第一名玩家）
+        """
+        player = player or self.players[0]
+        obj.active = False  # 标记为非活跃
+
+        if obj.is_bomb:
+            # 切到炸弹：扣生命值、重置连击、播放音效、红色闪屏
+            player.lives -= 1
+            player.combo_count = 0
+            self.play_sound('bomb')
+            self.flash = True
+            self._event('bomb', player=player.index, x=obj.x, y=obj.y, lives=player.lives)
+        else:
+            # 切到水果：处理连击逻辑
+            # 按模拟步数计算超时，暂停期间不会打断连击
+            if self.play_steps - player.last_slice_step < COMBO_TIMEOUT * SIM_HZ:
+                player.combo_count += 1  # 在超时内切割，连击数+1
+            else:
+                player.combo_count = 1   # 超时重置为1连击
+
+            player.last_slice_step = self.play_steps
+            player.combo_display_timer = SIM_HZ  # 显示连击文字1秒
+
+            # 计算得分：基础分 + 连击加成
+            base_score = FRUIT_CONFIG[obj.name]['score']
+            player.score += base_score + (player.combo_count - 1)
+            self._event('slice', player=player.index, fruit=obj.name, x=obj.x, y=obj.y,
+                        combo=player.combo_count, score=player.score)
+
+            self.play_sound('slice')  # 播放切割音效
+
+            # 生成两个半果碎片
+            for half_type in (1, 2):
+                self.debris.append(GameObject(is_half=True, base_obj=obj, half_type=half_type,
+                                              pool=self.object_pool, rng=self.rng))
+
+            # 按该水果的喷发参数生成粒子特效
+            self.particles.emit(obj.name, obj.x, obj.y, FRUIT_CONFIG[obj.name]['color'], rng=self.rng)
+
+    def compact(self):
+        """按活跃掩码统一移除非活跃对象/碎片，并回收实体池槽位（粒子在每个模拟步自行回收）"""
+        self.objects = [obj for obj in self.objects if obj.active]
+        self.debris = [d for d in self.debris if d.active]
+        self.object_pool.compact()
+
+    def play_sound(self, name):
+        if self.R is not None:
+            self.R.play_sound(name)
+
+    def _event(self, kind, **data):
+        """记录一个本帧发生的游戏事件"""
+        data['type'] = kind
+        data['time'] = self.time
+        self.events.append(data)
+
+    # ==================== 绘制 ====================
+    def draw(self, frame, alpha=1.0, dirty=NULL_DIRTY):
+        """
+        把当前游戏画面绘制到frame上
+        :param alpha: 渲染插值系数（0=上一模拟步，1=当前模拟步）
+        :param dirty: 脏区域记录器（DirtyRectRenderer），登记本帧绘制过的区域
+        :return: 绘制后的画面（覆盖层会返回新图像）
+        """
+        profiler = self.profiler
+        # 游戏逻辑使用逻辑坐标，绘制时按资源管理器的缩放系数换算到画布
+        scale = self.R.scale
+        # HUD常驻在画布上：内容变化、上一帧在HUD区域内绘制过或有闪屏时，先把整条HUD区域恢复为背景，
+        # 本帧最后在最上层重新混合；否则画布上的HUD保持不变，不必重绘
+        playing = self.game_state == PLAYING
+        hud = ui.scale_rect(ui.HUD_RECT, scale)
+        redraw_hud = playing and (self._hud_state() != self._hud_key or self.flash or dirty.touched(hud))
+        if redraw_hud:
+            dirty.restore(hud)
+        with profiler.scope('trail'):
+            self.draw_trails(frame, dirty)
+
+        if playing:
+            frame = self.draw_entities(frame, alpha, dirty)
+            if not redraw_hud and dirty.touched(hud):
+                # 本帧有元素进入HUD区域（叠在旧HUD上）：在背景副本上重画该区域的画面后写回，再混合HUD
+                # （多画几行，抗锯齿的刀光在裁剪边缘处的像素与整帧绘制一致）
+                with profiler.scope('hud'):
+                    rows = min(int(hud[3]) + 1, frame.shape[0])
+                    band = self.R.background[:rows + 8].copy()
+                    self.draw_trails(band)
+                    self.draw_entities(band, alpha)
+                    frame[:rows] = band[:rows]
+                redraw_hud = True
+            with profiler.scope('hud'):
+                frame = self.draw_overlay(frame, dirty, redraw_hud)
+            return frame
+
+        # 静态界面使用缓存图层，内容键变化（得分、倒计时数字）时才重新渲染
+        dirty.mark_full()
+        with profiler.scope('screen'):
+            if self.game_state == MENU:
+                frame = self.layers.composite(frame, ('tutorial',), lambda f: ui.draw_tutorial(f, self.R))
+
+            elif self.game_state == GAME_OVER:
+                score = self.score
+                # 多名玩家时额外显示每名玩家的得分
+                scores = tuple(p.score for p in self.players) if len(self.players) > 1 else ()
+                frame = self.layers.composite(frame, ('game_over', score, scores),
+                                              lambda f: ui.draw_game_over(f, score, scores))
+
+            elif self.game_state == COUNTDOWN:
+                # 计算剩余秒数（向上取整）
+                remaining = max(0, (self.countdown_timer + SIM_HZ - 1) // SIM_HZ)
+                frame = self.layers.composite(frame, ('countdown', remaining),
+                                              lambda f: ui.draw_countdown(f, remaining))
+
+            elif self.game_state == PAUSED:
+                frame = self.layers.composite(frame, ('paused',), ui.draw_paused)
+
+        return frame
+
+    @property
+    def idle(self):
+        """当前是否处于静止界面（菜单、暂停、结算），可降低渲染帧率"""
+        return self.game_state in (MENU, PAUSED, GAME_OVER)
+
+    def draw_trails(self, frame, dirty=NULL_DIRTY):
+        """绘制各玩家的刀光"""
+        scale = self.R.scale
+        for player in self.players:
+            dirty.mark(player.trail.draw(frame, player.now, scale, player.color))
+
+    def draw_entities(self, frame, alpha=1.0, dirty=NULL_DIRTY):
+        """绘制对象、炸弹闪屏、碎片与粒子"""
+        profiler = self.profiler
+        with profiler.scope('sprites'):
+            for obj in self.objects:
+                dirty.mark(obj.draw(frame, self.R, alpha))  # 按插值位置绘制对象
+            for d in self.debris:
+                dirty.mark(d.draw(frame, self.R, alpha))
+        if self.flash:
+            with profiler.scope('flash'):
+                frame = ui.draw_bomb_flash(frame)
+                dirty.mark_full()
+        with profiler.scope('particles'):
+            for rect in self.particles.draw(frame, alpha, self.R.scale):
+                dirty.mark(rect)
+        return frame
+
+    def _hud_state(self):
+        """HUD内容键：每名玩家的(得分, 生命值, 连击数)"""
+        return tuple((p.score, p.lives, p.combo_count) for p in self.players)
+
+    def draw_overlay(self, frame, dirty=NULL_DIRTY, hud=True):
+        """
+        绘制HUD与连击特效（每名玩家绘制在自己的屏幕区域内）
+        HUD不登记脏区域，是否需要重新混合由draw()判断
+        :param hud: 是否绘制HUD（画布上已有最新的HUD时为False）
+        """
+        scale = self.R.scale
+        if hud:
+            for player in self.players:
+                ui.draw_hud(frame, player.score, player.lives, scale, player.region, combo=player.combo_count)
+            self._hud_key = self._hud_state()
+        for player in self.players:
+            if player.combo_count > 1 and player.combo_display_timer > 0:
+                ui.draw_combo(frame, player.combo_count, scale, player.region)
+                dirty.mark(ui.scale_rect(ui.COMBO_RECT, scale))
+        return frame
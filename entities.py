@@ -1,65 +1,114 @@
 import random
 import cv2
-from config import WIDTH, HEIGHT, GRAVITY, FRUIT_CONFIG
-from utils import overlay_transparent
+from config import HEIGHT, GRAVITY, FRUIT_CONFIG
+from utils import overlay_transparent, blit_premultiplied
+from entity_pool import EntityPool, Column, LazyDefault, ENTITY_TYPES, TYPE_IDS
+from particles import ParticleSystem
+from spawner import DEFAULT_TABLE
 
 
 class GameObject:
-    """游戏对象类（水果/炸弹），处理位置、运动、绘制逻辑"""
-    def __init__(self, is_half=False, base_obj=None, half_type=1, speed_bonus=0):
+    """
+    游戏对象类（水果/炸弹），处理位置、运动、绘制逻辑
+    数据存放在实体池（EntityPool）的列中，对象本身只是指向某个槽位的视图
+    """
+    # 未指定实体池时使用的共享实体池（首次使用时创建）
+    default_pool = LazyDefault(EntityPool)
+
+    x = Column('x')
+    y = Column('y')
+    prev_x = Column('prev_x')
+    prev_y = Column('prev_y')
+    speed_x = Column('vx')
+    speed_y = Column('vy')
+    gravity = Column('gravity')
+    angle = Column('angle')
+    prev_angle = Column('prev_angle')
+    spin_speed = Column('spin')
+    radius = Column('radius')
+    active = Column('active')
+
+    def __init__(self, is_half=False, base_obj=None, half_type=1, speed_bonus=0, pool=None, rng=None, spawn=None):
+        """:param spawn: 生成调度给出的SpawnEvent（为None时按默认生成配置随机生成）"""
+        # 在实体池中分配槽位
+        self._pool = pool if pool is not None else GameObject.default_pool
+        self._idx = self._pool.allocate()
         # 如果是拆分后的半个水果，初始化半果属性
         if is_half and base_obj:
-            self.init_as_half(base_obj, half_type)
-        # 否则初始化完整的游戏对象（水果/炸弹）
+            self.init_as_half(base_obj, half_type, rng)
+        # 按调度好的生成初始化水果/炸弹
+        elif spawn is not None:
+            self.launch(spawn)
+        # 否则随机初始化完整的游戏对象（水果/炸弹）
         else:
-            self.reset(speed_bonus)
+            self.reset(speed_bonus, rng)
 
-    def reset(self, speed_bonus=0):
-        """重置游戏对象属性（生成新的水果/炸弹）"""
-        # 初始化水平位置（左右留100像素边界）
-        self.x = random.randint(100, WIDTH - 100)
+    def reset(self, speed_bonus=0, rng=None):
+        """
+        重置游戏对象属性（按默认生成配置随机生成新的水果/炸弹）
+        :param rng: 随机数生成器（random.Random实例，默认使用全局random模块）
+        """
+        self.launch(DEFAULT_TABLE.launch(0.0, rng or random, speed_bonus))
+
+    def launch(self, spawn):
+        """按一次生成（SpawnEvent）初始化水果/炸弹：从屏幕底部抛出"""
+        self.name = spawn.name
+        self.x = spawn.x
         self.y = HEIGHT  # 初始垂直位置在屏幕底部
-        # 初始化垂直速度（向上运动，包含速度加成）
-        base_speed_min = 18
-        base_speed_max = 24
-        self.speed_y = -random.randint(base_speed_min, base_speed_max) - speed_bonus
-        # 初始化水平速度（随机左右方向，3-6像素/帧）
-        self.speed_x = random.choice([-1, 1]) * random.randint(3, 6)
+        self.speed_x = spawn.vx
+        self.speed_y = spawn.vy
         self.gravity = GRAVITY  # 重力加速度（使物体下落）
         self.angle = 0  # 初始旋转角度
-        self.spin_speed = random.choice([-8, 8, -5, 5])  # 旋转速度（随机方向和速率）
+        self.spin_speed = spawn.spin
         self.active = True  # 对象是否活跃（未落地/未被消除）
-        self.is_bomb = False  # 是否是炸弹
-
-        # 15%概率生成炸弹
-        if random.random() < 0.15:
-            self.is_bomb = True
-            self.name = 'bomb'
-            self.radius = 40  # 炸弹碰撞半径
-        else:
-            # 随机选择水果类型，读取配置中的碰撞半径
-            self.name = random.choice(list(FRUIT_CONFIG.keys()))
-            self.radius = FRUIT_CONFIG[self.name]['scale'] // 2 + 10
+        # 碰撞半径：炸弹固定40，水果按配置的尺寸
+        self.radius = 40 if spawn.name == 'bomb' else FRUIT_CONFIG[spawn.name]['scale'] // 2 + 10
+        self.save_previous()
 
-    def init_as_half(self, parent, half_type):
+    def init_as_half(self, parent, half_type, rng=None):
         """初始化拆分后的半个水果属性"""
+        rng = rng or random
         self.name = f"{parent.name}_{half_type}"  # 半果命名（区分左右/上下）
         self.x = parent.x  # 继承原水果的位置
         self.y = parent.y
         self.angle = parent.angle  # 继承原水果的旋转角度
         self.gravity = GRAVITY + 0.1  # 半果重力稍大，下落更快
-        self.is_bomb = False  # 炸弹不拆分
         self.active = True
         self.radius = 0  # 半果暂不设置碰撞半径
 
         # 半果分离速度（1型向右，2型向左）
         diverge_speed = 6 if half_type == 1 else -6
         self.speed_x = parent.speed_x + diverge_speed  # 继承原速度+分离速度
-        self.speed_y = random.uniform(2, 5)  # 半果初始向下速度
+        self.speed_y = rng.uniform(2, 5)  # 半果初始向下速度
         self.spin_speed = parent.spin_speed * 1.5  # 半果旋转速度更快
+        self.save_previous()
+
+    @property
+    def slot(self):
+        """对象在实体池中的槽位下标（用于直接读取实体池的列）"""
+        return self._idx
+
+    @property
+    def name(self):
+        """对象类型名称（由实体池中的类型编号映射）"""
+        return ENTITY_TYPES[self._pool.type_id[self._idx]]
+
+    @name.setter
+    def name(self, value):
+        self._pool.type_id[self._idx] = TYPE_IDS[value]
+
+    @property
+    def is_bomb(self):
+        """是否是炸弹"""
+        return self._pool.type_id[self._idx] == TYPE_IDS['bomb']
+
+    def save_previous(self):
+        """记录上一模拟步的位置和角度（用于渲染插值）"""
+        self.prev_x, self.prev_y, self.prev_angle = self.x, self.y, self.angle
 
     def move(self):
-        """更新对象的位置和旋转角度（每一帧调用）"""
+        """更新单个对象的位置和旋转角度（批量更新请使用EntityPool.step）"""
+        self.save_previous()
         self.x += self.speed_x  # 更新水平位置
         self.y += self.speed_y  # 更新垂直位置
         self.speed_y += self.gravity  # 重力影响垂直速度（加速下落）
@@ -69,45 +118,110 @@ class GameObject:
         if self.y > HEIGHT + 100:
             self.active = False
 
-    def draw(self, img, resource_manager):
-        """绘制游戏对象到图像上"""
-        if not self.active: return  # 非活跃对象不绘制
+    def draw(self, img, resource_manager, alpha=1.0):
+        """
+        绘制游戏对象到图像上（位置为逻辑坐标，按资源管理器的缩放系数换算为画布坐标）
+        :param alpha: 渲染插值系数（0=上一模拟步，1=当前模拟步）
+        :return: 绘制区域的外接矩形(x0, y0, x1, y1)，未绘制时返回None
+        """
+        if not self.active: return None  # 非活跃对象不绘制
 
-        # 优先使用资源管理器中的图像绘制（带透明和旋转）
-        if self.name in resource_manager.images and resource_manager.images[self.name] is not None:
-            overlay_transparent(img, resource_manager.images[self.name], self.x, self.y, self.angle)
+        # 在上一步与当前步之间插值，渲染帧率高于模拟频率时运动依然平滑
+        s = resource_manager.scale
+        x = (self.prev_x + (self.x - self.prev_x) * alpha) * s
+        y = (self.prev_y + (self.y - self.prev_y) * alpha) * s
+        angle = self.prev_angle + (self.angle - self.prev_angle) * alpha
+
+        # 优先使用资源管理器中缓存的旋转精灵绘制（查表+混合，无需逐帧旋转）
+        sprite = resource_manager.get_rotated(self.name, angle)
+        if sprite is not None:
+            premul, alpha_inv, w, h = sprite
+            blit_premultiplied(img, premul, alpha_inv, x, y)
+            return x - w / 2 - 1, y - h / 2 - 1, x + w / 2, y + h / 2
+        elif self.name in resource_manager.images and resource_manager.images[self.name] is not None:
+            image = resource_manager.images[self.name]
+            overlay_transparent(img, image, x, y, angle)
+            # 旋转后的外接矩形不超过对角线长度
+            half = (image.shape[0] ** 2 + image.shape[1] ** 2) ** 0.5 / 2 + 1
+            return x - half, y - half, x + half, y + half
         else:
             # 图像资源缺失时的降级绘制逻辑
+            r = max(1, int(40 * s))
             if self.is_bomb:
                 # 绘制黑色圆形炸弹 + 红色感叹号
-                cv2.circle(img, (int(self.x), int(self.y)), 40, (30, 30, 30), -1)
-                cv2.putText(img, "!", (int(self.x) - 10, int(self.y) + 10), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+                cv2.circle(img, (int(x), int(y)), r, (30, 30, 30), -1)
+                cv2.putText(img, "!", (int(x - 10 * s), int(y + 10 * s)), cv2.FONT_HERSHEY_SIMPLEX, s, (0, 0, 255),
+                            max(1, int(round(2 * s))))
             else:
                 # 绘制水果颜色的圆形占位符
                 color = FRUIT_CONFIG.get(self.name, {}).get('color', (255, 255, 255))
-                cv2.circle(img, (int(self.x), int(self.y)), 40, color, -1)
+                cv2.circle(img, (int(x), int(y)), r, color, -1)
+            return x - r - 1, y - r - 1, x + r + 1, y + r + 1
 
 
 class Particle:
-    """粒子效果类（用于水果消除等视觉反馈）"""
-    def __init__(self, x, y, color):
+    """
+    粒子效果类（兼容旧接口）：粒子系统（ParticleSystem）粒子池中某个槽位的视图
+    游戏中的切割特效通过ParticleSystem.emit批量喷发，不经过该类
+    """
+    # 未指定粒子系统时使用的共享粒子系统（首次使用时创建）
+    default_system = LazyDefault(ParticleSystem)
+
+    x = Column('x')
+    y = Column('y')
+    prev_x = Column('prev_x')
+    prev_y = Column('prev_y')
+    vx = Column('vx')
+    vy = Column('vy')
+    size = Column('size')
+    life = Column('life')
+    active = Column('active')
+
+    def __init__(self, x, y, color, system=None, rng=None):
+        """:param system: 所属的粒子系统（默认使用共享粒子系统），槽位按其上限分配"""
+        rng = rng or random
+        system = system if system is not None else Particle.default_system
+        self._pool = system.pool
+        self._idx = int(system.reserve('particle', 1)[0])
         self.x, self.y = x, y  # 粒子初始位置
         self.color = color  # 粒子颜色
-        self.vx = random.uniform(-10, 10)  # 水平速度（随机）
-        self.vy = random.uniform(-10, 10)  # 垂直速度（随机）
-        self.size = random.randint(4, 10)  # 粒子初始尺寸
-        self.life = 10  # 粒子生命周期（帧数）
+        self.vx = rng.uniform(-10, 10)  # 水平速度（随机）
+        self.vy = rng.uniform(-10, 10)  # 垂直速度（随机）
+        self.size = rng.randint(4, 10)  # 粒子初始尺寸
+        self.life = 10  # 粒子生命周期（模拟步数）
+        self.prev_x, self.prev_y = x, y  # 上一模拟步的位置（用于渲染插值）
+
+    @property
+    def color(self):
+        """粒子颜色（BGR元组）"""
+        return tuple(int(c) for c in self._pool.color[self._idx])
+
+    @color.setter
+    def color(self, value):
+        self._pool.color[self._idx] = value
 
     def update(self):
-        """更新粒子位置和生命周期（每一帧调用）"""
+        """更新单个粒子的位置和生命周期（批量更新请使用ParticleSystem.step）"""
+        self.prev_x, self.prev_y = self.x, self.y
         self.x += self.vx
         self.y += self.vy
         self.life -= 1  # 生命周期递减
         self.size = max(0, self.size - 0.5)  # 粒子逐渐缩小（最小为0）
+        if self.life <= 0:
+            self.active = False
 
-    def draw(self, img):
-        """绘制粒子（矩形）"""
+    def draw(self, img, alpha=1.0, scale=1.0):
+        """
+        绘制粒子（矩形），返回绘制区域的外接矩形
+        :param alpha: 渲染插值系数
+        :param scale: 逻辑坐标到画布坐标的缩放系数
+        """
         if self.life > 0:  # 生命周期>0时才绘制
-            p1 = (int(self.x - self.size), int(self.y - self.size))
-            p2 = (int(self.x + self.size), int(self.y + self.size))
-            cv2.rectangle(img, p1, p2, self.color, -1)  # 填充矩形绘制粒子
\ No newline at end of file
+            x = (self.prev_x + (self.x - self.prev_x) * alpha) * scale
+            y = (self.prev_y + (self.y - self.prev_y) * alpha) * scale
+            size = self.size * scale
+            p1 = (int(x - size), int(y - size))
+            p2 = (int(x + size), int(y + size))
+            cv2.rectangle(img, p1, p2, self.color, -1)  # 填充矩形绘制粒子
+            return p1[0], p1[1], p2[0], p2[1]
+        return None
@@ -0,0 +1,144 @@
+import numpy as np
+from config import HEIGHT, FRUIT_CONFIG
+
+# 实体类型表：类型编号 <-> 名称（炸弹、水果及其左右半果）
+ENTITY_TYPES = ['bomb'] + [f'{name}{suffix}' for name in FRUIT_CONFIG for suffix in ('', '_1', '_2')]
+TYPE_IDS = {name: i for i, name in enumerate(ENTITY_TYPES)}
+
+
+class Column:
+    """实体视图的属性描述符：读写实体池中对应列的槽位"""
+    def __init__(self, field):
+        self.field = field
+
+    def __get__(self, view, owner):
+        if view is None:
+            return self
+        return getattr(view._pool, self.field)[view._idx]
+
+    def __set__(self, view, value):
+        getattr(view._pool, self.field)[view._idx] = value
+
+
+class LazyDefault:
+    """类属性描述符：首次访问时才调用factory创建共享的默认对象（导入模块时不分配内存）"""
+    def __init__(self, factory):
+        self.factory = factory
+        self.value = None
+
+    def __get__(self, view, owner):
+        if self.value is None:
+            self.value = self.factory()
+        return self.value
+
+
+class EntityPool:
+    """
+    结构化数组实体池：每个属性一列预分配的NumPy数组
+    批量积分更新，空闲槽位通过空闲列表复用，非活跃槽位按掩码统一回收
+    """
+    FLOAT_FIELDS = ('x', 'y', 'prev_x', 'prev_y', 'vx', 'vy', 'gravity', 'angle', 'prev_angle', 'spin', 'radius')
+    # 超出屏幕底部多少像素后标记为非活跃
+    KILL_MARGIN = 100
+
+    def __init__(self, capacity=256):
+        self.capacity = 0
+        self.free = []  # 空闲槽位栈（优先复用低位槽位）
+        for field in self.FLOAT_FIELDS:
+            setattr(self, field, np.zeros(0, dtype=np.float64))
+        self.type_id = np.zeros(0, dtype=np.int16)
+        self.active = np.zeros(0, dtype=bool)   # 对象是否活跃（未落地/未被消除）
+        self.used = np.zeros(0, dtype=bool)     # 槽位是否已分配
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        """扩容到指定容量，保留已有数据"""
+        old = self.capacity
+        for field in self.FLOAT_FIELDS + ('type_id', 'active', 'used'):
+            column = getattr(self, field)
+            grown = np.zeros((capacity,) + column.shape[1:], dtype=column.dtype)
+            grown[:old] = column
+            setattr(self, field, grown)
+        # 新槽位压在栈底，原有的空闲槽位（下标更小）仍然先被复用
+        self.free[:0] = range(capacity - 1, old - 1, -1)
+        self.capacity = capacity
+
+    def allocate(self):
+        """分配一个槽位（无空闲槽位时容量翻倍），返回槽位下标"""
+        if not self.free:
+            self._grow(max(16, self.capacity * 2))
+        idx = self.free.pop()
+        self.used[idx] = True
+        self.active[idx] = True
+        return idx
+
+    def allocate_many(self, n):
+        """一次分配n个槽位（空闲槽位不足时扩容），返回槽位下标数组"""
+        if n <= 0:
+            return np.zeros(0, dtype=np.intp)
+        if len(self.free) < n:
+            self._grow(max(16, self.capacity * 2, len(self) + n))
+        idx = np.array(self.free[:-n - 1:-1], dtype=np.intp)
+        del self.free[-n:]
+        self.used[idx] = True
+        self.active[idx] = True
+        return idx
+
+    def release(self, idx):
+        """立即释放指定槽位（一个下标或下标数组，不等待compact）"""
+        idx = np.asarray(idx, dtype=np.intp).reshape(-1)
+        self.active[idx] = False
+        self.used[idx] = False
+        self.free.extend(idx[::-1].tolist())
+
+    def compact(self):
+        """回收所有已分配但非活跃的槽位，返回回收数量"""
+        dead = np.flatnonzero(self.used & ~self.active)
+        self.used[dead] = False
+        self.free.extend(dead[::-1].tolist())
+        return len(dead)
+
+    def clear(self):
+        """释放全部槽位"""
+        self.used[:] = False
+        self.active[:] = False
+        self.free = list(range(self.capacity - 1, -1, -1))
+
+    def __len__(self):
+        return self.capacity - len(self.free)
+
+    def step(self):
+        """对所有槽位批量执行一个模拟步（未分配槽位的数据不会被读取）"""
+        self.prev_x[:] = self.x
+        self.prev_y[:] = self.y
+        self.prev_angle[:] = self.angle
+        self.x += self.vx
+        self.y += self.vy
+        self.vy += self.gravity   # 重力影响垂直速度（加速下落）
+        self.angle += self.spin
+        # 超出屏幕底部后标记为非活跃
+        self.active &= self.y <= HEIGHT + self.KILL_MARGIN
+
+
+class ParticlePool(EntityPool):
+    """粒子实体池：匀速运动、逐步缩小，生命周期结束后标记为非活跃"""
+    FLOAT_FIELDS = ('x', 'y', 'prev_x', 'prev_y', 'vx', 'vy', 'size', 'life')
+
+    def __init__(self, capacity=256):
+        self.color = np.zeros((0, 3), dtype=np.uint8)
+        super().__init__(capacity)
+
+    def _grow(self, capacity):
+        color = np.zeros((capacity, 3), dtype=np.uint8)
+        color[:self.capacity] = self.color
+        self.color = color
+        super()._grow(capacity)
+
+    def step(self):
+        self.prev_x[:] = self.x
+        self.prev_y[:] = self.y
+        self.x += self.vx
+        self.y += self.vy
+        self.life -= 1  # 生命周期递减
+        np.maximum(self.size - 0.5, 0, out=self.size)  # 粒子逐渐缩小（最小为0）
+        self.active &= self.life > 0
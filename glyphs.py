@@ -0,0 +1,149 @@
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from config import TEXT_CACHE_SIZE
+from utils import clip_rect, composite_premultiplied
+
+
+class GlyphCache:
+    """
+    文字/图形贴图缓存：每个不同的(文字, 字体, 字号, 颜色, 线宽)只用cv2.putText光栅化一次，
+    保存为预乘alpha的贴图（与精灵相同的混合路径），之后每帧只需一次混合；超出上限时LRU淘汰
+    """
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        """:param max_entries: 最多缓存的贴图数量"""
+        self.max_entries = max_entries
+        self.tiles = OrderedDict()   # 键 -> (预乘BGR, 三通道反向alpha, 原点在贴图中的x, 原点在贴图中的y)
+        self.sizes = {}              # (文字, 字体, 字号, 线宽) -> ((宽, 高), 基线)
+        self.bands = {}              # 合成贴图槽位 -> (内容键, 贴图)，每个槽位只保留最新内容
+        self.hits = 0
+        self.misses = 0
+
+    def measure(self, text, font, font_scale, thickness):
+        """cv2.getTextSize的缓存版本，返回((宽, 高), 基线)"""
+        key = (text, font, font_scale, thickness)
+        size = self.sizes.get(key)
+        if size is None:
+            if len(self.sizes) >= self.max_entries * 4:
+                self.sizes.clear()
+            size = self.sizes[key] = cv2.getTextSize(text, font, font_scale, thickness)
+        return size
+
+    def advance(self, text, font, font_scale, thickness):
+        """文字的前进宽度（下一段文字的起点偏移）：getTextSize的宽度含有与线宽相关的固定边距，用差值消去"""
+        return (self.measure(text + '0', font, font_scale, thickness)[0][0]
+                - self.measure('0', font, font_scale, thickness)[0][0])
+
+    def tile(self, key, size, origin, draw):
+        """
+        获取一个缓存贴图，不存在时光栅化生成
+        :param key: 缓存键（包含决定外观的全部参数）
+        :param size: 贴图尺寸(宽, 高)
+        :param origin: 绘制原点在贴图中的坐标（贴图按该点对齐到目标位置）
+        :param draw: 绘制函数draw(image, color)：color为None时用真实颜色绘制，否则用给定颜色绘制遮罩
+        :return: (预乘BGR, 三通道反向alpha, 原点x, 原点y)
+        """
+        entry = self.tiles.get(key)
+        if entry is not None:
+            self.tiles.move_to_end(key)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        w, h = size
+        # 在黑底上绘制得到的颜色已经按覆盖率预乘；覆盖率单独绘制为遮罩，黑色文字（如阴影）也能得到正确的alpha
+        premul = np.zeros((h, w, 3), dtype=np.uint8)
+        mask = np.zeros((h, w), dtype=np.uint8)
+        draw(premul, None)
+        draw(mask, 255)
+        alpha_inv = cv2.bitwise_not(cv2.merge((mask, mask, mask)))
+        entry = (premul, alpha_inv, origin[0], origin[1])
+        self.tiles[key] = entry
+        if len(self.tiles) > self.max_entries:
+            self.tiles.popitem(last=False)
+        return entry
+
+    def text_tile(self, text, font, font_scale, color, thickness):
+        """获取一段文字的贴图（原点为cv2.putText的左下角基线点）"""
+        (tw, th), baseline = self.measure(text, font, font_scale, thickness)
+        # 笔画会超出getTextSize报告的范围，四周按线宽留边
+        pad = thickness + 1
+        origin = (pad, pad + th)
+        size = (tw + 2 * pad, th + baseline + 2 * pad)
+
+        def draw(image, c):
+            cv2.putText(image, text, origin, font, font_scale, color if c is None else c, thickness)
+        return self.tile(('text', text, font, font_scale, tuple(color), thickness), size, origin, draw)
+
+    def run_tiles(self, parts, org, font, font_scale, color, thickness):
+        """
+        把一行文字拆成若干段贴图依次排列（如固定前缀 + 逐个数字），数值变化时只需取出已缓存的数字贴图，
+        不会为每个新数值重新光栅化整行文字；排列结果与整行cv2.putText逐像素一致
+        :param parts: 文字片段列表
+        :return: [(贴图, 原点), ...]，可直接传给compose
+        """
+        x, y = org
+        tiles = []
+        for part in parts:
+            tiles.append((self.text_tile(part, font, font_scale, color, thickness), (x, y)))
+            x += self.advance(part, font, font_scale, thickness)
+        return tiles
+
+    def compose(self, tiles):
+        """
+        把多个贴图按各自原点合成为一张贴图（预乘alpha的over运算），用于整块缓存由多个贴图组成的界面区域
+        :param tiles: [(贴图, 原点(x, y)), ...]，后面的贴图在上层
+        :return: 合成贴图，用blit(frame, 贴图, (0, 0))绘制到原来的位置
+        """
+        rects = [(int(org[0]) - ox, int(org[1]) - oy, premul.shape[1], premul.shape[0])
+                 for (premul, _, ox, oy), org in tiles]
+        x0 = min(r[0] for r in rects)
+        y0 = min(r[1] for r in rects)
+        x1 = max(r[0] + r[2] for r in rects)
+        y1 = max(r[1] + r[3] for r in rects)
+        premul = np.zeros((y1 - y0, x1 - x0, 3), dtype=np.uint8)
+        alpha_inv = np.full((y1 - y0, x1 - x0, 3), 255, dtype=np.uint8)
+        for ((tile_premul, tile_alpha_inv, _, _), _), (x, y, w, h) in zip(tiles, rects):
+            region = (slice(y - y0, y - y0 + h), slice(x - x0, x - x0 + w))
+            composite_premultiplied(premul[region], tile_premul, tile_alpha_inv)
+            cv2.multiply(alpha_inv[region], tile_alpha_inv, dst=alpha_inv[region], scale=1 / 255)
+        return premul, alpha_inv, -x0, -y0
+
+    def band(self, slot, key, build):
+        """
+        获取一个合成贴图槽位的贴图，内容键变化时才重新合成（每个槽位只保留一份，不进入LRU）
+        :param slot: 槽位（如某名玩家的HUD）
+        :param key: 内容键（决定合成结果的全部数值）
+        :param build: 生成函数，返回compose的参数
+        """
+        cached = self.bands.get(slot)
+        if cached is not None and cached[0] == key:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        entry = self.compose(build())
+        self.bands[slot] = (key, entry)
+        return entry
+
+    def draw_text(self, frame, text, org, font, font_scale, color, thickness=1):
+        """
+        与cv2.putText参数相同的缓存绘制（抗锯齿边缘与直接绘制相差不超过2个灰度级）
+        :return: 绘制区域(x0, y0, x1, y1)，用于脏矩形渲染
+        """
+        return self.blit(frame, self.text_tile(text, font, font_scale, color, thickness), org)
+
+    def blit(self, frame, entry, org):
+        """把贴图按原点对齐到org混合到frame上，返回绘制区域(x0, y0, x1, y1)"""
+        premul, alpha_inv, ox, oy = entry
+        h, w = premul.shape[:2]
+        x, y = int(org[0]) - ox, int(org[1]) - oy
+        clip = clip_rect(frame.shape[1], frame.shape[0], x, y, w, h)
+        if clip is not None:
+            bg_slice, fg_slice = clip
+            composite_premultiplied(frame[bg_slice], premul[fg_slice], alpha_inv[fg_slice])
+        return x, y, x + w, y + h
+
+
+# 界面绘制共用的贴图缓存
+GLYPHS = GlyphCache()
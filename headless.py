@@ -0,0 +1,134 @@
+"""
+无界面确定性模拟入口：不需要摄像头、MediaPipe和窗口
+用文件或生成器提供的指尖采样代替手部追踪，以固定步长尽可能快地运行完整状态机
+（菜单、倒计时、游戏中、暂停、游戏结束），并输出帧率与最终得分
+
+运行方式（项目根目录）：
+    python headless.py --frames 3000 --seed 1
+    python headless.py --inputs session.jsonl --render
+输入文件为JSON Lines，每行一帧：{"tip": [x, y] 或 null, "key": "s" 或 null}
+多人游戏时用 "tips": [[x, y], ...] 给出本帧检测到的全部指尖（按屏幕区域分配给玩家）
+"""
+import argparse
+import json
+import math
+import random
+import time
+from collections import namedtuple
+
+from config import WIDTH, HEIGHT, SIM_HZ
+from engine import GameEngine
+
+# 一帧输入：指尖坐标（未检测到手时为None）、按键字符（无按键时为None）、多人时的全部指尖（可选）
+InputFrame = namedtuple('InputFrame', ['tip', 'key', 'tips'], defaults=(None,))
+
+
+def load_inputs(path):
+    """从JSON Lines文件逐帧读取输入"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            tip = record.get('tip')
+            tips = record.get('tips')
+            yield InputFrame(tuple(tip) if tip is not None else None, record.get('key'),
+                             [tuple(t) for t in tips] if tips is not None else None)
+
+
+def save_inputs(path, inputs):
+    """把输入序列写入JSON Lines文件（可用于录制后回放）"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for item in inputs:
+            record = {'tip': list(item.tip) if item.tip is not None else None, 'key': item.key}
+            if item.tips is not None:
+                record['tips'] = [list(t) for t in item.tips]
+            f.write(json.dumps(record) + '\n')
+
+
+def synthetic_inputs(seed=0, start_key='s', speed=1.0, players=1):
+    """
+    生成合成的指尖轨迹（无限序列）：在屏幕内做利萨如曲线挥动，并叠加少量随机抖动
+    :param seed: 随机种子
+    :param start_key: 第一帧发送的按键（默认S开始游戏）
+    :param speed: 挥动速度倍率
+    :param players: 玩家数，大于1时每名玩家在自己的屏幕区域内挥动（结果放在tips中）
+    """
+    rng = random.Random(seed)
+    phases = [rng.uniform(0, 2 * math.pi) for _ in range(players)]
+    region = WIDTH / players
+    frame = 0
+    while True:
+        t = frame / SIM_HZ * speed
+        tips = []
+        for i, phase in enumerate(phases):
+            x = region * (i + 0.5) + region * 0.42 * math.sin(2 * math.pi * 0.7 * t + phase)
+            y = HEIGHT / 2 + HEIGHT * 0.35 * math.sin(2 * math.pi * 1.3 * t + i)
+            tips.append((int(x + rng.uniform(-4, 4)), int(y + rng.uniform(-4, 4))))
+        yield InputFrame(tips[0], start_key if frame == 0 else None, tips if players > 1 else None)
+        frame += 1
+
+
+def run_headless(inputs, seed=0, max_frames=None, resources=None, render=False, players=1):
+    """
+    用给定输入驱动游戏引擎，每帧推进一个模拟步
+    :param inputs: InputFrame的可迭代对象（文件或生成器）
+    :param seed: 游戏随机种子
+    :param max_frames: 最多运行的帧数（None表示直到输入耗尽或玩家退出）
+    :param resources: 资源管理器（render=True时必须提供）
+    :param render: 是否执行绘制（不显示，仅用于测量绘制开销）
+    :param players: 玩家数
+    :return: 运行报告字典
+    """
+    engine = GameEngine(resources, seed=seed, players=players)
+    frames = 0
+    start = time.perf_counter()
+    for item in inputs:
+        if max_frames is not None and frames >= max_frames:
+            break
+        # 采样时间戳由帧序号推算，保证结果可复现
+        tips = item.tips if item.tips is not None else ([item.tip] if item.tip is not None else [])
+        engine.feed_hands(tips, frames / SIM_HZ)
+        engine.update(ord(item.key) if item.key else -1, 1)
+        if render:
+            engine.draw(resources.background.copy())
+        frames += 1
+        if not engine.running:
+            break
+    elapsed = time.perf_counter() - start
+
+    return {
+        'frames': frames,
+        'seconds': elapsed,
+        'fps': frames / elapsed if elapsed > 0 else float('inf'),
+        'score': engine.score,
+        'lives': engine.lives,
+        'players': [{'score': p.score, 'lives': p.lives} for p in engine.players],
+        'state': engine.game_state,
+        'seed': seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='无界面确定性模拟')
+    parser.add_argument('--inputs', help='JSON Lines输入文件（默认使用合成指尖轨迹）')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    parser.add_argument('--frames', type=int, default=3000, help='最多运行的帧数')
+    parser.add_argument('--render', action='store_true', help='执行绘制（需要assets，不显示窗口）')
+    parser.add_argument('--players', type=int, default=1, help='玩家数（合成输入时每名玩家一条轨迹）')
+    args = parser.parse_args()
+
+    inputs = load_inputs(args.inputs) if args.inputs else synthetic_inputs(args.seed, players=args.players)
+    resources = None
+    if args.render:
+        from resources import ResourceManager
+        resources = ResourceManager(audio=False)
+
+    report = run_headless(inputs, seed=args.seed, max_frames=args.frames, resources=resources, render=args.render,
+                          players=args.players)
+    print(json.dumps(report, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
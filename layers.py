@@ -0,0 +1,69 @@
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from config import WIDTH, HEIGHT
+from utils import composite_premultiplied
+
+
+class LayerCache:
+    """
+    静态覆盖层缓存：菜单、暂停、倒计时、结算等界面只渲染一次，
+    保存为预乘alpha图层（预乘BGR + 三通道反向alpha），之后每帧只做一次混合
+    图层按(分辨率, 内容键)缓存，内容变化（得分、倒计时数字）时使用新键，旧图层按LRU淘汰
+    界面布局使用逻辑坐标：图层始终按逻辑分辨率绘制，画布尺寸不同时只在生成图层时缩放一次
+    """
+    def __init__(self, max_layers=8, design_size=(WIDTH, HEIGHT)):
+        """
+        :param max_layers: 最多缓存的图层数
+        :param design_size: 绘制函数使用的逻辑分辨率(宽, 高)
+        """
+        self.max_layers = max_layers
+        self.design_size = design_size
+        self.layers = OrderedDict()
+        self.builds = 0  # 实际渲染图层的次数
+
+    def get(self, key, shape, render):
+        """
+        获取图层，不存在时调用render生成
+        :param key: 内容键（需包含所有影响画面的内容）
+        :param shape: 目标画面形状(h, w, 3)
+        :param render: 绘制函数 render(frame) -> frame，必须是对输入画面的逐像素仿射变换
+                       （半透明覆盖、不透明文字/图标都满足）
+        :return: (预乘BGR, 三通道反向alpha)
+        """
+        full_key = (tuple(shape), key)
+        layer = self.layers.get(full_key)
+        if layer is not None:
+            self.layers.move_to_end(full_key)
+            return layer
+
+        # 分别在全黑和全白画面上绘制：黑底结果即预乘前景，白底与黑底之差即背景保留权重
+        w, h = self.design_size
+        design_shape = (h, w) + tuple(shape[2:])
+        black = render(np.zeros(design_shape, dtype=np.uint8))
+        white = render(np.full(design_shape, 255, dtype=np.uint8))
+        alpha_inv = white - np.minimum(black, white)
+        if tuple(design_shape) != tuple(shape):
+            # 预乘图层可以直接缩放（缩放是线性的，不会产生颜色溢出）
+            size = (shape[1], shape[0])
+            interpolation = cv2.INTER_AREA if shape[1] < w else cv2.INTER_LINEAR
+            black = cv2.resize(black, size, interpolation=interpolation)
+            alpha_inv = cv2.resize(alpha_inv, size, interpolation=interpolation)
+        layer = (black, alpha_inv)
+        self.builds += 1
+
+        self.layers[full_key] = layer
+        if len(self.layers) > self.max_layers:
+            self.layers.popitem(last=False)
+        return layer
+
+    def composite(self, frame, key, render):
+        """把图层原地混合到frame上（一次乘法+一次加法），返回frame"""
+        premul, alpha_inv = self.get(key, frame.shape, render)
+        composite_premultiplied(frame, premul, alpha_inv)
+        return frame
+
+    def clear(self):
+        self.layers.clear()
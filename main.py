@@ -1,306 +1,221 @@
-import cv2
-import mediapipe as mp
-import numpy as np
-import pygame
 import random
-import math
 import time
 
-# 导入自定义模块（游戏配置、资源管理、游戏实体、UI绘制）
-from config import WIDTH, HEIGHT, PALETTE, FRUIT_CONFIG
-from resources import ResourceManager
-from entities import GameObject, Particle
-from ui import draw_tutorial
-
-
-def main():
-    # 初始化资源管理器（加载图片、音效等资源）
-    R = ResourceManager()
-
-    # 初始化MediaPipe手部追踪和OpenCV摄像头
+# 启动计时从导入开始：cv2/numpy是首帧必需的，MediaPipe与pygame推迟到后台线程导入
+_LAUNCH = time.perf_counter()
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+
+# 导入自定义模块（游戏配置、资源管理、游戏引擎、采集流水线）
+from config import (PLAYERS, OUTPUT_SIZE, CAMERA_SIZE, INFERENCE_SIZE, RENDER_FPS, IDLE_FPS, PROFILE,  # noqa: E402
+                    PROFILE_TRACE, RECORD_PATH, TRACKING_ROI_INPUT)
+from resources import ResourceManager  # noqa: E402
+from pipeline import TrackingPipeline  # noqa: E402
+from clock import SimulationClock  # noqa: E402
+from engine import GameEngine, MENU  # noqa: E402
+from profiler import Profiler  # noqa: E402
+from startup import StartupTimer, BackgroundTask  # noqa: E402
+from ui import draw_profiler_panel, draw_startup_status, scale_rect, STATUS_RECT  # noqa: E402
+from renderer import DirtyRectRenderer, NULL_DIRTY  # noqa: E402
+from recorder import SessionRecorder  # noqa: E402
+from utils import letterbox  # noqa: E402
+
+
+def create_hands():
+    """
+    导入MediaPipe并创建手部追踪图，各用一帧空白画面预热（首次推理明显慢于后续推理）
+    :return: (全帧检测用的视频模式实例, ROI推理用的静态图片模式实例)
+    """
+    import mediapipe as mp
     mp_hands = mp.solutions.hands
-    # 配置手部追踪：最多检测1只手，检测置信度阈值0.7
-    hands = mp_hands.Hands(max_num_hands=1, min_detection_confidence=0.7)
+    # 配置手部追踪：每名玩家一只手，检测置信度阈值0.7
+    hands = mp_hands.Hands(max_num_hands=PLAYERS, min_detection_confidence=0.7)
+    hands.process(np.zeros((INFERENCE_SIZE[1], INFERENCE_SIZE[0], 3), dtype=np.uint8))
+    # ROI每次裁剪的位置不同，不能沿用视频模式的帧间跟踪，单独使用静态图片模式
+    roi_hands = mp_hands.Hands(static_image_mode=True, max_num_hands=PLAYERS, min_detection_confidence=0.7)
+    roi_hands.process(np.zeros((TRACKING_ROI_INPUT, TRACKING_ROI_INPUT, 3), dtype=np.uint8))
+    return hands, roi_hands
 
-    # 打开摄像头并设置分辨率
-    cap = cv2.VideoCapture(0)
-    cap.set(3, WIDTH)
-    cap.set(4, HEIGHT)
-
-    # 游戏状态定义: 0=菜单, 1=游戏中, 2=游戏结束, 3=倒计时, 4=暂停
-    game_state = 0
 
-    # 游戏对象列表管理
-    objects = []          # 活跃的水果/炸弹对象
-    debris = []           # 被切开的半果碎片
-    particles = []        # 切割特效粒子
-    trail = []            # 手指追踪轨迹（刀光）
+def open_camera():
+    """打开摄像头并设置分辨率"""
+    cap = cv2.VideoCapture(0)
+    if not cap.isOpened():
+        raise RuntimeError("无法打开摄像头")
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_SIZE[0])
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_SIZE[1])
+    return cap
 
-    # 游戏核心数据
-    score = 0             # 得分
-    lives = 3             # 生命值（切到炸弹扣血）
-    frame_count = 0       # 帧数计数器（用于动态难度）
-    countdown_timer = 0   # 倒计时帧数
 
-    # --- 连击系统变量 ---
-    combo_count = 0               # 连击数
-    last_slice_time = 0           # 上一次切割时间
-    combo_display_timer = 0       # 连击文字显示时长
-    COMBO_TIMEOUT = 2.5           # 连击超时时间（秒）
+def main():
+    timer = StartupTimer(_LAUNCH)
+    timer.record('imports', _LAUNCH, time.perf_counter())
+
+    # 初始化资源管理器（加载图片等资源，背景与精灵按内部渲染分辨率缩放；命中磁盘缓存时几乎不耗时）
+    with timer.phase('assets'):
+        R = ResourceManager(audio=False)
+
+    # MediaPipe、摄像头和混音器在后台线程初始化，教程界面立即显示
+    hands_task = BackgroundTask('mediapipe', create_hands, timer)
+    camera_task = BackgroundTask('camera', open_camera, timer)
+    audio_task = BackgroundTask('audio', R.init_audio, timer)
+    tasks = [('Camera', camera_task), ('Hand tracking', hands_task), ('Audio', audio_task)]
+    for _, task in tasks:
+        task.start()
+
+    # 分阶段耗时分析器（关闭时几乎没有开销，按F键切换）
+    profiler = Profiler(enabled=PROFILE, trace=PROFILE_TRACE is not None)
+
+    # 采集与手部追踪流水线在摄像头和MediaPipe都就绪后启动，渲染循环只读取最新结果
+    pipeline = None
+    first_frame_shown = False
+    startup_reported = False   # 后台初始化全部结束后打印一次启动报告
+    frame_interval = 1.0 / RENDER_FPS
+    idle_interval = 1.0 / IDLE_FPS
+    # 固定步长模拟时钟：物理、生成、难度与计时按真实时间推进，与渲染帧率无关
+    clock = SimulationClock()
+
+    # 游戏引擎持有全部游戏状态（实体、得分、生命、连击、状态机）；随机种子写入录制日志，用于重新渲染
+    seed = random.randrange(1 << 32)
+    engine = GameEngine(R, seed=seed, profiler=profiler)
+    # 录制线程（配置了RECORD_PATH时启用）：画面复制进预分配缓冲，编码与日志写入在后台完成
+    recorder = None
+    if RECORD_PATH is not None:
+        recorder = SessionRecorder(RECORD_PATH, {'seed': seed, 'players': PLAYERS})
+        recorder.start()
+    # 使用背景图时复用同一张画布，每帧只恢复上一帧画过的区域
+    renderer = DirtyRectRenderer(R.background) if R.background is not None else None
 
     print("系统启动。\n请按 'S' 开始游戏。")
 
-    while True:
-        # 读取摄像头帧
-        success, frame = cap.read()
-        if not success: break  # 摄像头读取失败则退出循环
-
-        # 水平翻转帧（镜像效果，操作更直观）
-        frame = cv2.flip(frame, 1)
-        # 转换颜色空间（MediaPipe需要RGB格式）
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    while engine.running:
+        frame_start = time.perf_counter()
+        # 后台初始化完成后启动流水线；摄像头打开失败或读取失败则退出循环
+        if pipeline is None and camera_task.ready and hands_task.ready:
+            hands, roi_hands = hands_task.result
+            pipeline = TrackingPipeline(camera_task.result, hands, profiler=profiler, input_size=INFERENCE_SIZE,
+                                        roi_hands=roi_hands)
+            pipeline.start()
+        if camera_task.failed:
+            print(f"错误: {camera_task.error}")
+            break
+        if hands_task.failed:
+            print(f"错误: 手部追踪初始化失败 - {hands_task.error}")
+            break
+        if pipeline is not None and pipeline.failed: break
+        if not startup_reported and all(task.done.is_set() for _, task in tasks):
+            print(f"启动耗时:\n{timer.report()}")
+            startup_reported = True
 
         # ==================== 1. 核心画面构建 ====================
-        # 优先使用自定义背景图，无则使用摄像头画面
-        if R.background is not None:
-            display_frame = R.background.copy()
-        else:
-            display_frame = frame
+        # 优先使用自定义背景图（脏矩形恢复），无则使用最新的摄像头画面
+        with profiler.scope('background'):
+            if renderer is not None:
+                display_frame = renderer.begin()
+            else:
+                camera_frame = pipeline.latest_frame() if pipeline is not None else None
+                if camera_frame is None:
+                    cv2.waitKey(1)
+                    continue
+                # 摄像头画面缩放到内部渲染分辨率（resize总是生成新图像，不会修改共享帧）
+                image = camera_frame.image
+                if image.shape[1::-1] != R.size:
+                    display_frame = cv2.resize(image, R.size, interpolation=cv2.INTER_AREA)
+                else:
+                    display_frame = image.copy()
 
         # ==================== 2. 手部追踪 ====================
-        results = hands.process(rgb_frame)
-        tip = None  # 食指指尖坐标
-        if results.multi_hand_landmarks:
-            for hand_lm in results.multi_hand_landmarks:
-                h, w, _ = frame.shape
-                # 获取食指指尖（第8个关键点）的像素坐标
-                tip = (int(hand_lm.landmark[8].x * w), int(hand_lm.landmark[8].y * h))
-                trail.append(tip)  # 加入轨迹列表
-
-        # 限制轨迹长度（最多10个点，避免轨迹过长）
-        if len(trail) > 10: trail.pop(0)
-
-        # 绘制刀光（轨迹线条，越新的点越粗）
-        for i in range(1, len(trail)):
-            thickness = int(np.sqrt(10 / float(i + 1)) * 10)
-            cv2.line(display_frame, trail[i - 1], trail[i], (255, 255, 255), thickness)
+        # 读取推理线程发布的最新指尖坐标，按屏幕区域分配给各玩家（同一采样只会加入轨迹一次）
+        sample = pipeline.latest_hand() if pipeline is not None else None
+        # 当前时间与采样时间戳同为perf_counter基准，没有检测到手时刀光也会按时间淡出
+        if sample is not None:
+            engine.feed_hands(sample.tips, sample.timestamp, now=frame_start)
+        else:
+            engine.feed_hands([], now=frame_start)
 
         # ==================== 3. 游戏逻辑 ====================
-        key = cv2.waitKey(1) & 0xFF  # 获取键盘输入
-
-        if game_state == 0:
-            # 菜单界面：绘制教程指引
-            display_frame = draw_tutorial(display_frame, R)
-            # 按S/空格开始游戏，进入倒计时状态
-            if key == ord('s') or key == ord('S') or key == 32:
-                game_state = 3
-                countdown_timer = 90  # 3秒倒计时（按30FPS计算）
-                frame_count = 0
-                combo_count = 0
-                print("游戏开始！")
-
-        elif game_state == 1:
-            # 游戏中状态
-            frame_count += 1
-
-            # 动态难度调节：每300帧提升一级难度
-            difficulty_level = frame_count // 300
-            # 难度越高，生成频率越快（最低10帧生成一次）
-            spawn_rate = max(10, 35 - difficulty_level * 2)
-            # 难度越高，水果速度越快（最高额外+5）
-            speed_bonus = min(5, difficulty_level * 0.5)
-
-            # 按生成频率生成水果/炸弹
-            if frame_count % spawn_rate == 0:
-                objects.append(GameObject(speed_bonus=speed_bonus))
-                # 难度越高，有概率一次生成两个水果（最高60%概率）
-                if random.random() < min(0.6, difficulty_level * 0.05):
-                    objects.append(GameObject(speed_bonus=speed_bonus))
-
-            # --- 处理游戏对象（水果/炸弹） ---
-            for obj in objects[:]:  # 遍历副本避免删除元素导致的异常
-                obj.move()  # 更新对象位置和旋转
-                obj.draw(display_frame, R)  # 绘制对象
-
-                # 检测手指是否切割到活跃的对象
-                if tip and obj.active:
-                    # 计算指尖到对象中心的距离
-                    dist = math.hypot(tip[0] - obj.x, tip[1] - obj.y)
-                    if dist < obj.radius:  # 距离小于碰撞半径=切割成功
-                        obj.active = False  # 标记为非活跃
-
-                        if obj.is_bomb:
-                            # 切到炸弹：扣生命值、重置连击、播放音效、红色闪屏
-                            lives -= 1
-                            combo_count = 0
-                            R.play_sound('bomb')
-                            overlay = np.full_like(display_frame, (0, 0, 255))
-                            display_frame = cv2.addWeighted(display_frame, 0.7, overlay, 0.3, 0)
-                        else:
-                            # 切到水果：处理连击逻辑
-                            current_time = time.time()
-                            if current_time - last_slice_time < COMBO_TIMEOUT:
-                                combo_count += 1  # 在超时内切割，连击数+1
-                            else:
-                                combo_count = 1   # 超时重置为1连击
-
-                            last_slice_time = current_time
-                            combo_display_timer = 30  # 显示连击文字30帧
-
-                            # 计算得分：基础分 + 连击加成
-                            base_score = FRUIT_CONFIG[obj.name]['score']
-                            score += base_score + (combo_count - 1)
-
-                            R.play_sound('slice')  # 播放切割音效
-
-                            # 生成两个半果碎片
-                            debris.append(GameObject(is_half=True, base_obj=obj, half_type=1))
-                            debris.append(GameObject(is_half=True, base_obj=obj, half_type=2))
-
-                            # 生成10个粒子特效
-                            p_color = FRUIT_CONFIG[obj.name]['color']
-                            for _ in range(10):
-                                particles.append(Particle(obj.x, obj.y, p_color))
-
-                # 移除非活跃对象
-                if not obj.active:
-                    objects.remove(obj)
-
-            # --- 处理碎片与粒子 ---
-            # 更新并绘制半果碎片，移除非活跃碎片
-            for d in debris[:]:
-                d.move()
-                d.draw(display_frame, R)
-                if not d.active:
-                    debris.remove(d)
-
-            # 更新并绘制粒子，移除生命周期结束的粒子
-            for p in particles[:]:
-                p.update()
-                p.draw(display_frame)
-                if p.life <= 0:
-                    particles.remove(p)
-
-            # --- HUD显示（得分、生命值） ---
-            # 绘制得分
-            cv2.putText(display_frame, f"Score: {score}", (30, 60), cv2.FONT_HERSHEY_DUPLEX, 1.5, PALETTE['text'], 2)
-            # 绘制生命值
-            for i in range(lives):
-                cv2.circle(display_frame, (WIDTH - 50 - i * 60, 50), 20, (50, 50, 220), -1)
-
-            # --- 连击特效 ---
-            if combo_count > 1 and combo_display_timer > 0:
-                combo_text = f"{combo_count} COMBO!"
-                # 连击数越多，文字越大（最大3.5倍）
-                font_scale = min(3.5, 1.5 + combo_count * 0.2)
-                text_size = cv2.getTextSize(combo_text, cv2.FONT_HERSHEY_TRIPLEX, font_scale, 3)[0]
-                # 文字居中显示
-                text_x = (WIDTH - text_size[0]) // 2
-                text_y = HEIGHT // 2
-
-                # 绘制文字阴影（黑色）+ 主体（配色表中的连击色）
-                cv2.putText(display_frame, combo_text, (text_x + 5, text_y + 5), cv2.FONT_HERSHEY_TRIPLEX, font_scale,
-                            (0, 0, 0), 3)
-                cv2.putText(display_frame, combo_text, (text_x, text_y), cv2.FONT_HERSHEY_TRIPLEX, font_scale,
-                            PALETTE['combo_text'], 3)
-                combo_display_timer -= 1
-
-            # 生命值<=0，进入游戏结束状态
-            if lives <= 0:
-                game_state = 2
-
-            # 按P键暂停游戏
-            if key == ord('p') or key == ord('P'):
-                game_state = 4
-
-        elif game_state == 2:
-            # 游戏结束界面
-            # 绘制半透明黑色覆盖层
-            overlay = display_frame.copy()
-            cv2.rectangle(overlay, (0, 0), (WIDTH, HEIGHT), (0, 0, 0), -1)
-            display_frame = cv2.addWeighted(overlay, 0.85, display_frame, 0.15, 0)
-
-            # 计算文字居中坐标
-            center_x, center_y = WIDTH // 2, HEIGHT // 2
-
-            # 绘制游戏结束文字
-            cv2.putText(display_frame, "GAME OVER", (center_x - 250, center_y - 80), cv2.FONT_HERSHEY_TRIPLEX, 3,
-                        (0, 0, 255), 5)
-            cv2.putText(display_frame, f"Final Score: {score}", (center_x - 150, center_y + 20),
-                        cv2.FONT_HERSHEY_DUPLEX, 1.5, (255, 255, 255), 2)
-            # 绘制重启/退出提示
-            cv2.putText(display_frame, "[R] Restart", (center_x - 120, center_y + 120), cv2.FONT_HERSHEY_DUPLEX, 1,
-                        (0, 255, 0), 2)
-            cv2.putText(display_frame, "[Q] Quit", (center_x - 120, center_y + 170), cv2.FONT_HERSHEY_DUPLEX, 1,
-                        (0, 100, 255), 2)
-
-            # 按R重启游戏
-            if key == ord('r') or key == ord('R'):
-                score = 0
-                lives = 3
-                objects.clear()
-                debris.clear()
-                particles.clear()
-                frame_count = 0
-                combo_count = 0
-                game_state = 1
-            # 按Q退出游戏
-            elif key == ord('q') or key == ord('Q'):
-                break
-
-        elif game_state == 3:
-            # 3秒倒计时界面
-            countdown_timer -= 1
-            # 计算剩余秒数（向上取整）
-            remaining_seconds = max(0, (countdown_timer + 29) // 30)
-
-            # 绘制半透明黑色覆盖层
-            overlay = display_frame.copy()
-            cv2.rectangle(overlay, (0, 0), (WIDTH, HEIGHT), (0, 0, 0), -1)
-            display_frame = cv2.addWeighted(overlay, 0.7, display_frame, 0.3, 0)
-
-            # 显示倒计时数字和准备提示
-            if remaining_seconds > 0:
-                cv2.putText(display_frame, str(remaining_seconds),
-                            (WIDTH // 2 - 50, HEIGHT // 2 + 80),
-                            cv2.FONT_HERSHEY_TRIPLEX, 5, (0, 255, 0), 8)
-                cv2.putText(display_frame, "GET READY!",
-                            (WIDTH // 2 - 150, HEIGHT // 2 - 50),
-                            cv2.FONT_HERSHEY_DUPLEX, 2, (0, 255, 255), 3)
-            else:
-                game_state = 1  # 倒计时结束，进入游戏中状态
-
-        elif game_state == 4:
-            # 暂停界面
-            # 绘制半透明黑色覆盖层
-            overlay = display_frame.copy()
-            cv2.rectangle(overlay, (0, 0), (WIDTH, HEIGHT), (0, 0, 0), -1)
-            display_frame = cv2.addWeighted(overlay, 0.7, display_frame, 0.3, 0)
-
-            # 绘制暂停文字和恢复提示
-            cv2.putText(display_frame, "PAUSED",
-                        (WIDTH // 2 - 120, HEIGHT // 2 - 30),
-                        cv2.FONT_HERSHEY_TRIPLEX, 2.5, (0, 255, 255), 4)
-            cv2.putText(display_frame, "Press 'P' to Resume",
-                        (WIDTH // 2 - 120, HEIGHT // 2 + 50),
-                        cv2.FONT_HERSHEY_DUPLEX, 1, (0, 255, 0), 2)
-
-            # 按P恢复游戏
-            if key == ord('p') or key == ord('P'):
-                game_state = 1  # 恢复游戏
-
-        # 按Q键强制退出
-        if key == ord('q'):
-            break
+        with profiler.scope('waitKey'):
+            key = cv2.waitKey(1) & 0xFF  # 获取键盘输入
+        # 按F键切换性能分析面板
+        if key == ord('f') or key == ord('F'):
+            profiler.enabled = not profiler.enabled
+        # 推进模拟时钟：本帧需要执行的固定步数（非游戏状态下直接丢弃）
+        steps = clock.tick()
+        engine.update(key, steps)
+        # 控制台提示只在窗口入口输出（无界面模拟与多会话服务不打印）
+        if any(event['type'] == 'start' for event in engine.events):
+            print("游戏开始！")
+        if recorder is not None:
+            # 日志记录回放所需的全部输入：指尖采样与时间戳、按键、模拟步数、插值系数，以及本帧游戏事件
+            record = {'type': 'frame', 't': frame_start - _LAUNCH, 'now': frame_start, 'steps': steps,
+                      'alpha': clock.alpha}
+            if key != 255:
+                record['key'] = key
+            if sample is not None:
+                record['tips'] = sample.tips
+                record['ts'] = sample.timestamp
+            if engine.events:
+                record['events'] = engine.events
+            recorder.log(record)
+
+        # ==================== 4. 画面绘制 ====================
+        dirty = renderer if renderer is not None else NULL_DIRTY
+        display_frame = engine.draw(display_frame, clock.alpha, dirty)
+        # 后台初始化尚未全部完成时，在教程界面左下角显示加载状态
+        if not startup_reported and engine.game_state == MENU:
+            draw_startup_status(display_frame, [(name, task.status) for name, task in tasks], R.scale)
+            dirty.mark(scale_rect(STATUS_RECT, R.scale))
+        # 内部渲染分辨率与窗口分辨率不同时，整帧只放大（或缩小）一次（宽高比不同时补黑边）
+        scaled = display_frame.shape[1::-1] != OUTPUT_SIZE
+        if scaled:
+            with profiler.scope('upscale'):
+                display_frame = letterbox(display_frame, OUTPUT_SIZE)
+        # 录制不含性能面板的画面（缓冲用尽时丢帧，不阻塞渲染）
+        if recorder is not None:
+            with profiler.scope('record'):
+                recorder.write(display_frame)
+        # 性能面板直接画在输出画面上（未缩放时输出即画布，下一帧需要整帧恢复）
+        if profiler.enabled:
+            draw_profiler_panel(display_frame, profiler)
+            if not scaled:
+                dirty.mark_full()
+        if renderer is not None:
+            renderer.end()
 
         # 显示游戏画面
-        cv2.imshow('Fruit Ninja', display_frame)
+        with profiler.scope('imshow'):
+            cv2.imshow('Fruit Ninja', display_frame)
+        if not first_frame_shown:
+            timer.mark('first_frame')
+            print(f"首帧显示: {(time.perf_counter() - _LAUNCH) * 1000:.0f} ms")
+            first_frame_shown = True
+        profiler.frame()
+
+        # 按目标帧率限速（静止界面使用较低帧率）
+        interval = idle_interval if engine.idle else frame_interval
+        remaining = interval - (time.perf_counter() - frame_start)
+        if remaining > 0:
+            time.sleep(remaining)
 
     # 释放资源
-    cap.release()
+    if pipeline is not None:
+        pipeline.stop()
+        print(f"流水线统计: {pipeline.stats()}")
+    if recorder is not None:
+        recorder.stop()
+        print(f"录制统计: {recorder.stats()}，已保存到 {recorder.video_path} / {recorder.log_path}")
+    if PROFILE_TRACE is not None and profiler.events:
+        profiler.export_chrome_trace(PROFILE_TRACE)
+        print(f"性能trace已导出到 {PROFILE_TRACE}")
+    # 后台任务仍未结束时不等待（守护线程随进程退出）
+    if camera_task.ready:
+        camera_task.result.release()
     cv2.destroyAllWindows()
-    pygame.quit()
+    if audio_task.ready:
+        print(f"音频统计: {R.mixer.stats()}")
+        R.close()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
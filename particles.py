@@ -0,0 +1,162 @@
+import random
+
+import cv2
+import numpy as np
+
+from config import FRUIT_CONFIG, PARTICLE_BUDGET, PARTICLE_EFFECT_BUDGET, PARTICLE_EMITTER
+from entity_pool import ParticlePool
+
+
+def emitter_config(name):
+    """某种水果的粒子喷发参数（默认参数 + FRUIT_CONFIG中'particles'的覆盖项）"""
+    config = dict(PARTICLE_EMITTER)
+    config.update(FRUIT_CONFIG.get(name, {}).get('particles', {}))
+    return config
+
+
+class ParticleSystem:
+    """
+    有上限的粒子系统：固定容量的预分配粒子池，批量更新，批量绘制
+    - 全局上限：池满时淘汰最早喷发的粒子
+    - 单特效上限：同一种特效（水果）的粒子超出上限时，优先淘汰该特效最早喷发的粒子
+    - 绘制：一次NumPy计算写入全部粒子像素，不再逐个调用cv2.rectangle
+    """
+    def __init__(self, budget=PARTICLE_BUDGET, effect_budget=PARTICLE_EFFECT_BUDGET):
+        """
+        :param budget: 全局粒子上限（即粒子池容量）
+        :param effect_budget: 单种特效的粒子上限
+        """
+        self.budget = budget
+        self.effect_budget = min(effect_budget, budget)
+        self.pool = ParticlePool(budget)
+        self.effect = np.zeros(budget, dtype=np.int16)   # 每个粒子所属的特效编号
+        self.burst = np.zeros(budget, dtype=np.int64)    # 每个粒子所属的喷发序号（越小越早）
+        self.effects = {}      # 特效名称 -> 编号
+        self._next_burst = 0
+        self.evicted = 0       # 因超出上限被提前淘汰的粒子数
+
+    def __len__(self):
+        return len(self.pool)
+
+    def emit(self, effect, x, y, color, rng=None, config=None):
+        """
+        在(x, y)喷发一组粒子
+        :param effect: 特效名称（水果名称，同时用于读取喷发参数）
+        :param color: 粒子颜色（BGR）
+        :param rng: 随机数生成器（random.Random实例，默认使用全局random模块）
+        :param config: 喷发参数（默认按特效名称读取emitter_config）
+        """
+        rng = rng or random
+        config = config or emitter_config(effect)
+        count = min(config['count'], self.effect_budget)
+        if count <= 0:
+            return
+        pool = self.pool
+
+        # 随机参数按粒子逐个抽取（保持与逐个创建粒子相同的随机序列），再一次写入各列
+        speed = config['speed']
+        size_min, size_max = config['size']
+        params = np.array([(rng.uniform(-speed, speed), rng.uniform(-speed, speed), rng.randint(size_min, size_max))
+                           for _ in range(count)], dtype=np.float64)
+        idx = self.reserve(effect, count)
+        pool.x[idx] = pool.prev_x[idx] = x
+        pool.y[idx] = pool.prev_y[idx] = y
+        pool.vx[idx] = params[:, 0]
+        pool.vy[idx] = params[:, 1]
+        pool.size[idx] = params[:, 2]
+        pool.life[idx] = config['life']
+        pool.color[idx] = color
+
+    def reserve(self, effect, count):
+        """
+        为一次喷发分配count个粒子槽位（超出上限时先淘汰最早喷发的粒子），由调用方写入粒子参数
+        :param effect: 特效名称
+        :param count: 粒子数（不超过单特效上限）
+        :return: 槽位下标数组
+        """
+        pool = self.pool
+        count = min(count, self.effect_budget)
+        effect_id = self.effects.setdefault(effect, len(self.effects))
+        # 先按单特效上限、再按全局上限淘汰最早喷发的粒子
+        live = pool.used & pool.active
+        self._evict(live & (self.effect == effect_id), self.effect_budget - count)
+        self._evict(pool.used & pool.active, self.budget - count)
+        idx = pool.allocate_many(count)
+        self.effect[idx] = effect_id
+        self.burst[idx] = self._next_burst
+        self._next_burst += 1
+        return idx
+
+    def _evict(self, mask, keep):
+        """mask中的粒子多于keep个时，按喷发先后淘汰最早的粒子"""
+        idx = np.flatnonzero(mask)
+        excess = len(idx) - max(keep, 0)
+        if excess <= 0:
+            return
+        oldest = idx[np.argsort(self.burst[idx], kind='stable')[:excess]]
+        self.pool.release(oldest)
+        self.evicted += excess
+
+    def step(self):
+        """批量执行一个模拟步，并回收生命周期结束的粒子"""
+        self.pool.step()
+        self.pool.compact()
+
+    def clear(self):
+        self.pool.clear()
+
+    def draw(self, frame, alpha=1.0, scale=1.0):
+        """
+        批量绘制全部存活粒子（填充矩形，与cv2.rectangle的像素覆盖一致）：
+        一次NumPy计算出全部粒子覆盖的像素并写入画面，后喷发的粒子覆盖先喷发的
+        :param alpha: 渲染插值系数
+        :param scale: 逻辑坐标到画布坐标的缩放系数
+        :return: 每次喷发的粒子外接矩形列表(x0, y0, x1, y1)，用于脏矩形渲染
+        """
+        pool = self.pool
+        idx = np.flatnonzero(pool.used & pool.active)
+        if not len(idx):
+            return []
+        # 按喷发先后排序（同一次喷发内按槽位，即创建顺序）
+        idx = idx[np.argsort(self.burst[idx], kind='stable')]
+        x = (pool.prev_x[idx] + (pool.x[idx] - pool.prev_x[idx]) * alpha) * scale
+        y = (pool.prev_y[idx] + (pool.y[idx] - pool.prev_y[idx]) * alpha) * scale
+        size = pool.size[idx] * scale
+        # 与int()一致向零取整
+        x0, y0 = (x - size).astype(np.int64), (y - size).astype(np.int64)
+        x1, y1 = (x + size).astype(np.int64), (y + size).astype(np.int64)
+
+        h, w = frame.shape[:2]
+        if frame.flags.c_contiguous:
+            flat = frame.reshape(-1, frame.shape[2])
+            # 裁剪到画面内，按最大边长生成偏移网格，掩码去掉每个粒子范围外的像素
+            cx0, cy0 = np.maximum(x0, 0), np.maximum(y0, 0)
+            cx1, cy1 = np.minimum(x1, w - 1), np.minimum(y1, h - 1)
+            visible = (cx0 <= cx1) & (cy0 <= cy1)
+            if visible.any():
+                cx0, cy0, cx1, cy1 = cx0[visible], cy0[visible], cx1[visible], cy1[visible]
+                colors = pool.color[idx[visible]]
+                kw, kh = int((cx1 - cx0).max()) + 1, int((cy1 - cy0).max()) + 1
+                xs = cx0[:, None, None] + np.arange(kw)[None, None, :]
+                ys = cy0[:, None, None] + np.arange(kh)[None, :, None]
+                mask = (xs <= cx1[:, None, None]) & (ys <= cy1[:, None, None])
+                pixels = (ys * w + xs)[mask]
+                # 重复的像素下标按顺序赋值，后写入的（后喷发的）粒子生效
+                flat[pixels] = np.broadcast_to(colors[:, None, None, :], mask.shape + (3,))[mask]
+        else:
+            # 非连续画面（如视图）无法展平写入，逐个绘制
+            for i, j in enumerate(idx):
+                cv2.rectangle(frame, (int(x0[i]), int(y0[i])), (int(x1[i]), int(y1[i])),
+                              tuple(int(c) for c in pool.color[j]), -1)
+
+        # 每次喷发一个外接矩形
+        bursts, inverse = np.unique(self.burst[idx], return_inverse=True)
+        rx0 = np.full(len(bursts), np.iinfo(np.int64).max)
+        ry0 = np.full(len(bursts), np.iinfo(np.int64).max)
+        rx1 = np.full(len(bursts), np.iinfo(np.int64).min)
+        ry1 = np.full(len(bursts), np.iinfo(np.int64).min)
+        np.minimum.at(rx0, inverse, x0)
+        np.minimum.at(ry0, inverse, y0)
+        np.maximum.at(rx1, inverse, x1)
+        np.maximum.at(ry1, inverse, y1)
+        return list(zip(rx0.tolist(), ry0.tolist(), rx1.tolist(), ry1.tolist()))
@@ -0,0 +1,266 @@
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+
+from config import WIDTH, HEIGHT, TRACKING_ROI_SCALE, TRACKING_ROI_INPUT
+from profiler import NULL_PROFILER
+from tracking import FingertipPredictor, InferenceScheduler
+
+# 一帧摄像头画面：序号、采集时间戳、镜像后的BGR图像
+CameraFrame = namedtuple('CameraFrame', ['seq', 'timestamp', 'image'])
+# 一次手部追踪结果：对应的帧序号、采集时间戳、指尖坐标列表（逻辑坐标）、是否为预测值（本帧未推理）
+HandSample = namedtuple('HandSample', ['seq', 'timestamp', 'tips', 'predicted'], defaults=(False,))
+
+
+class LatestFrameBuffer:
+    """最新帧优先的环形缓冲区：写满后覆盖最旧的帧，并统计被丢弃的帧数"""
+    def __init__(self, capacity=2):
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._write = 0          # 下一个写入位置
+        self._unread = 0         # 尚未被消费的帧数（队列深度）
+        self._cond = threading.Condition()
+        self.dropped = 0         # 未被消费就被覆盖的帧数
+        self.max_depth = 0       # 观察到的最大队列深度
+
+    def put(self, item):
+        """写入一帧（永不阻塞）"""
+        with self._cond:
+            if self._unread == self.capacity:
+                self.dropped += 1
+            else:
+                self._unread += 1
+            self._slots[self._write] = item
+            self._write = (self._write + 1) % self.capacity
+            self.max_depth = max(self.max_depth, self._unread)
+            self._cond.notify_all()
+
+    def latest(self):
+        """查看最新的一帧（不消费），没有则返回None"""
+        with self._cond:
+            return self._slots[(self._write - 1) % self.capacity]
+
+    def take_latest(self, timeout=None):
+        """取出最新的一帧并丢弃更旧的未读帧，超时返回None"""
+        with self._cond:
+            if not self._unread and not self._cond.wait_for(lambda: self._unread > 0, timeout):
+                return None
+            # 被跳过的旧帧也计入丢帧数
+            self.dropped += self._unread - 1
+            self._unread = 0
+            return self._slots[(self._write - 1) % self.capacity]
+
+    @property
+    def depth(self):
+        with self._cond:
+            return self._unread
+
+
+class CaptureThread(threading.Thread):
+    """摄像头采集线程：读取、镜像后写入最新帧缓冲区"""
+    def __init__(self, cap, buffer):
+        super().__init__(name='camera-capture', daemon=True)
+        self.cap = cap
+        self.buffer = buffer
+        self.frames = 0          # 采集成功的帧数
+        self.failed = False      # 摄像头读取失败标记
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            success, frame = self.cap.read()
+            if not success:
+                self.failed = True
+                break
+            timestamp = time.perf_counter()
+            # 水平翻转帧（镜像效果，操作更直观）
+            frame = cv2.flip(frame, 1)
+            self.frames += 1
+            self.buffer.put(CameraFrame(self.frames, timestamp, frame))
+
+    def stop(self):
+        self._stop_event.set()
+
+
+class HandTrackingWorker(threading.Thread):
+    """
+    手部追踪线程：按调度器决定对最新帧执行推理或发布预测值，发布带时间戳的指尖坐标
+    全帧检测在缩小后的画面上进行；锁定手部后只裁剪指尖附近的ROI送入推理
+    全帧与ROI使用各自的手部追踪图：视频模式会沿用上一次的结果跟踪，而ROI每次的裁剪位置都不同，
+    两种输入交替送入同一个视频模式实例会让跟踪结果错位
+    """
+    def __init__(self, hands, buffer, profiler=None, input_size=None, coord_size=(WIDTH, HEIGHT),
+                 scheduler=None, roi_scale=TRACKING_ROI_SCALE, roi_input=TRACKING_ROI_INPUT, roi_hands=None):
+        """
+        :param hands: 全帧检测用的手部追踪图（视频模式）
+        :param input_size: 全帧推理输入分辨率(宽, 高)，摄像头画面先缩小到该尺寸再送入MediaPipe（None表示不缩放）
+        :param coord_size: 输出指尖坐标所用的坐标系尺寸（默认逻辑分辨率，与摄像头和推理分辨率无关）
+        :param scheduler: 推理调度器（默认按config中的推理预算创建）
+        :param roi_scale: ROI边长（相对摄像头画面高度）
+        :param roi_input: ROI送入推理前缩放到的边长
+        :param roi_hands: ROI推理用的手部追踪图（静态图片模式）；为None时不使用ROI，每次都做全帧检测
+        """
+        super().__init__(name='hand-tracking', daemon=True)
+        self.hands = hands
+        self.roi_hands = roi_hands
+        self.buffer = buffer
+        self.profiler = profiler or NULL_PROFILER
+        self.input_size = tuple(input_size) if input_size else None
+        self.coord_size = coord_size
+        self.scheduler = scheduler or InferenceScheduler()
+        self.roi_scale = roi_scale
+        self.roi_input = roi_input
+        self.predictors = []     # 每只手一个指尖预测器
+        self._sample = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    @property
+    def inferences(self):
+        """推理次数"""
+        return self.scheduler.inferences
+
+    def run(self):
+        while not self._stop_event.is_set():
+            item = self.buffer.take_latest(timeout=0.1)
+            if item is None:
+                continue
+            timestamp = item.timestamp
+            scheduler = self.scheduler
+            speed = max((p.speed for p in self.predictors), default=0.0)
+
+            if scheduler.due(timestamp, speed):
+                roi = None
+                if self.roi_hands is not None and scheduler.use_roi(timestamp):
+                    roi = self._roi(item.image, timestamp)
+                with self.profiler.scope('inference'):
+                    tips = self._infer(item.image, roi)
+                scheduler.record(timestamp, roi is not None, bool(tips))
+                self._update_predictors(tips, timestamp)
+                sample = HandSample(item.seq, timestamp, tips)
+            else:
+                # 跳过推理：用常速度预测补齐这一帧的指尖位置
+                predicted = [p.predict(timestamp) for p in self.predictors]
+                tips = [(int(pt[0]), int(pt[1])) for pt in predicted if pt is not None]
+                if not tips:
+                    continue
+                scheduler.skip()
+                sample = HandSample(item.seq, timestamp, tips, True)
+
+            with self._lock:
+                self._sample = sample
+
+    def _roi(self, image, timestamp):
+        """以预测的指尖位置为中心计算ROI(x0, y0, x1, y1)（摄像头像素坐标），无法预测时返回None"""
+        points = [p.predict(timestamp) or (p.x, p.y) for p in self.predictors]
+        if not points:
+            return None
+        h, w = image.shape[:2]
+        sx, sy = w / self.coord_size[0], h / self.coord_size[1]
+        xs = [pt[0] * sx for pt in points]
+        ys = [pt[1] * sy for pt in points]
+        # 正方形ROI，覆盖全部指尖，并限制在画面内
+        half = self.roi_scale * h / 2
+        side = min(max(max(xs) - min(xs), max(ys) - min(ys)) + 2 * half, w, h)
+        cx, cy = (min(xs) + max(xs)) / 2, (min(ys) + max(ys)) / 2
+        x0 = int(min(max(cx - side / 2, 0), w - side))
+        y0 = int(min(max(cy - side / 2, 0), h - side))
+        return x0, y0, x0 + int(side), y0 + int(side)
+
+    def _infer(self, image, roi=None):
+        """对全帧（缩小后）或ROI执行一次推理，返回逻辑坐标下的指尖列表"""
+        h, w = image.shape[:2]
+        if roi is not None:
+            x0, y0, x1, y1 = roi
+            image = image[y0:y1, x0:x1]
+            size = (self.roi_input, self.roi_input)
+        else:
+            x0, y0, x1, y1 = 0, 0, w, h
+            size = self.input_size
+        # 缩小到推理分辨率并转换颜色空间（MediaPipe需要RGB格式）
+        if size and image.shape[1::-1] != size:
+            image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        rgb_frame = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        results = (self.hands if roi is None else self.roi_hands).process(rgb_frame)
+
+        tips = []
+        if results.multi_hand_landmarks:
+            sx, sy = self.coord_size[0] / w, self.coord_size[1] / h
+            for hand_lm in results.multi_hand_landmarks:
+                # 食指指尖（第8个关键点）的归一化坐标是相对推理区域的，先换回摄像头像素再换算到逻辑坐标
+                lm = hand_lm.landmark[8]
+                tips.append((int((x0 + lm.x * (x1 - x0)) * sx), int((y0 + lm.y * (y1 - y0)) * sy)))
+        return tips
+
+    def _update_predictors(self, tips, timestamp):
+        """把新检测到的指尖与已有预测器按最近距离配对，未配对的指尖新建预测器"""
+        remaining = list(self.predictors)
+        predictors = []
+        for x, y in tips:
+            best = min(remaining, key=lambda p: (p.x - x) ** 2 + (p.y - y) ** 2, default=None)
+            if best is not None:
+                remaining.remove(best)
+                best.update(x, y, timestamp)
+                predictors.append(best)
+            else:
+                predictors.append(FingertipPredictor(x, y, timestamp))
+        self.predictors = predictors
+
+    def latest(self):
+        """获取最新的手部追踪结果，尚无结果时返回None"""
+        with self._lock:
+            return self._sample
+
+    def stop(self):
+        self._stop_event.set()
+
+
+class TrackingPipeline:
+    """采集与手部追踪流水线：与渲染循环解耦，渲染循环只读取最新结果"""
+    def __init__(self, cap, hands, capacity=2, profiler=None, input_size=None, roi_hands=None):
+        """
+        :param input_size: 手部追踪推理输入分辨率(宽, 高)
+        :param roi_hands: ROI推理用的手部追踪图（静态图片模式，为None时只做全帧检测）
+        """
+        # 推理线程消费缓冲区中的帧，渲染循环只查看最新帧（不消费）
+        self.buffer = LatestFrameBuffer(capacity)
+        self.capture = CaptureThread(cap, self.buffer)
+        self.tracker = HandTrackingWorker(hands, self.buffer, profiler, input_size, roi_hands=roi_hands)
+
+    def start(self):
+        self.capture.start()
+        self.tracker.start()
+
+    def stop(self, timeout=1.0):
+        self.capture.stop()
+        self.tracker.stop()
+        self.capture.join(timeout)
+        self.tracker.join(timeout)
+
+    @property
+    def failed(self):
+        return self.capture.failed
+
+    def latest_frame(self):
+        """获取最新的摄像头帧（不阻塞，调用方不得修改图像），尚无画面时返回None"""
+        return self.buffer.latest()
+
+    def latest_hand(self):
+        """获取最新的手部追踪结果（不阻塞），尚无结果时返回None"""
+        return self.tracker.latest()
+
+    def stats(self):
+        """流水线计数器：采集帧数、推理次数（含ROI推理与预测帧）、每秒推理次数、队列深度与丢帧数"""
+        scheduler = self.tracker.scheduler
+        return {
+            'captured': self.capture.frames,
+            'inferences': scheduler.inferences,
+            'roi_inferences': scheduler.roi_inferences,
+            'predicted': scheduler.predictions,
+            'inference_rate': scheduler.rate(time.perf_counter()),
+            'queue_depth': self.buffer.depth,
+            'max_queue_depth': self.buffer.max_depth,
+            'dropped': self.buffer.dropped,
+        }
@@ -0,0 +1,145 @@
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+
+class StageHistogram:
+    """单个阶段的滚动耗时记录（固定长度环形数组，单位毫秒）"""
+    def __init__(self, size=240):
+        self.values = np.zeros(size, dtype=np.float64)
+        self.count = 0
+
+    def add(self, ms):
+        self.values[self.count % len(self.values)] = ms
+        self.count += 1
+
+    def summary(self):
+        """最近一段时间的均值、分位数和最大值"""
+        v = self.values[:min(self.count, len(self.values))]
+        if not len(v):
+            return {'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0, 'count': 0}
+        p50, p95 = np.percentile(v, (50, 95))
+        return {'mean': float(v.mean()), 'p50': float(p50), 'p95': float(p95), 'max': float(v.max()),
+                'count': self.count}
+
+
+class _Scope:
+    """计时作用域：退出时把耗时记入所属的性能分析器"""
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter())
+        return False
+
+
+class _NullScope:
+    """关闭分析时返回的空作用域（不计时）"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class Profiler:
+    """
+    分阶段帧耗时分析器：命名计时作用域、滚动直方图、Chrome trace导出
+    关闭时scope()直接返回共享的空作用域，开销只有一次属性判断
+    """
+    def __init__(self, enabled=False, history=240, trace=False, max_events=200000):
+        """
+        :param enabled: 是否记录耗时
+        :param history: 每个阶段保留的最近样本数
+        :param trace: 是否保留逐次事件用于导出Chrome trace
+        :param max_events: trace事件上限（超出后丢弃最旧的事件）
+        """
+        self.enabled = enabled
+        self.trace = trace
+        self.history = history
+        self.max_events = max_events
+        self.stages = {}       # 阶段名 -> StageHistogram
+        self.events = []       # (阶段名, 开始时间, 结束时间, 线程ID)
+        self._scopes = {}      # (阶段名, 线程ID) -> _Scope（每个线程各自复用）
+        self._frame_hist = StageHistogram(history)
+        self._last_frame = None
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def scope(self, name):
+        """返回名为name的计时作用域（with profiler.scope('stage'): ...）"""
+        if not self.enabled:
+            return _NULL_SCOPE
+        key = (name, threading.get_ident())
+        scope = self._scopes.get(key)
+        if scope is None:
+            scope = self._scopes[key] = _Scope(self, name)
+        return scope
+
+    def record(self, name, start, end):
+        """记录一次阶段耗时（start/end为time.perf_counter()时间）"""
+        with self._lock:
+            hist = self.stages.get(name)
+            if hist is None:
+                hist = self.stages[name] = StageHistogram(self.history)
+            hist.add((end - start) * 1000)
+            if self.trace:
+                if len(self.events) >= self.max_events:
+                    del self.events[:self.max_events // 10]
+                self.events.append((name, start, end, threading.get_ident()))
+
+    def frame(self):
+        """标记一帧结束，用于统计帧率"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._last_frame is not None:
+            self._frame_hist.add((now - self._last_frame) * 1000)
+        self._last_frame = now
+
+    @property
+    def fps(self):
+        mean = self._frame_hist.summary()['mean']
+        return 1000.0 / mean if mean > 0 else 0.0
+
+    def summary(self):
+        """各阶段耗时统计与帧率"""
+        with self._lock:
+            stages = {name: hist.summary() for name, hist in self.stages.items()}
+        return {'fps': self.fps, 'frame': self._frame_hist.summary(), 'stages': stages}
+
+    def export_json(self, path):
+        """导出统计摘要为JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def export_chrome_trace(self, path):
+        """导出Chrome trace格式（chrome://tracing 或 Perfetto 打开）"""
+        with self._lock:
+            events = list(self.events)
+        pid = os.getpid()
+        trace = [{'name': name, 'ph': 'X', 'pid': pid, 'tid': tid,
+                  'ts': (start - self._origin) * 1e6, 'dur': (end - start) * 1e6}
+                 for name, start, end, tid in events]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f)
+
+
+# 默认的关闭状态分析器（未传入分析器的模块共用）
+NULL_PROFILER = Profiler(enabled=False)
@@ -0,0 +1,216 @@
+"""
+对局录制：渲染线程只把画面复制进预分配的帧缓冲，编码和日志写入都在后台线程完成
+同时写出一份紧凑的JSON Lines日志（随机种子、每帧指尖采样/按键/模拟步数与游戏事件），
+引擎是确定性的，可以用日志按任意分辨率重新渲染整局
+
+重新渲染（项目根目录）：
+    python recorder.py session.jsonl --output replay.mp4 --size 1920x1080
+"""
+import argparse
+import json
+import math
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from config import (OUTPUT_SIZE, RECORD_FPS, RECORD_SIZE, RECORD_BUFFERS, RECORD_DROP, RECORD_FOURCC)
+from utils import letterbox
+
+
+class SessionRecorder(threading.Thread):
+    """
+    异步录制线程：
+    - write()把画面复制进预分配的环形帧缓冲（按录制帧率抽帧），缓冲用尽时按策略丢帧，永不阻塞
+    - log()追加一条日志记录，与画面一起由后台线程写入磁盘
+    """
+    def __init__(self, path, header=None, size=RECORD_SIZE, fps=RECORD_FPS, buffers=RECORD_BUFFERS,
+                 drop=RECORD_DROP, fourcc=RECORD_FOURCC):
+        """
+        :param path: 输出路径前缀（生成<前缀>.mp4与<前缀>.jsonl）
+        :param header: 写在日志第一行的会话信息（随机种子、玩家数等）
+        :param size: 录制分辨率(宽, 高)，默认与窗口输出分辨率相同
+        :param fps: 录制帧率
+        :param buffers: 预分配的帧缓冲数量
+        :param drop: 丢帧策略：'newest'丢弃新帧，'oldest'覆盖最早的待编码帧
+        :param fourcc: 视频编码器
+        """
+        super().__init__(name='recorder', daemon=True)
+        self.video_path = f'{path}.mp4'
+        self.log_path = f'{path}.jsonl'
+        self.header = dict(header or {}, type='session')
+        self.size = tuple(size or OUTPUT_SIZE)
+        self.fps = fps
+        self.drop = drop
+        self.fourcc = fourcc
+        # 预分配的帧缓冲：空闲槽位栈 + 待编码队列，正在编码的槽位两边都不在
+        self._buffers = [np.empty((self.size[1], self.size[0], 3), dtype=np.uint8) for _ in range(buffers)]
+        self._free = list(range(buffers))
+        self._pending = deque()
+        self._records = []               # 待写入的日志记录
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._next_due = -math.inf       # 下一次抽帧的时间
+        self.accepted = 0                # 放入缓冲的帧数
+        self.encoded = 0                 # 已编码的帧数
+        self.dropped = 0                 # 因缓冲用尽被丢弃的帧数
+        self.error = None                # 视频写入器打开失败的原因（日志照常写入）
+
+    def due(self, now=None):
+        """按录制帧率，当前是否需要录制一帧"""
+        return (time.perf_counter() if now is None else now) >= self._next_due
+
+    def write(self, frame, now=None):
+        """
+        录制一帧画面（渲染线程调用，只做一次复制或缩放）
+        :return: 该帧是否放入了缓冲
+        """
+        now = time.perf_counter() if now is None else now
+        if now < self._next_due:
+            return False
+        interval = 1.0 / self.fps
+        # 落后超过一帧时不补录，从当前时间重新计时
+        self._next_due = max(self._next_due + interval, now)
+        with self._cond:
+            if self._free:
+                slot = self._free.pop()
+            elif self.drop == 'oldest' and self._pending:
+                slot = self._pending.popleft()
+                self.dropped += 1
+            else:
+                self.dropped += 1
+                return False
+        # 槽位已从空闲栈和待编码队列中取出，复制时无需持锁
+        buffer = self._buffers[slot]
+        if frame.shape[1::-1] == self.size:
+            np.copyto(buffer, frame)
+        else:
+            letterbox(frame, self.size, cv2.INTER_AREA, dst=buffer)
+        with self._cond:
+            self._pending.append(slot)
+            self.accepted += 1
+            self._cond.notify()
+        return True
+
+    def log(self, record):
+        """追加一条日志记录（字典，写入时序列化为一行JSON）"""
+        with self._cond:
+            self._records.append(record)
+
+    def run(self):
+        writer = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, self.size)
+        if not writer.isOpened():
+            writer = None
+            self.error = f"无法打开视频写入器 {self.video_path}"
+            print(f"警告: {self.error}，只写入日志")
+        with open(self.log_path, 'w', encoding='utf-8') as log:
+            log.write(json.dumps(self.header, separators=(',', ':')) + '\n')
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._pending or self._stopping, timeout=0.2)
+                    slot = self._pending.popleft() if self._pending else None
+                    records, self._records = self._records, []
+                    finished = self._stopping and slot is None
+                for record in records:
+                    log.write(json.dumps(record, separators=(',', ':')) + '\n')
+                if slot is not None:
+                    if writer is not None:
+                        writer.write(self._buffers[slot])
+                        self.encoded += 1
+                    with self._cond:
+                        self._free.append(slot)
+                if finished:
+                    break
+        if writer is not None:
+            writer.release()
+
+    def stop(self, timeout=10.0):
+        """编码完全部已缓冲的帧后停止"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self.is_alive():
+            self.join(timeout)
+
+    def stats(self):
+        return {
+            'accepted': self.accepted,
+            'encoded': self.encoded,
+            'dropped': self.dropped,
+            'backlog': len(self._pending),
+        }
+
+
+def load_session(path):
+    """读取录制日志，返回(会话信息, 帧记录列表)"""
+    header, frames = None, []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if record.get('type') == 'session':
+                header = record
+            elif record.get('type') == 'frame':
+                frames.append(record)
+    if header is None:
+        raise ValueError(f"{path} 不是录制日志（缺少会话信息）")
+    return header, frames
+
+
+def replay_session(path, output, output_size=OUTPUT_SIZE, render_scale=1.0, fps=RECORD_FPS):
+    """
+    用录制日志按指定分辨率重新渲染整局：按记录的随机种子创建引擎，逐帧回放指尖采样、按键、
+    模拟步数和插值系数（使用背景图；录制时用摄像头画面作背景的部分以背景图代替）
+    :param output: 输出视频路径
+    :param output_size: 输出分辨率(宽, 高)
+    :param render_scale: 内部渲染缩放
+    :return: 回放报告（帧数、得分、与录制事件不一致的帧数）
+    """
+    from engine import GameEngine
+    from resources import ResourceManager, render_size
+
+    header, frames = load_session(path)
+    R = ResourceManager(audio=False, size=render_size(output_size, render_scale))
+    engine = GameEngine(R, seed=header['seed'], players=header.get('players', 1))
+    writer = cv2.VideoWriter(output, cv2.VideoWriter_fourcc(*RECORD_FOURCC), fps, tuple(output_size))
+    mismatched = 0
+    for record in frames:
+        tips = [tuple(t) for t in record.get('tips', ())]
+        engine.feed_hands(tips, record.get('ts'), record.get('now'))
+        engine.update(record.get('key', -1), record['steps'])
+        # 事件经JSON往返后再比较，确认回放与录制一致
+        if json.loads(json.dumps(engine.events)) != record.get('events', []):
+            mismatched += 1
+        frame = engine.draw(R.background.copy(), record.get('alpha', 1.0))
+        if frame.shape[1::-1] != tuple(output_size):
+            frame = letterbox(frame, tuple(output_size))
+        writer.write(frame)
+    writer.release()
+    return {
+        'frames': len(frames),
+        'score': engine.score,
+        'players': [{'score': p.score, 'lives': p.lives} for p in engine.players],
+        'mismatched': mismatched,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='按任意分辨率重新渲染录制的对局')
+    parser.add_argument('session', help='录制日志（<前缀>.jsonl）')
+    parser.add_argument('--output', default='replay.mp4', help='输出视频路径')
+    parser.add_argument('--size', default=f'{OUTPUT_SIZE[0]}x{OUTPUT_SIZE[1]}', help='输出分辨率，如1920x1080')
+    parser.add_argument('--render-scale', type=float, default=1.0, help='内部渲染缩放')
+    parser.add_argument('--fps', type=float, default=RECORD_FPS, help='输出视频帧率')
+    args = parser.parse_args()
+
+    size = tuple(int(v) for v in args.size.lower().split('x'))
+    report = replay_session(args.session, args.output, size, args.render_scale, args.fps)
+    print(json.dumps(report, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+class DirtyRectRenderer:
+    """
+    脏矩形渲染器：复用同一张画布，每帧只把上一帧绘制过的区域从背景缓存中恢复，
+    而不是整帧复制背景；全屏效果（炸弹闪屏、覆盖层）标记为整帧重绘
+    """
+    def __init__(self, background, max_rects=128, full_ratio=0.6):
+        """
+        :param background: 背景图像（不会被修改）
+        :param max_rects: 单帧脏矩形数量上限，超出后下一帧整帧恢复
+        :param full_ratio: 脏矩形总面积超过画面的该比例时整帧恢复
+        """
+        self.background = background
+        self.canvas = background.copy()
+        self.height, self.width = background.shape[:2]
+        self.max_rects = max_rects
+        self.full_area = full_ratio * self.width * self.height
+        self.rects = []          # 本帧绘制过的区域
+        self.full = False        # 本帧是否需要整帧恢复
+        self._restore = []       # 下一帧开始时需要恢复的区域
+        self._restore_full = False
+        self.restored_pixels = 0  # 上一帧恢复的像素数（统计用）
+
+    def begin(self):
+        """开始新的一帧：恢复上一帧的脏区域，返回可直接绘制的画布"""
+        if self._restore_full:
+            self.canvas[:] = self.background
+            self.restored_pixels = self.width * self.height
+        else:
+            self.restored_pixels = 0
+            for x0, y0, x1, y1 in self._restore:
+                self.canvas[y0:y1, x0:x1] = self.background[y0:y1, x0:x1]
+                self.restored_pixels += (x1 - x0) * (y1 - y0)
+        self.rects = []
+        self.full = False
+        return self.canvas
+
+    def mark(self, rect):
+        """登记本帧绘制过的矩形(x0, y0, x1, y1)，超出画面的部分会被裁剪"""
+        if rect is None or self.full:
+            return
+        x0, y0, x1, y1 = self._clip(rect)
+        if x0 < x1 and y0 < y1:
+            self.rects.append((x0, y0, x1, y1))
+
+    def mark_full(self):
+        """本帧有全屏绘制，下一帧整帧恢复"""
+        self.full = True
+
+    def restore(self, rect):
+        """立即把画布上的矩形区域恢复为背景（擦除内容已变化的常驻元素）"""
+        x0, y0, x1, y1 = self._clip(rect)
+        if x0 < x1 and y0 < y1:
+            self.canvas[y0:y1, x0:x1] = self.background[y0:y1, x0:x1]
+
+    def touched(self, rect):
+        """
+        矩形区域在本帧是否被改写过：开始时恢复过（上一帧的脏区域或整帧恢复）、本帧已绘制过或有全屏绘制；
+        不登记脏区域的常驻元素（HUD）只在被改写过或内容变化时才需要重新绘制
+        """
+        if self._restore_full or self.full:
+            return True
+        x0, y0, x1, y1 = self._clip(rect)
+        for rx0, ry0, rx1, ry1 in self._restore + self.rects:
+            if rx0 < x1 and x0 < rx1 and ry0 < y1 and y0 < ry1:
+                return True
+        return False
+
+    def _clip(self, rect):
+        x0, y0, x1, y1 = rect
+        return max(int(x0), 0), max(int(y0), 0), min(int(x1) + 1, self.width), min(int(y1) + 1, self.height)
+
+    def end(self):
+        """结束本帧：确定下一帧需要恢复的区域"""
+        area = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in self.rects)
+        self._restore_full = self.full or len(self.rects) > self.max_rects or area > self.full_area
+        self._restore = self.rects
+
+
+class _NullDirty:
+    """不记录脏区域的空实现（整帧重绘时使用）"""
+    def mark(self, rect):
+        pass
+
+    def mark_full(self):
+        pass
+
+    def restore(self, rect):
+        pass
+
+    def touched(self, rect):
+        # 每帧都是新画布，常驻元素每帧都要绘制
+        return True
+
+
+NULL_DIRTY = _NullDirty()
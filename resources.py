@@ -1,71 +1,252 @@
+import hashlib
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import cv2
 import numpy as np
-import pygame
-from config import WIDTH, HEIGHT, FRUIT_CONFIG
+from config import (WIDTH, HEIGHT, OUTPUT_SIZE, RENDER_SCALE, FRUIT_CONFIG, ROTATION_STEP, ROTATION_CACHE_SIZE,
+                    ASSET_WORKERS, ASSET_CACHE_DIR, SOUND_CONFIG)
+from audio import AudioMixer, create_backend
+from utils import rotate_image, premultiply
+
+# 磁盘缓存格式版本（预处理方式改变时递增，旧缓存自动失效）
+CACHE_VERSION = 1
+
+
+def render_size(output_size=OUTPUT_SIZE, render_scale=RENDER_SCALE):
+    """
+    计算内部渲染画布尺寸：保持逻辑分辨率宽高比、能放进输出分辨率的最大尺寸，再乘以渲染缩放
+    （输出宽高比不同时画布不会被拉伸，输出时由utils.letterbox补黑边）
+    :return: (宽, 高)
+    """
+    fit = min(output_size[0] / WIDTH, output_size[1] / HEIGHT) * render_scale
+    w = max(1, int(round(WIDTH * fit)))
+    # 高度由宽度推算，保证横纵缩放系数一致（ResourceManager.scale按宽度计算）
+    h = max(1, int(round(w * HEIGHT / WIDTH)))
+    return w, h
 
 
 class ResourceManager:
-    def __init__(self):
+    def __init__(self, audio=True, size=None, cache_dir=ASSET_CACHE_DIR, workers=ASSET_WORKERS):
+        """
+        :param audio: 是否立即启动音频线程（无界面模拟传False，也可以传False后在后台线程调用init_audio()；
+                      没有音频设备时自动使用静音后端）
+        :param size: 内部渲染画布尺寸(宽, 高)，默认由OUTPUT_SIZE与RENDER_SCALE计算
+        :param cache_dir: 预处理精灵的磁盘缓存目录（None表示不使用缓存）
+        :param workers: 并行解码的线程数（None表示按CPU核数）
+        """
+        self.audio = False  # 音频线程是否已启动
+        self.mixer = None   # 异步音频线程（AudioMixer）
+        # 渲染画布尺寸与逻辑坐标到画布坐标的缩放系数（背景与精灵在加载时按该系数缩放）
+        self.size = size or render_size()
+        self.scale = self.size[0] / WIDTH
+        self.cache_dir = cache_dir
+        self.workers = workers
         self.images = {}
-        self.sounds = {}
         self.background = None
-        pygame.mixer.init()
+        # 旋转精灵缓存：(名称, 量化角度) -> (预乘BGR, 三通道反向alpha, 宽, 高)，LRU淘汰
+        self.rotation_cache = OrderedDict()
+        self.rotation_cache_size = ROTATION_CACHE_SIZE  # 缓存上限（加载精灵后确定）
+        self.icons = {}  # 缩放后的图标缓存：(名称, 尺寸) -> 图像
+        self.cache_hits = 0    # 本次加载命中磁盘缓存的资源数
+        self.cache_misses = 0  # 本次加载重新解码的资源数
+        self._stats_lock = threading.Lock()
         self.load_assets()
+        if audio:
+            self.init_audio()
 
     def load_assets(self):
-        # --- 加载背景 ---
-        bg_path = os.path.join('assets', 'background.jpg')
-        if os.path.exists(bg_path):
-            bg = cv2.imread(bg_path)
-            self.background = cv2.resize(bg, (WIDTH, HEIGHT))
-        else:
-            print("提示: 未找到 assets/background.jpg，将使用黑色背景。")
-            self.background = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
-
-        # --- 加载音效 ---
-        try:
-            slice_path = os.path.join('assets', 'slice.mp3')
-            if os.path.exists(slice_path):
-                self.sounds['slice'] = pygame.mixer.Sound(slice_path)
-                self.sounds['slice'].set_volume(0.6)
-
-            bomb_sound_path = os.path.join('assets', 'bomb.mp3')
-            if os.path.exists(bomb_sound_path):
-                self.sounds['bomb'] = pygame.mixer.Sound(bomb_sound_path)
-                self.sounds['bomb'].set_volume(1.0)
-        except Exception as e:
-            print(f"警告: 音效加载失败 - {e}")
-
-        # --- 加载图片 ---
+        """在线程池中并行解码背景和全部精灵（优先读取磁盘缓存），音效只登记路径"""
+        # 待加载的精灵：名称 -> (路径, 目标尺寸)
+        sprites = {}
         for name, config in FRUIT_CONFIG.items():
             base_path = os.path.join('assets', f'{name}.png')
-            half1_path = os.path.join('assets', f'{name}_1.png')
-            half2_path = os.path.join('assets', f'{name}_2.png')
-
-            if os.path.exists(base_path):
-                target_size = config['scale']
-                self.images[name] = self._load_and_resize(base_path, target_size)
-
-                # 加载切半图片，如果不存在则使用原图
-                self.images[f'{name}_1'] = self._load_and_resize(half1_path, target_size) if os.path.exists(
-                    half1_path) else self.images[name]
-                self.images[f'{name}_2'] = self._load_and_resize(half2_path, target_size) if os.path.exists(
-                    half2_path) else self.images[name]
-
+            if not os.path.exists(base_path):
+                continue
+            # 配置中的尺寸是逻辑像素，加载时一次换算为画布像素
+            target_size = config['scale'] * self.scale
+            sprites[name] = (base_path, target_size)
+            # 切半图片不存在时使用原图（在加载完成后处理）
+            for half in ('_1', '_2'):
+                half_path = os.path.join('assets', f'{name}{half}.png')
+                if os.path.exists(half_path):
+                    sprites[name + half] = (half_path, target_size)
         # 加载炸弹图片
         bomb_path = os.path.join('assets', 'bomb.png')
         if os.path.exists(bomb_path):
-            self.images['bomb'] = self._load_and_resize(bomb_path, 80)
+            sprites['bomb'] = (bomb_path, 80 * self.scale)
+
+        # cv2的解码与缩放会释放GIL，线程池即可并行
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            bg_path = os.path.join('assets', 'background.jpg')
+            background = pool.submit(self._load_background, bg_path) if os.path.exists(bg_path) else None
+            futures = {name: pool.submit(self._load_sprite, path, size) for name, (path, size) in sprites.items()}
+
+            # --- 加载背景 ---
+            if background is not None:
+                self.background = background.result()
+            else:
+                print("提示: 未找到 assets/background.jpg，将使用黑色背景。")
+                self.background = np.zeros((self.size[1], self.size[0], 3), dtype=np.uint8)
+
+            # --- 加载图片 ---
+            for name, future in futures.items():
+                entry = future.result()
+                if entry is None:
+                    continue
+                image, premul, alpha_inv = entry
+                self.images[name] = image
+                # 0度精灵直接放入旋转缓存，无需首次绘制时再预乘
+                h, w = image.shape[:2]
+                self.rotation_cache[(name, 0)] = (premul, alpha_inv, w, h)
+
+        for name in FRUIT_CONFIG:
+            if name in self.images:
+                for half in ('_1', '_2'):
+                    self.images.setdefault(name + half, self.images[name])
+        # 未配置上限时按全部精灵的全部量化角度计算，预热后不会发生淘汰
+        if self.rotation_cache_size is None:
+            self.rotation_cache_size = max(1, len(self.images) * (360 // ROTATION_STEP))
+
+    def _load_background(self, path):
+        """读取并缩放背景图（命中缓存时直接内存映射）"""
+        def build():
+            bg = cv2.imread(path)
+            return [cv2.resize(bg, self.size, interpolation=cv2.INTER_AREA)] if bg is not None else None
+        arrays = self._cached(path, tuple(self.size), ('image',), build)
+        return arrays[0] if arrays is not None else np.zeros((self.size[1], self.size[0], 3), dtype=np.uint8)
+
+    def _load_sprite(self, path, size):
+        """
+        读取、缩放并预乘一张精灵图片（命中缓存时直接内存映射）
+        :return: (BGRA图像, 预乘BGR, 三通道反向alpha)，读取失败时返回None
+        """
+        def build():
+            image = self._load_and_resize(path, size)
+            if image is None:
+                return None
+            # 没有alpha通道的图片补全为不透明BGRA，统一走预乘绘制路径
+            if image.ndim == 2:
+                image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGRA)
+            elif image.shape[2] == 3:
+                image = cv2.cvtColor(image, cv2.COLOR_BGR2BGRA)
+            premul, alpha_inv = premultiply(image)
+            return [image, premul, alpha_inv]
+        return self._cached(path, round(size, 3), ('image', 'premul', 'alpha_inv'), build)
+
+    def _cached(self, path, size, parts, build):
+        """
+        读取磁盘缓存中的预处理结果，未命中时调用build生成并写入缓存
+        缓存键包含缓存版本、源文件修改时间与大小、目标尺寸，任一变化都会重新生成
+        :param parts: 结果中各数组的名称（每个数组一个.npy文件）
+        :param build: 生成函数，返回与parts一一对应的数组列表（失败时返回None）
+        :return: 数组列表（命中缓存时为只读内存映射），或None
+        """
+        if self.cache_dir is None:
+            return build()
+        stat = os.stat(path)
+        base = os.path.splitext(os.path.basename(path))[0]
+        digest = hashlib.sha1(repr((CACHE_VERSION, base, stat.st_mtime_ns, stat.st_size, size)).encode()).hexdigest()
+        files = [os.path.join(self.cache_dir, f'{base}-{digest[:16]}.{part}.npy') for part in parts]
+        if all(os.path.exists(f) for f in files):
+            try:
+                arrays = [np.load(f, mmap_mode='r') for f in files]
+                with self._stats_lock:
+                    self.cache_hits += 1
+                return arrays
+            except (OSError, ValueError):
+                pass  # 缓存文件损坏时重新生成
+
+        arrays = build()
+        with self._stats_lock:
+            self.cache_misses += 1
+        if arrays is not None:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                for f, array in zip(files, arrays):
+                    # 先写临时文件再替换，避免多个进程同时启动时读到写了一半的文件
+                    tmp = f'{f}.{os.getpid()}.{threading.get_ident()}.tmp'
+                    with open(tmp, 'wb') as fp:
+                        np.save(fp, np.ascontiguousarray(array))
+                    os.replace(tmp, f)
+            except OSError as e:
+                print(f"警告: 资源缓存写入失败 - {e}")
+        return arrays
+
+    def init_audio(self):
+        """
+        初始化音频后端并启动音频线程（音效在首次播放时由音频线程解码）
+        pygame在这里才导入，可以放到后台线程执行，不阻塞首帧
+        """
+        paths = {}
+        for name in SOUND_CONFIG:
+            path = os.path.join('assets', f'{name}.mp3')
+            if os.path.exists(path):
+                paths[name] = path
+        mixer = AudioMixer(create_backend(), paths)
+        mixer.start()
+        self.mixer = mixer
+        self.audio = True
+
+    def close(self):
+        """停止音频线程并关闭混音器"""
+        if self.audio:
+            self.mixer.stop()
+            self.audio = False
 
     def _load_and_resize(self, path, size):
         img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
         if img is None: return None
         h, w = img.shape[:2]
         scale = size / max(h, w)
-        new_w, new_h = int(w * scale), int(h * scale)
+        new_w, new_h = max(1, int(w * scale)), max(1, int(h * scale))
         return cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_AREA)
 
+    def get_rotated(self, name, angle):
+        """获取按量化角度旋转并预乘alpha后的精灵（首次使用时生成并缓存）"""
+        image = self.images.get(name)
+        if image is None or image.shape[2] != 4:
+            return None
+
+        # 角度量化到ROTATION_STEP的整数倍，限制在[0, 360)内
+        step = int(round(angle / ROTATION_STEP)) % (360 // ROTATION_STEP)
+        key = (name, step)
+        entry = self.rotation_cache.get(key)
+        if entry is not None:
+            self.rotation_cache.move_to_end(key)
+            return entry
+
+        rotated = rotate_image(image, step * ROTATION_STEP) if step else image
+        premul, alpha_inv = premultiply(rotated)
+        h, w = rotated.shape[:2]
+        entry = (premul, alpha_inv, w, h)
+        self.rotation_cache[key] = entry
+        # 超出上限时淘汰最久未使用的条目
+        if len(self.rotation_cache) > self.rotation_cache_size:
+            self.rotation_cache.popitem(last=False)
+        return entry
+
+    def get_icon(self, name, size):
+        """获取缩放到size x size的图标（只缩放一次并缓存）"""
+        key = (name, size)
+        if key not in self.icons:
+            image = self.images.get(name)
+            self.icons[key] = cv2.resize(image, (size, size)) if image is not None else None
+        return self.icons[key]
+
+    def warm_rotation_cache(self, names=None):
+        """
+        预先生成指定精灵全部量化角度的缓存（默认全部已加载图片）
+        缓存已满时停止，不为预热淘汰已缓存的条目
+        """
+        for name in (names or list(self.images)):
+            for step in range(360 // ROTATION_STEP):
+                if len(self.rotation_cache) >= self.rotation_cache_size and (name, step) not in self.rotation_cache:
+                    return
+                self.get_rotated(name, step * ROTATION_STEP)
+
     def play_sound(self, name):
-        if name in self.sounds:
-            self.sounds[name].play()
+        """投递一次播放请求（不阻塞，音频线程尚未启动时忽略）"""
+        if self.mixer is not None:
+            self.mixer.play(name)
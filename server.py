@@ -0,0 +1,307 @@
+"""
+多会话服务：在一台机器上同时运行多个无界面对局（多个展台的游戏逻辑、机器人驱动的长时间压测）
+- GameSession：一局游戏（引擎 + 固定步长时钟），step(inputs, dt)推进一帧
+- SessionServer：把N个会话分配到多个工作进程，每次批量下发输入、批量取回结果
+  需要绘制时未旋转的基础精灵从磁盘缓存内存映射（只读），各进程共享同一份物理页；
+  旋转精灵缓存、画布等仍由每个进程各自分配，内存占用随进程数增长
+
+运行方式（项目根目录）：
+    python server.py --sessions 8 --workers 4 --seconds 60
+    python server.py --sessions 4 --render
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from config import SIM_HZ, MAX_SIM_STEPS, PLAYERS, ASSET_CACHE_DIR
+from clock import SimulationClock
+from engine import GameEngine, GAME_OVER
+
+# 一个会话一帧的输入：本帧检测到的全部指尖[(x, y), ...]、按键码（无按键时为-1）
+SessionInput = namedtuple('SessionInput', ['tips', 'key'], defaults=((), -1))
+NO_INPUT = SessionInput()
+
+
+class GameSession:
+    """
+    一局游戏会话：持有引擎（实体、得分、生命值、连击与状态机）和固定步长时钟，
+    由调用方逐帧提供输入和流逝时间，不依赖摄像头、窗口和真实时间
+    """
+    def __init__(self, resources=None, seed=None, players=PLAYERS, hz=SIM_HZ, max_steps=MAX_SIM_STEPS):
+        """
+        :param resources: 资源管理器（为None时只运行游戏逻辑，不绘制）
+        :param seed: 随机种子（相同种子+相同输入+相同dt序列=相同结果）
+        :param players: 玩家数
+        :param hz: 固定步长模拟频率
+        :param max_steps: 单帧最多补算的模拟步数
+        """
+        self.R = resources
+        self.engine = GameEngine(resources, seed=seed, players=players)
+        self.clock = SimulationClock(hz, max_steps)
+        self.clock.tick(0.0)
+        self.now = 0.0            # 会话时间（秒，各帧dt之和）
+        self.frames = 0           # 已处理的帧数
+        self.steps = 0            # 已执行的模拟步数
+        self.busy = 0.0           # step()累计耗时（秒）
+        # 绘制用画布（每帧用背景覆盖，不重新分配）
+        self.canvas = resources.background.copy() if resources is not None else None
+
+    @property
+    def seed(self):
+        return self.engine.seed
+
+    def step(self, inputs=NO_INPUT, dt=1.0 / SIM_HZ):
+        """
+        推进一帧
+        :param inputs: 本帧输入（SessionInput）
+        :param dt: 距上一帧流逝的时间（秒），按固定步长换算为模拟步数
+        :return: 本帧发生的游戏事件
+        """
+        start = time.perf_counter()
+        self.now += dt
+        steps = self.clock.tick(self.now)
+        engine = self.engine
+        engine.feed_hands(list(inputs.tips), self.now)
+        engine.update(inputs.key, steps)
+        if self.canvas is not None:
+            np.copyto(self.canvas, self.R.background)
+            engine.draw(self.canvas, self.clock.alpha)
+        self.frames += 1
+        self.steps += steps
+        self.busy += time.perf_counter() - start
+        return engine.events
+
+    def snapshot(self):
+        """会话当前状态（可序列化的字典）"""
+        engine = self.engine
+        return {
+            'state': engine.game_state,
+            'score': engine.score,
+            'lives': engine.lives,
+            'players': [{'score': p.score, 'lives': p.lives, 'combo': p.combo_count} for p in engine.players],
+            'running': engine.running,
+        }
+
+    def metrics(self):
+        """吞吐统计：帧数、模拟步数、累计耗时与每秒模拟步数（按会话自身耗时计算）"""
+        return {
+            'seed': self.seed,
+            'frames': self.frames,
+            'steps': self.steps,
+            'busy': self.busy,
+            'steps_per_sec': self.steps / self.busy if self.busy > 0 else 0.0,
+        }
+
+
+def _worker(conn, specs, render, size, cache_dir):
+    """
+    工作进程：持有分配给自己的会话，循环处理父进程的命令
+    :param specs: 会话列表[(会话编号, 随机种子, 玩家数), ...]
+    """
+    resources = None
+    if render:
+        from resources import ResourceManager
+        # 命中磁盘缓存时基础精灵为只读内存映射，与其他进程共享物理页（旋转精灵缓存与画布为本进程私有）
+        resources = ResourceManager(audio=False, size=size, cache_dir=cache_dir)
+    sessions = {sid: GameSession(resources, seed, players) for sid, seed, players in specs}
+    conn.send({'pid': os.getpid(),
+               'cache_hits': resources.cache_hits if resources else 0,
+               'cache_misses': resources.cache_misses if resources else 0})
+    while True:
+        command, *args = conn.recv()
+        if command == 'step':
+            batch, dt = args
+            results = {}
+            for sid, frames in batch.items():
+                session = sessions[sid]
+                events = []
+                for inputs in frames:
+                    events.extend(session.step(inputs, dt))
+                results[sid] = dict(session.snapshot(), events=events)
+            conn.send(results)
+        elif command == 'metrics':
+            conn.send({sid: session.metrics() for sid, session in sessions.items()})
+        else:
+            break
+    conn.close()
+
+
+class SessionServer:
+    """
+    多进程会话服务：会话固定分配到工作进程（会话状态始终留在同一个进程中），
+    每次step()给每个工作进程发送一条消息（其中全部会话的一批输入），各进程并行推进后一起返回
+    """
+    def __init__(self, sessions, workers=None, seed=0, players=PLAYERS, render=False, size=None,
+                 cache_dir=ASSET_CACHE_DIR):
+        """
+        :param sessions: 会话数量
+        :param workers: 工作进程数（默认按CPU核数，不超过会话数）
+        :param seed: 随机种子，第i个会话使用seed + i
+        :param players: 每个会话的玩家数
+        :param render: 是否在工作进程中绘制画面（用于测量包含绘制的负载）
+        :param size: 绘制画布尺寸（默认由OUTPUT_SIZE与RENDER_SCALE计算）
+        :param cache_dir: 精灵磁盘缓存目录，工作进程从这里内存映射共享的只读基础精灵
+        """
+        self.sessions = list(range(sessions))
+        self.seeds = [seed + i for i in self.sessions]
+        workers = min(workers or os.cpu_count() or 1, sessions)
+        if render:
+            if cache_dir is None:
+                print("提示: 未设置资源缓存目录，每个工作进程将各自解码一份精灵")
+            else:
+                # 先在父进程生成磁盘缓存，工作进程启动后只做内存映射
+                from resources import ResourceManager
+                ResourceManager(audio=False, size=size, cache_dir=cache_dir)
+
+        # 会话按编号轮流分配到工作进程
+        self.shards = [self.sessions[i::workers] for i in range(workers)]
+        self._conns = []
+        self._procs = []
+        for shard in self.shards:
+            parent, child = multiprocessing.Pipe()
+            specs = [(sid, self.seeds[sid], players) for sid in shard]
+            proc = multiprocessing.Process(target=_worker, args=(child, specs, render, size, cache_dir),
+                                           name='session-worker', daemon=True)
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+        self.workers = [conn.recv() for conn in self._conns]
+        self.frames = 0
+        self.wall = 0.0           # step()累计的墙钟时间（秒）
+
+    def step(self, inputs=None, dt=1.0 / SIM_HZ):
+        """
+        推进全部会话
+        :param inputs: 会话编号 -> 一帧输入（SessionInput）或多帧输入的列表（批量下发，每帧推进dt）；
+                       全部会话都按本批最多帧数推进，输入不足的会话（包括未给出输入的会话）用NO_INPUT补齐，
+                       各会话的时间始终保持一致
+        :param dt: 每帧流逝的时间（秒）
+        :return: 会话编号 -> 状态快照（含本批发生的游戏事件）
+        """
+        start = time.perf_counter()
+        inputs = inputs or {}
+        frames = {sid: [v] if isinstance(v, SessionInput) else list(v) for sid, v in inputs.items()}
+        count = max((len(v) for v in frames.values()), default=1)
+        for conn, shard in zip(self._conns, self.shards):
+            batch = {}
+            for sid in shard:
+                items = frames.get(sid, [])
+                batch[sid] = items + [NO_INPUT] * (count - len(items))
+            conn.send(('step', batch, dt))
+        results = {}
+        for conn in self._conns:
+            results.update(conn.recv())
+        self.frames += count
+        self.wall += time.perf_counter() - start
+        return results
+
+    def metrics(self):
+        """各会话吞吐统计与整体每秒模拟步数（按step()的墙钟时间计算）"""
+        for conn in self._conns:
+            conn.send(('metrics',))
+        sessions = {}
+        for conn in self._conns:
+            sessions.update(conn.recv())
+        steps = sum(m['steps'] for m in sessions.values())
+        return {
+            'workers': len(self._conns),
+            'sessions': sessions,
+            'frames': self.frames,
+            'steps': steps,
+            'wall': self.wall,
+            'steps_per_sec': steps / self.wall if self.wall > 0 else 0.0,
+        }
+
+    def close(self):
+        """通知工作进程退出并等待结束"""
+        for conn in self._conns:
+            try:
+                conn.send(('close',))
+            except OSError:
+                pass
+            conn.close()
+        for proc in self._procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+        self._conns, self._procs = [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BotDriver:
+    """
+    机器人输入：每个会话一条合成指尖轨迹，开局自动按S，游戏结束后自动按R重开（用于压测）
+    """
+    def __init__(self, sessions, seed=0, players=PLAYERS):
+        from headless import synthetic_inputs
+        self.tracks = {sid: synthetic_inputs(seed + sid, start_key=None, players=players) for sid in sessions}
+        self.states = {}
+
+    def inputs(self, frames=1):
+        """生成每个会话接下来frames帧的输入"""
+        batch = {}
+        for sid, track in self.tracks.items():
+            state = self.states.get(sid)
+            # 第一帧开局，游戏结束后重开
+            key = ord('s') if state is None else ord('r') if state == GAME_OVER else -1
+            items = []
+            for _ in range(frames):
+                item = next(track)
+                tips = item.tips if item.tips is not None else [item.tip]
+                items.append(SessionInput(tips, key))
+                key = -1
+            batch[sid] = items
+        return batch
+
+    def observe(self, results):
+        """记录各会话最新的状态"""
+        for sid, result in results.items():
+            self.states[sid] = result['state']
+
+
+def run_bots(sessions, workers=None, seconds=10.0, batch=4, seed=0, players=PLAYERS, render=False):
+    """
+    用机器人输入驱动多会话服务，按模拟时间运行指定时长
+    :param batch: 每次下发的帧数（批量越大进程间通信开销越小，输入延迟越大）
+    :return: 吞吐统计（SessionServer.metrics()）
+    """
+    dt = 1.0 / SIM_HZ
+    bots = BotDriver(range(sessions), seed, players)
+    with SessionServer(sessions, workers, seed, players, render) as server:
+        for _ in range(max(1, int(round(seconds * SIM_HZ / batch)))):
+            bots.observe(server.step(bots.inputs(batch), dt))
+        metrics = server.metrics()
+        metrics['startup'] = server.workers
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description='多会话服务（机器人压测）')
+    parser.add_argument('--sessions', type=int, default=4, help='会话数')
+    parser.add_argument('--workers', type=int, help='工作进程数（默认按CPU核数）')
+    parser.add_argument('--seconds', type=float, default=30.0, help='每个会话运行的模拟时长（秒）')
+    parser.add_argument('--batch', type=int, default=4, help='每次批量下发的帧数')
+    parser.add_argument('--seed', type=int, default=0, help='第一个会话的随机种子')
+    parser.add_argument('--players', type=int, default=PLAYERS, help='每个会话的玩家数')
+    parser.add_argument('--render', action='store_true', help='在工作进程中绘制画面（需要assets）')
+    args = parser.parse_args()
+
+    metrics = run_bots(args.sessions, args.workers, args.seconds, args.batch, args.seed, args.players, args.render)
+    print(json.dumps({k: v for k, v in metrics.items() if k != 'sessions'}, ensure_ascii=False))
+    for sid, m in sorted(metrics['sessions'].items()):
+        print(f"会话{sid}: {m['steps']}步 {m['busy']:.2f}秒 {m['steps_per_sec']:.0f}步/秒")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+"""
+数据驱动的生成调度：config中的SPAWN_CONFIG（难度曲线）、SPAWN_BURSTS（连发模式）、SPAWN_WAVES（波次）
+在启动时编译为查找表，运行时每次生成只做查表和O(1)的别名表抽样
+调度只依赖自己的随机数生成器和模拟时间，同一种子可以离线预生成整局的生成时间线
+"""
+import bisect
+import heapq
+import math
+import random
+from collections import namedtuple
+
+from config import WIDTH, FRUIT_CONFIG, SPAWN_CONFIG, SPAWN_BURSTS, SPAWN_WAVES
+
+# 一次生成：生成时间（秒，从开局算起）、类型名称、水平位置、水平/垂直速度（像素/步）、旋转速度（度/步）
+SpawnEvent = namedtuple('SpawnEvent', ['time', 'name', 'x', 'vx', 'vy', 'spin'])
+# 编译后的波次：名称、开始/结束时间（一个循环内）、生成间隔倍率、类型抽样表、连发概率倍率、连发模式抽样表
+Wave = namedtuple('Wave', ['name', 'start', 'end', 'interval', 'kinds', 'burst_chance', 'bursts'])
+
+
+class AliasTable:
+    """
+    别名表（Vose别名方法）：由权重预先构建，之后每次按权重抽样只需一次random()，与类型数量无关
+    """
+    def __init__(self, items, weights):
+        """
+        :param items: 候选项列表
+        :param weights: 对应的非负权重（总和须大于0）
+        """
+        total = float(sum(weights))
+        if not items or total <= 0:
+            raise ValueError("别名表需要至少一个权重大于0的候选项")
+        n = len(items)
+        prob = [w * n / total for w in weights]
+        alias = list(range(n))
+        small = [i for i, p in enumerate(prob) if p < 1.0]
+        large = [i for i, p in enumerate(prob) if p >= 1.0]
+        # 每个概率不足1的格子用一个概率有余的候选项补满
+        while small and large:
+            s, l = small.pop(), large.pop()
+            alias[s] = l
+            prob[l] -= 1.0 - prob[s]
+            (small if prob[l] < 1.0 else large).append(l)
+        # 剩余格子只受浮点误差影响，视为满格
+        for i in small + large:
+            prob[i] = 1.0
+        self.items = list(items)
+        self.prob = prob
+        self.alias = alias
+
+    def sample(self, rng=random):
+        """按权重抽取一个候选项"""
+        u = rng.random() * len(self.items)
+        i = int(u)
+        return self.items[i] if u - i < self.prob[i] else self.items[self.alias[i]]
+
+
+def compile_curve(keys, levels):
+    """
+    把分段线性难度曲线展开为按难度等级索引的表（超出关键点范围时取端点值）
+    :param keys: 关键点[(难度等级, 值), ...]，按等级递增
+    :param levels: 表的长度
+    """
+    xs = [k[0] for k in keys]
+    ys = [k[1] for k in keys]
+    table = []
+    for level in range(levels):
+        i = bisect.bisect_right(xs, level)
+        if i == 0:
+            table.append(ys[0])
+        elif i == len(xs):
+            table.append(ys[-1])
+        else:
+            t = (level - xs[i - 1]) / (xs[i] - xs[i - 1])
+            table.append(ys[i - 1] + (ys[i] - ys[i - 1]) * t)
+    return table
+
+
+def _kind_table(bomb_chance, weights):
+    """类型抽样表：炸弹按固定概率，其余概率按水果权重分配"""
+    total = sum(weights.values())
+    names = ['bomb', *weights]
+    probs = [bomb_chance, *((1.0 - bomb_chance) * w / total for w in weights.values())]
+    return AliasTable(names, probs)
+
+
+class SpawnTable:
+    """
+    编译后的生成配置：难度曲线展开为按等级索引的表，每个波次预先构建类型与连发模式的别名表
+    """
+    def __init__(self, config=SPAWN_CONFIG, bursts=SPAWN_BURSTS, waves=SPAWN_WAVES, fruits=FRUIT_CONFIG):
+        """
+        :param config: 难度曲线与发射参数（见config.SPAWN_CONFIG）
+        :param bursts: 连发模式：名称 -> {'offsets', 'weight'}
+        :param waves: 按顺序循环的波次列表
+        :param fruits: 水果配置（可选的'weight'键为该水果的生成权重，默认1）
+        """
+        self.level_interval = config['level_interval']
+        self.max_entities = config.get('max_entities')
+        self.x_range = (config['x_margin'], WIDTH - config['x_margin'])
+        self.launch_speed = tuple(config['launch_speed'])
+        self.drift_speed = tuple(config['drift_speed'])
+        self.spin = tuple(config['spin'])
+
+        # 最后一个关键点之后曲线保持不变，表长覆盖到所有曲线的最后一个关键点
+        curves = {name: config[name] for name in ('interval', 'speed_bonus', 'burst_chance')}
+        levels = max(math.ceil(keys[-1][0]) for keys in curves.values()) + 1
+        self.intervals = compile_curve(curves['interval'], levels)
+        self.speed_bonuses = compile_curve(curves['speed_bonus'], levels)
+        self.burst_chances = compile_curve(curves['burst_chance'], levels)
+
+        self.patterns = {name: tuple(b['offsets']) for name, b in bursts.items()}
+        fruit_weights = {name: cfg.get('weight', 1.0) for name, cfg in fruits.items()}
+        self.waves = []
+        start = 0.0
+        for wave in waves or [{'name': 'default', 'duration': math.inf}]:
+            weights = {**fruit_weights, **wave.get('weights', {})}
+            burst_weights = {name: b['weight'] for name, b in bursts.items()}
+            burst_weights.update(wave.get('bursts', {}))
+            burst_items = [name for name, w in burst_weights.items() if w > 0]
+            self.waves.append(Wave(
+                name=wave['name'], start=start, end=start + wave['duration'],
+                interval=wave.get('interval', 1.0),
+                kinds=_kind_table(wave.get('bomb_chance', config['bomb_chance']), weights),
+                burst_chance=wave.get('burst_chance', 1.0),
+                bursts=AliasTable(burst_items, [burst_weights[n] for n in burst_items]) if burst_items else None,
+            ))
+            start += wave['duration']
+        self.cycle = start
+        self._wave_ends = [wave.end for wave in self.waves]
+
+    def level(self, time):
+        """某一时刻的难度等级（超出曲线范围后取最后一级）"""
+        return min(int(time // self.level_interval), len(self.intervals) - 1)
+
+    def wave(self, time):
+        """某一时刻所处的波次（波次按顺序循环）"""
+        if len(self.waves) == 1:
+            return self.waves[0]
+        return self.waves[bisect.bisect_right(self._wave_ends, time % self.cycle)]
+
+    def interval(self, time):
+        """某一时刻到下一次生成的间隔（秒）"""
+        return self.intervals[self.level(time)] * self.wave(time).interval
+
+    def launch(self, time, rng=random, speed_bonus=None, wave=None):
+        """
+        按某一时刻的波次与难度抽样一次生成（类型、位置、速度、旋转）
+        :param rng: 随机数生成器（random.Random实例，默认使用全局random模块）
+        :param speed_bonus: 额外上抛速度（默认按难度曲线）
+        :param wave: 所处波次（默认按时间查找）
+        """
+        wave = wave or self.wave(time)
+        if speed_bonus is None:
+            speed_bonus = self.speed_bonuses[self.level(time)]
+        name = wave.kinds.sample(rng)
+        x = rng.randint(*self.x_range)
+        vy = -rng.randint(*self.launch_speed) - speed_bonus
+        vx = rng.choice((-1, 1)) * rng.randint(*self.drift_speed)
+        spin = rng.choice(self.spin)
+        return SpawnEvent(time, name, x, vx, vy, spin)
+
+    def group(self, time, rng=random):
+        """某一时刻的一组生成：按连发概率选择连发模式（否则只生成一个），返回生成列表"""
+        wave = self.wave(time)
+        offsets = (0.0,)
+        chance = self.burst_chances[self.level(time)] * wave.burst_chance
+        if wave.bursts is not None and chance > 0 and rng.random() < chance:
+            offsets = self.patterns[wave.bursts.sample(rng)]
+        return [self.launch(time + offset, rng, wave=wave) for offset in offsets]
+
+
+# 按config编译的默认生成表
+DEFAULT_TABLE = SpawnTable()
+
+
+class SpawnScheduler:
+    """
+    按模拟时间调度生成：每到生成时间抽样一组生成（可能是连发），按生成时间依次发放
+    生成结果只取决于种子和局数，与调用advance()的步长无关，timeline()可预先得到整局的时间线
+    """
+    def __init__(self, seed=None, table=DEFAULT_TABLE):
+        """
+        :param seed: 随机种子（为None时随机选取）
+        :param table: 编译后的生成配置
+        """
+        self.seed = random.randrange(1 << 32) if seed is None else seed
+        self.table = table
+        self.capped = 0          # 因场上数量达到上限被跳过的生成数
+        self.reset()
+
+    def reset(self, round=0):
+        """
+        从头开始一局
+        :param round: 第几局（同一种子的每一局使用不同的随机序列，重开后的生成不会重复）
+        """
+        self.round = round
+        self.rng = random.Random(f'spawn:{self.seed}:{round}')
+        self.time = 0.0
+        self.next_time = self.table.interval(0.0)
+        self._pending = []       # 已抽样未到时间的生成：(时间, 序号, 生成)
+        self._seq = 0
+
+    def seek(self, time):
+        """跳到指定时间（之前的生成全部跳过），用于从某个难度开始运行"""
+        self.time = self.next_time = time
+        self._pending.clear()
+
+    @property
+    def level(self):
+        """当前难度等级"""
+        return self.table.level(self.time)
+
+    @property
+    def wave(self):
+        """当前所处的波次"""
+        return self.table.wave(self.time)
+
+    def advance(self, dt):
+        """
+        推进模拟时间，返回到期的生成（按生成时间排序）
+        :param dt: 推进的时长（秒）
+        """
+        self.time += dt
+        table, pending = self.table, self._pending
+        while self.next_time <= self.time:
+            for event in table.group(self.next_time, self.rng):
+                heapq.heappush(pending, (event.time, self._seq, event))
+                self._seq += 1
+            self.next_time += table.interval(self.next_time)
+        due = []
+        while pending and pending[0][0] <= self.time:
+            due.append(heapq.heappop(pending)[2])
+        return due
+
+    def admit(self, count):
+        """场上已有count个对象时是否允许再生成一个（达到上限时记为跳过）"""
+        cap = self.table.max_entities
+        if cap is not None and count >= cap:
+            self.capped += 1
+            return False
+        return True
+
+    def timeline(self, duration, round=None):
+        """
+        预生成一局从开局到duration秒的全部生成（不影响当前调度状态）
+        :param round: 第几局（默认为当前局）
+        :return: SpawnEvent列表，与实际运行时advance()依次返回的生成相同（未计入数量上限）
+        """
+        scheduler = SpawnScheduler(self.seed, self.table)
+        scheduler.reset(self.round if round is None else round)
+        return scheduler.advance(duration)
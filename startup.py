@@ -0,0 +1,98 @@
+import threading
+import time
+
+
+class StartupTimer:
+    """启动耗时记录：按阶段记录相对启动时刻的开始时间与耗时（毫秒），启动完成后打印报告"""
+    def __init__(self, origin=None):
+        """:param origin: 启动时刻（time.perf_counter()时间，默认为创建时刻）"""
+        self.origin = time.perf_counter() if origin is None else origin
+        self.phases = []   # (阶段名, 开始时间, 结束时间, 线程名)
+        self._lock = threading.Lock()
+
+    def record(self, name, start, end=None):
+        """记录一个阶段（end为None时记为瞬时事件，如首帧显示）"""
+        end = start if end is None else end
+        with self._lock:
+            self.phases.append((name, start, end, threading.current_thread().name))
+
+    def mark(self, name):
+        """记录一个瞬时事件"""
+        self.record(name, time.perf_counter())
+
+    def phase(self, name):
+        """计时作用域：with timer.phase('camera'): ..."""
+        return _Phase(self, name)
+
+    def report(self):
+        """按开始时间排序的启动报告（每行：阶段、开始、耗时、线程）"""
+        with self._lock:
+            phases = sorted(self.phases, key=lambda p: p[1])
+        lines = [f"{'phase':<16}{'start':>9}{'ms':>9}  thread"]
+        for name, start, end, thread in phases:
+            lines.append(f"{name:<16}{(start - self.origin) * 1000:>9.1f}{(end - start) * 1000:>9.1f}  {thread}")
+        return '\n'.join(lines)
+
+
+class _Phase:
+    """StartupTimer的计时作用域"""
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.record(self.name, self.start, time.perf_counter())
+        return False
+
+
+class BackgroundTask(threading.Thread):
+    """
+    后台初始化任务：在独立线程中执行耗时的初始化（导入MediaPipe、打开摄像头、初始化混音器），
+    渲染循环通过ready/failed轮询状态，不会被阻塞
+    """
+    def __init__(self, name, fn, timer=None):
+        """
+        :param name: 任务名称（同时作为线程名和启动报告中的阶段名）
+        :param fn: 初始化函数，返回值保存在result中
+        :param timer: 启动耗时记录（可选）
+        """
+        super().__init__(name=name, daemon=True)
+        self.fn = fn
+        self.timer = timer
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+    def run(self):
+        try:
+            if self.timer is not None:
+                with self.timer.phase(self.name):
+                    self.result = self.fn()
+            else:
+                self.result = self.fn()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done.set()
+
+    @property
+    def ready(self):
+        """初始化是否已成功完成"""
+        return self.done.is_set() and self.error is None
+
+    @property
+    def failed(self):
+        """初始化是否已失败"""
+        return self.done.is_set() and self.error is not None
+
+    @property
+    def status(self):
+        """状态文字：'ready'、'failed'或'loading'"""
+        if self.ready:
+            return 'ready'
+        return 'failed' if self.failed else 'loading'
@@ -0,0 +1,34 @@
+"""固定步长模拟时钟"""
+import pytest
+
+from clock import SimulationClock
+
+
+def test_tick_accumulates_fixed_steps():
+    clock = SimulationClock(hz=4, max_steps=5)
+    assert clock.tick(0.0) == 0
+    assert clock.tick(0.625) == 2
+    assert clock.time == pytest.approx(0.5)
+    assert clock.alpha == pytest.approx(0.5)
+    # 剩余的半步累加到下一帧
+    assert clock.tick(0.75) == 1
+    assert clock.alpha == pytest.approx(0.0)
+
+
+def test_tick_caps_steps_after_a_stall():
+    clock = SimulationClock(hz=4, max_steps=5)
+    clock.tick(0.0)
+    assert clock.tick(10.0) == 5
+    assert clock.time == pytest.approx(1.25)
+    # 多余时间被丢弃，不会在之后的帧补算
+    assert clock.accumulator == 0.0
+    assert clock.tick(10.1) == 0
+
+
+def test_reset():
+    clock = SimulationClock(hz=4)
+    clock.tick(0.0)
+    clock.tick(1.0)
+    clock.reset()
+    assert (clock.time, clock.alpha, clock.accumulator) == (0.0, 0.0, 0.0)
+    assert clock.tick(5.0) == 0
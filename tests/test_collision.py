@@ -0,0 +1,41 @@
+"""刀光扫掠切割检测"""
+import pytest
+
+from collision import find_blade_slices, find_slices
+
+# 三个对象：前两个在水平刀光附近，第三个离刀光50像素
+XS, YS, RADII = [25, 75, 50], [0, 5, 50], [10, 10, 10]
+BLADE = ([(0, 0), (100, 0)], [0.0, 1.0])
+
+
+def test_hits_sorted_by_time_with_interpolated_points():
+    hits = find_blade_slices([BLADE], XS, YS, RADII)
+    assert [h.index for h in hits] == [0, 1]
+    assert [h.time for h in hits] == pytest.approx([0.25, 0.75])
+    assert (hits[1].x, hits[1].y) == pytest.approx((75.0, 0.0))
+    assert all(h.segment == 0 and h.blade == 0 for h in hits)
+
+
+def test_inactive_objects_and_blade_radius():
+    assert [h.index for h in find_blade_slices([BLADE], XS, YS, RADII, active=[True, False, True])] == [0]
+    # 刀刃半径扩大命中范围
+    hits = find_blade_slices([BLADE], XS, YS, RADII, blade_radius=45)
+    assert [h.index for h in hits] == [0, 2, 1]
+
+
+def test_earliest_blade_wins():
+    vertical = ([(75, -20), (75, 20)], [0.0, 0.2])
+    hits = find_blade_slices([BLADE, vertical], XS, YS, RADII)
+    assert [(h.index, h.blade) for h in hits] == [(1, 1), (0, 0)]
+    assert hits[0].time == pytest.approx(0.125)
+
+
+def test_single_point_and_empty_blades():
+    hits = find_blade_slices([([(1000, 300)], [2.0]), ([], [])], [990, 25], [305, 0], [20, 10])
+    assert [(h.index, h.time, h.blade) for h in hits] == [(0, 2.0, 0)]
+    assert find_blade_slices([([], [])], XS, YS, RADII) == []
+    assert find_blade_slices([BLADE], [], [], []) == []
+
+
+def test_find_slices_is_single_blade_case():
+    assert find_slices(*BLADE, XS, YS, RADII) == find_blade_slices([BLADE], XS, YS, RADII)
@@ -0,0 +1,54 @@
+"""结构化数组实体池：槽位分配、复用、扩容与批量积分"""
+import numpy as np
+import pytest
+
+from config import HEIGHT
+from entity_pool import EntityPool
+
+
+def test_allocate_reuses_low_slots():
+    pool = EntityPool(4)
+    assert [pool.allocate() for _ in range(3)] == [0, 1, 2]
+    pool.release(1)
+    assert len(pool) == 2
+    assert pool.allocate() == 1
+    assert list(pool.allocate_many(2)) == [3, 4]
+    assert pool.capacity >= 5 and len(pool) == 5
+
+
+def test_grow_keeps_existing_data():
+    pool = EntityPool(2)
+    a, b = pool.allocate(), pool.allocate()
+    pool.x[a], pool.x[b] = 1.5, 2.5
+    c = pool.allocate()
+    assert pool.capacity == 16
+    assert (pool.x[a], pool.x[b], c) == (1.5, 2.5, 2)
+    assert pool.used[[a, b, c]].all()
+
+
+def test_step_integrates_and_compact_recycles():
+    pool = EntityPool(4)
+    idx = pool.allocate_many(2)
+    pool.x[idx] = [10, 20]
+    pool.y[idx] = [100, HEIGHT + EntityPool.KILL_MARGIN - 1]
+    pool.vx[idx] = [1, 0]
+    pool.vy[idx] = [-5, 2]
+    pool.gravity[idx] = 0.25
+    pool.step()
+    assert list(pool.prev_x[idx]) == [10, 20]
+    assert list(pool.x[idx]) == [11, 20]
+    assert list(pool.y[idx]) == [95, HEIGHT + EntityPool.KILL_MARGIN + 1]
+    assert list(pool.vy[idx]) == pytest.approx([-4.75, 2.25])
+    # 越过屏幕底部的对象变为非活跃，compact后槽位回收
+    assert list(pool.active[idx]) == [True, False]
+    assert pool.compact() == 1
+    assert len(pool) == 1 and pool.allocate() == idx[1]
+
+
+def test_clear_releases_everything():
+    pool = EntityPool(4)
+    pool.allocate_many(3)
+    pool.clear()
+    assert len(pool) == 0
+    assert not pool.used.any() and not pool.active.any()
+    assert np.array_equal(pool.allocate_many(4), np.arange(4))
@@ -0,0 +1,56 @@
+"""多会话服务：会话结果的确定性，以及SessionServer与本地GameSession逐批一致"""
+from config import SIM_HZ
+from server import GameSession, SessionServer, SessionInput, NO_INPUT, BotDriver
+
+DT = 1.0 / SIM_HZ
+
+
+def record_bot_run(sessions, seed, batches, batch=4, workers=2):
+    """用机器人输入驱动SessionServer，记录每批下发的输入与返回的结果"""
+    bots = BotDriver(range(sessions), seed)
+    history = []
+    with SessionServer(sessions, workers, seed) as server:
+        for _ in range(batches):
+            inputs = bots.inputs(batch)
+            results = server.step(inputs, DT)
+            bots.observe(results)
+            history.append((inputs, results))
+    return history
+
+
+def test_same_seed_and_inputs_give_same_session():
+    inputs = [batch[0] for batch, _ in record_bot_run(1, seed=7, batches=150, workers=1)]
+    a, b = GameSession(seed=7), GameSession(seed=7)
+    for batch in inputs:
+        for item in batch:
+            assert a.step(item, DT) == b.step(item, DT)
+            assert a.snapshot() == b.snapshot()
+    assert a.engine.score > 0
+
+
+def test_server_matches_local_sessions():
+    seed, sessions = 3, 3
+    history = record_bot_run(sessions, seed, batches=150)
+    local = [GameSession(seed=seed + sid) for sid in range(sessions)]
+    for inputs, results in history:
+        for sid, session in enumerate(local):
+            events = []
+            for item in inputs[sid]:
+                events.extend(session.step(item, DT))
+            assert results[sid] == dict(session.snapshot(), events=events)
+    assert any(session.engine.score > 0 for session in local)
+
+
+def test_uneven_batches_are_padded_with_no_input():
+    start = SessionInput((), ord('s'))
+    tip = SessionInput(((640, 360),), -1)
+    with SessionServer(2, workers=1, seed=0) as server:
+        results = server.step({0: [start, tip, tip], 1: [start]}, DT)
+        metrics = server.metrics()
+    assert [metrics['sessions'][sid]['frames'] for sid in (0, 1)] == [3, 3]
+
+    local = GameSession(seed=1)
+    events = []
+    for item in (start, NO_INPUT, NO_INPUT):
+        events.extend(local.step(item, DT))
+    assert results[1] == dict(local.snapshot(), events=events)
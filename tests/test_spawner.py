@@ -0,0 +1,62 @@
+"""生成调度：别名表抽样概率、难度曲线展开、预生成时间线与逐步推进一致"""
+import random
+
+import pytest
+
+from spawner import AliasTable, SpawnScheduler, compile_curve
+
+
+def alias_probabilities(table):
+    """由别名表的prob/alias精确计算每个候选项被抽中的概率"""
+    n = len(table.items)
+    probs = [0.0] * n
+    for i in range(n):
+        probs[i] += table.prob[i] / n
+        probs[table.alias[i]] += (1.0 - table.prob[i]) / n
+    return probs
+
+
+def test_alias_table_matches_weights():
+    table = AliasTable(['a', 'b', 'c'], [1, 2, 7])
+    assert alias_probabilities(table) == pytest.approx([0.1, 0.2, 0.7], abs=1e-12)
+
+    rng = random.Random(0)
+    counts = {'a': 0, 'b': 0, 'c': 0}
+    for _ in range(100000):
+        counts[table.sample(rng)] += 1
+    assert counts['a'] / 100000 == pytest.approx(0.1, abs=0.01)
+    assert counts['b'] / 100000 == pytest.approx(0.2, abs=0.01)
+    assert counts['c'] / 100000 == pytest.approx(0.7, abs=0.01)
+
+
+def test_alias_table_rejects_empty_weights():
+    with pytest.raises(ValueError):
+        AliasTable([], [])
+    with pytest.raises(ValueError):
+        AliasTable(['a', 'b'], [0, 0])
+
+
+def test_compile_curve_interpolates_and_clamps():
+    assert compile_curve([(0, 10), (2, 20), (4, 0)], 6) == [10, 15, 20, 10, 0, 0]
+    # 第一个关键点之前取起点值
+    assert compile_curve([(1, 5), (3, 9)], 5) == [5, 5, 7, 9, 9]
+    assert compile_curve([(0, 3)], 3) == [3, 3, 3]
+
+
+@pytest.mark.parametrize('dt', [1 / 30, 1 / 7])
+def test_timeline_matches_advance(dt):
+    # 覆盖多个难度等级和一次水果雨波次（连发）
+    scheduler = SpawnScheduler(seed=42)
+    events = []
+    while scheduler.time < 120.0:
+        events.extend(scheduler.advance(dt))
+    timeline = scheduler.timeline(scheduler.time)
+    assert events == timeline
+    assert len(events) > 100
+    assert [e.time for e in timeline] == sorted(e.time for e in timeline)
+
+
+def test_rounds_use_different_sequences():
+    scheduler = SpawnScheduler(seed=42)
+    assert scheduler.timeline(30.0, round=0) != scheduler.timeline(30.0, round=1)
+    assert scheduler.timeline(30.0, round=1) == SpawnScheduler(seed=42).timeline(30.0, round=1)
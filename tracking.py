@@ -0,0 +1,122 @@
+import math
+from collections import deque
+
+from config import (TRACKING_MIN_HZ, TRACKING_MAX_HZ, TRACKING_FAST_SPEED, TRACKING_REDETECT,
+                    TRACKING_MAX_PREDICT)
+
+
+class FingertipPredictor:
+    """
+    常速度（alpha-beta）滤波器：用推理得到的指尖位置修正速度估计，
+    在两次推理之间按速度外推指尖位置
+    """
+    def __init__(self, x, y, timestamp, alpha=0.9, beta=0.5, max_predict=TRACKING_MAX_PREDICT):
+        """
+        :param alpha: 位置修正系数（越大越信任测量值）
+        :param beta: 速度修正系数
+        :param max_predict: 最多外推的时长（秒）
+        """
+        self.x, self.y = float(x), float(y)
+        self.vx = self.vy = 0.0
+        self.timestamp = timestamp
+        self.alpha = alpha
+        self.beta = beta
+        self.max_predict = max_predict
+
+    def update(self, x, y, timestamp):
+        """用一次测量值修正位置与速度"""
+        dt = timestamp - self.timestamp
+        if dt <= 0:
+            self.x, self.y = float(x), float(y)
+            return
+        if dt > self.max_predict * 2:
+            # 间隔太久，旧速度已无参考价值
+            self.vx = self.vy = 0.0
+        px, py = self.x + self.vx * dt, self.y + self.vy * dt
+        rx, ry = x - px, y - py
+        self.x, self.y = px + self.alpha * rx, py + self.alpha * ry
+        self.vx += self.beta * rx / dt
+        self.vy += self.beta * ry / dt
+        self.timestamp = timestamp
+
+    def predict(self, timestamp):
+        """外推到指定时间的指尖位置，超出最大外推时长时返回None"""
+        dt = timestamp - self.timestamp
+        if dt < 0 or dt > self.max_predict:
+            return None
+        return self.x + self.vx * dt, self.y + self.vy * dt
+
+    @property
+    def speed(self):
+        """当前速度估计（逻辑像素/秒）"""
+        return math.hypot(self.vx, self.vy)
+
+
+class InferenceScheduler:
+    """
+    推理调度器：决定每一帧是执行推理还是使用预测值，以及推理使用全帧还是ROI
+    - 推理频率在min_hz与max_hz之间随指尖速度线性变化（快速挥动时提高频率）
+    - 未锁定手部或上次ROI推理丢失时，下一帧立即做全帧检测
+    - 锁定期间每隔redetect秒强制一次全帧检测，发现新进入画面的手
+    """
+    def __init__(self, min_hz=TRACKING_MIN_HZ, max_hz=TRACKING_MAX_HZ, fast_speed=TRACKING_FAST_SPEED,
+                 redetect=TRACKING_REDETECT):
+        self.min_hz = min_hz
+        self.max_hz = max_hz
+        self.fast_speed = fast_speed
+        self.redetect = redetect
+        self.locked = False              # 上一次推理是否检测到手
+        self.lost = False                # 上一次ROI推理是否丢失了手
+        self.last_inference = -math.inf  # 上一次推理的帧时间戳
+        self.last_full = -math.inf       # 上一次全帧检测的帧时间戳
+        self.inferences = 0              # 推理总次数
+        self.roi_inferences = 0          # 其中ROI推理次数
+        self.predictions = 0             # 用预测值代替推理的帧数
+        self._recent = deque()           # 最近一秒内的推理时间戳（用于统计推理频率）
+
+    def target_hz(self, speed):
+        """按指尖速度计算目标推理频率"""
+        if not self.locked:
+            return self.min_hz
+        t = min(1.0, speed / self.fast_speed) if self.fast_speed > 0 else 1.0
+        return self.min_hz + (self.max_hz - self.min_hz) * t
+
+    def due(self, timestamp, speed=0.0):
+        """该帧是否需要执行推理（否则使用预测值）"""
+        if self.lost:
+            return True
+        # 留出少量余量，避免摄像头帧间隔抖动导致推理被推迟一整帧
+        return timestamp - self.last_inference >= 0.9 / self.target_hz(speed)
+
+    def use_roi(self, timestamp):
+        """该次推理是否可以只处理指尖附近的ROI"""
+        return self.locked and not self.lost and timestamp - self.last_full < self.redetect
+
+    def record(self, timestamp, roi, found):
+        """
+        记录一次推理结果
+        :param roi: 是否为ROI推理
+        :param found: 是否检测到手
+        """
+        self.inferences += 1
+        self.last_inference = timestamp
+        if roi:
+            self.roi_inferences += 1
+            self.lost = not found
+            self.locked = found
+        else:
+            self.last_full = timestamp
+            self.lost = False
+            self.locked = found
+        self._recent.append(timestamp)
+
+    def skip(self):
+        """记录一次用预测值代替推理的帧"""
+        self.predictions += 1
+
+    def rate(self, now):
+        """最近一秒的推理次数（次/秒）"""
+        recent = self._recent
+        while recent and recent[0] < now - 1.0:
+            recent.popleft()
+        return len(recent)
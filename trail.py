@@ -0,0 +1,166 @@
+import cv2
+import numpy as np
+
+from config import TRAIL_CAPACITY, TRAIL_MAX_AGE, TRAIL_WIDTH, TRAIL_SMOOTHING
+
+# fillPoly的亚像素精度（坐标左移的位数）
+SHIFT = 4
+
+
+# 每段插值点数 -> (样条基矩阵, 线性插值矩阵)，每行对应一个插值点，每列对应一个控制点
+_BASES = {}
+
+
+def _bases(samples):
+    bases = _BASES.get(samples)
+    if bases is None:
+        t = np.arange(samples) / samples
+        t2, t3 = t * t, t * t * t
+        spline = np.stack([-0.5 * t3 + t2 - 0.5 * t, 1.5 * t3 - 2.5 * t2 + 1,
+                           -1.5 * t3 + 2 * t2 + 0.5 * t, 0.5 * t3 - 0.5 * t2], axis=1)
+        linear = np.stack([np.zeros_like(t), 1 - t, t, np.zeros_like(t)], axis=1)
+        bases = _BASES[samples] = (spline, linear)
+    return bases
+
+
+def catmull_rom(points, samples):
+    """
+    Catmull-Rom样条插值（曲线经过每个原始顶点），把稀疏的摄像头采样补成平滑的刀光
+    :param points: (n, 3)数组，每行为(x, y, 时间戳)；坐标按样条插值，时间戳按线性插值（保持单调）
+    :param samples: 每段插值的点数（不足2时不插值）
+    :return: ((n - 1) * samples + 1, 3)数组
+    """
+    n = len(points)
+    if n < 3 or samples < 2:
+        return points
+    spline, linear = _bases(samples)
+    # 首尾顶点各复制一次作为端点切线的控制点，每段的4个控制点为(n - 1, 4, 3)
+    idx = np.clip(np.arange(-1, n - 2)[:, None] + np.arange(4), 0, n - 1)
+    ctrl = points[idx]
+    out = np.empty((n - 1, samples, 3))
+    out[:, :, :2] = spline @ ctrl[:, :, :2]
+    out[:, :, 2:] = linear @ ctrl[:, :, 2:]
+    return np.vstack([out.reshape(-1, 3), points[-1:]])
+
+
+class BladeTrail:
+    """
+    刀光轨迹：固定容量的NumPy环形缓冲区，保存带时间戳的指尖采样(x, y, 时间戳)
+    - 按时间淘汰：超过max_age的采样点自动过期（未检测到手时刀光随之消失）
+    - 同一组采样点既用于绘制，也用于扫掠切割检测
+    """
+    def __init__(self, capacity=TRAIL_CAPACITY, max_age=TRAIL_MAX_AGE):
+        """
+        :param capacity: 最多保留的采样点数（写满后覆盖最旧的点）
+        :param max_age: 采样点的最长保留时间（秒）
+        """
+        self.capacity = capacity
+        self.max_age = max_age
+        self.buffer = np.zeros((capacity, 3), dtype=np.float64)
+        self.start = 0     # 最旧采样点的位置
+        self.count = 0     # 有效采样点数
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def last(self):
+        """最新的采样点(x, y, 时间戳)，没有时返回None"""
+        if not self.count:
+            return None
+        return self.buffer[(self.start + self.count - 1) % self.capacity]
+
+    def add(self, x, y, timestamp):
+        """
+        加入一个采样点（只接受比最新点更新的采样，同一采样不会重复加入）
+        :return: 是否加入
+        """
+        last = self.last
+        if last is not None and timestamp <= last[2]:
+            return False
+        if self.count == self.capacity:
+            self.start = (self.start + 1) % self.capacity
+        else:
+            self.count += 1
+        self.buffer[(self.start + self.count - 1) % self.capacity] = (x, y, timestamp)
+        return True
+
+    def expire(self, now):
+        """淘汰时间戳早于now - max_age的采样点"""
+        if not self.count:
+            return
+        stale = int(np.searchsorted(self.points()[:, 2], now - self.max_age, side='left'))
+        self.start = (self.start + stale) % self.capacity
+        self.count -= stale
+
+    def clear(self):
+        self.start = self.count = 0
+
+    def points(self):
+        """按时间顺序（最旧到最新）返回全部采样点，(n, 3)数组"""
+        return self.buffer[(self.start + np.arange(self.count)) % self.capacity]
+
+    def since(self, timestamp):
+        """
+        时间戳晚于timestamp的采样点，连同其前一个点（组成第一条线段）；
+        没有更新的采样时退化为最新的单个点
+        """
+        points = self.points()
+        start = int(np.searchsorted(points[:, 2], timestamp, side='right'))
+        return points[max(0, start - 1):] if start < len(points) else points[-1:]
+
+    def draw(self, frame, now=None, scale=1.0, color=(255, 255, 255), width=TRAIL_WIDTH,
+             smoothing=TRAIL_SMOOTHING):
+        """
+        把刀光绘制为一条抗锯齿的锥形多边形：尾部最细、头部最粗，越旧的点越细（随时间淡出）
+        轨迹急转折返处多边形会自相交（fillPoly按奇偶规则填充会留下空洞），在这些位置拆成多段分别填充
+        :param now: 当前时间（与采样时间戳同一时间基准），默认为最新采样的时间
+        :param scale: 逻辑坐标到画布坐标的缩放系数
+        :param width: 头部的最大半宽（逻辑像素）
+        :param smoothing: Catmull-Rom每段插值的点数
+        :return: 刀光在画布上的外接矩形(x0, y0, x1, y1)，没有绘制时返回None
+        """
+        if self.count < 2:
+            return None
+        points = catmull_rom(self.points(), smoothing)
+        xy = points[:, :2] * scale
+        d = np.diff(xy, axis=0)
+        # 去掉重合的点（指尖静止时），避免切线方向为0
+        moving = np.einsum('ij,ij->i', d, d) > 1e-6
+        if not moving.all():
+            keep = np.concatenate(([True], moving))
+            xy, points = xy[keep], points[keep]
+            if len(xy) < 2:
+                return None
+            d = np.diff(xy, axis=0)
+
+        # 半宽：从尾部到头部逐渐变粗，并按采样点的年龄线性变细（淡出）
+        ts = points[:, 2]
+        now = ts[-1] if now is None else now
+        half = np.sqrt(np.arange(len(xy)) / (len(xy) - 1))
+        half *= np.maximum(1.0 - (now - ts) / self.max_age, 0.0)
+        half *= width * scale
+        if half.max() < 0.5:
+            return None
+
+        # 每个点的法线方向（相邻点中心差分得到切线，端点用单侧差分）
+        tangent = np.empty_like(xy)
+        tangent[0], tangent[-1] = d[0], d[-1]
+        np.add(d[:-1], d[1:], out=tangent[1:-1])
+        half /= np.maximum(np.hypot(tangent[:, 0], tangent[:, 1]), 1e-9)
+        offset = tangent[:, ::-1] * half[:, None]
+        offset[:, 0] *= -1
+        left, right = xy + offset, xy - offset
+
+        # 相邻线段方向夹角超过90度处视为折返，拆分多边形
+        folds = np.flatnonzero((d[:-1] * d[1:]).sum(axis=1) < 0) + 1
+        bounds = [0, *folds.tolist(), len(xy) - 1]
+        left = np.round(left * (1 << SHIFT)).astype(np.int32)
+        right = np.round(right * (1 << SHIFT)).astype(np.int32)
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            polygon = np.concatenate([left[a:b + 1], right[a:b + 1][::-1]])
+            cv2.fillPoly(frame, [polygon], color, cv2.LINE_AA, SHIFT)
+
+        x0, y0 = np.minimum(left.min(axis=0), right.min(axis=0)) >> SHIFT
+        x1, y1 = np.maximum(left.max(axis=0), right.max(axis=0)) >> SHIFT
+        return int(x0) - 2, int(y0) - 2, int(x1) + 3, int(y1) + 3
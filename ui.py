@@ -1,6 +1,24 @@
 import cv2
+import numpy as np
 from config import WIDTH, HEIGHT, PALETTE, FRUIT_CONFIG
 from utils import overlay_transparent
+from glyphs import GLYPHS
+
+# HUD（得分、生命值）与连击文字所占的屏幕区域(x0, y0, x1, y1，逻辑坐标)，用于脏矩形渲染
+HUD_RECT = (0, 0, WIDTH, 90)
+COMBO_RECT = (0, HEIGHT // 2 - 90, WIDTH, HEIGHT // 2 + 30)
+# 启动状态指示（摄像头、手部追踪、音频的加载进度）所占的屏幕区域
+STATUS_RECT = (0, HEIGHT - 30 - 3 * 28, 420, HEIGHT)
+
+
+def scale_rect(rect, scale):
+    """把逻辑坐标矩形换算为画布坐标"""
+    return tuple(v * scale for v in rect)
+
+
+def _thickness(thickness, scale):
+    """按缩放系数换算线宽（至少1像素）"""
+    return max(1, int(round(thickness * scale)))
 
 
 def draw_tutorial(frame, resource_manager):
@@ -29,8 +47,8 @@ def draw_tutorial(frame, resource_manager):
         pos_x = start_x + col * gap_x
         pos_y = start_y + row * 100
 
-        if name in resource_manager.images and resource_manager.images[name] is not None:
-            icon = cv2.resize(resource_manager.images[name], (50, 50))
+        icon = resource_manager.get_icon(name, 50)
+        if icon is not None:
             overlay_transparent(frame, icon, pos_x, pos_y - 15)
         else:
             cv2.circle(frame, (pos_x, pos_y - 15), 20, config['color'], -1)
@@ -46,3 +64,175 @@ def draw_tutorial(frame, resource_manager):
                 (0, 255, 0), 2)
 
     return frame
+
+
+def draw_hud(frame, score, lives, scale=1.0, region=(0, WIDTH), glyphs=GLYPHS, combo=0):
+    """
+    绘制游戏中的HUD（得分、生命值），布局为逻辑坐标，按scale换算到画布
+    整个HUD合成为一张缓存贴图，只在(得分, 生命值, 连击数)变化时重新合成，其余时候只做一次混合；
+    得分由固定前缀和逐个数字的贴图拼成，得分变化不会重新光栅化文字
+    :param region: 所属玩家的屏幕区域(x0, x1)：得分靠区域左侧，生命值靠区域右侧
+    :param glyphs: 文字/图形贴图缓存
+    :param combo: 当前连击数（HUD内容键的一部分）
+    """
+    s = scale
+    x0, x1 = region
+
+    def build():
+        # 得分：前缀 + 逐个数字
+        tiles = glyphs.run_tiles(["Score: ", *str(score)], (int((x0 + 30) * s), int(60 * s)),
+                                 cv2.FONT_HERSHEY_DUPLEX, 1.5 * s, PALETTE['text'], _thickness(2, s))
+        # 生命值：全部生命值图标合成一张贴图，以最右侧图标的圆心为原点
+        if lives > 0:
+            tiles.append((_lives_tile(glyphs, lives, x1, s), (int((x1 - 50) * s), int(50 * s))))
+        return tiles
+    glyphs.blit(frame, glyphs.band(('hud', region, s), (score, lives, combo), build), (0, 0))
+    return frame
+
+
+def _lives_tile(glyphs, lives, x1, s):
+    """生命值图标贴图（圆心位置与逐个cv2.circle绘制时完全一致）"""
+    radius = max(1, int(20 * s))
+    centers = [int((x1 - 50 - i * 60) * s) for i in range(lives)]
+    left = centers[-1] - radius - 1
+    origin = (centers[0] - left, radius + 1)
+    size = (centers[0] + radius + 2 - left, 2 * radius + 3)
+
+    def draw(image, c):
+        for cx in centers:
+            cv2.circle(image, (cx - left, origin[1]), radius, (50, 50, 220) if c is None else c, -1)
+    return glyphs.tile(('lives', lives, x1, s), size, origin, draw)
+
+
+def draw_combo(frame, combo_count, scale=1.0, region=(0, WIDTH), glyphs=GLYPHS):
+    """绘制在区域内居中的连击文字（连击数越多，文字越大；文字尺寸与贴图均来自缓存）"""
+    s = scale
+    x0, x1 = region
+    combo_text = f"{combo_count} COMBO!"
+    # 连击数越多，文字越大（最大3.5倍）
+    font_scale = min(3.5, 1.5 + combo_count * 0.2) * s
+    thickness = _thickness(3, s)
+    text_size = glyphs.measure(combo_text, cv2.FONT_HERSHEY_TRIPLEX, font_scale, thickness)[0]
+    # 区域较窄（多名玩家）时缩小文字，避免超出区域
+    region_w = (x1 - x0) * s
+    if text_size[0] > region_w:
+        font_scale *= region_w / text_size[0]
+        text_size = glyphs.measure(combo_text, cv2.FONT_HERSHEY_TRIPLEX, font_scale, thickness)[0]
+    # 文字居中显示
+    text_x = (int((x0 + x1) * s) - text_size[0]) // 2
+    text_y = int(HEIGHT * s) // 2
+    shadow = max(1, int(round(5 * s)))
+
+    # 绘制文字阴影（黑色）+ 主体（配色表中的连击色）
+    glyphs.draw_text(frame, combo_text, (text_x + shadow, text_y + shadow), cv2.FONT_HERSHEY_TRIPLEX, font_scale,
+                     (0, 0, 0), thickness)
+    glyphs.draw_text(frame, combo_text, (text_x, text_y), cv2.FONT_HERSHEY_TRIPLEX, font_scale,
+                     PALETTE['combo_text'], thickness)
+    return frame
+
+
+def draw_bomb_flash(frame):
+    """切到炸弹时的红色闪屏"""
+    overlay = np.full_like(frame, (0, 0, 255))
+    return cv2.addWeighted(frame, 0.7, overlay, 0.3, 0)
+
+
+def draw_game_over(frame, score, player_scores=()):
+    """绘制游戏结束界面，player_scores为多人游戏时每名玩家的得分"""
+    # 绘制半透明黑色覆盖层
+    overlay = frame.copy()
+    cv2.rectangle(overlay, (0, 0), (WIDTH, HEIGHT), (0, 0, 0), -1)
+    frame = cv2.addWeighted(overlay, 0.85, frame, 0.15, 0)
+
+    # 计算文字居中坐标
+    center_x, center_y = WIDTH // 2, HEIGHT // 2
+
+    # 绘制游戏结束文字
+    cv2.putText(frame, "GAME OVER", (center_x - 250, center_y - 80), cv2.FONT_HERSHEY_TRIPLEX, 3,
+                (0, 0, 255), 5)
+    cv2.putText(frame, f"Final Score: {score}", (center_x - 150, center_y + 20),
+                cv2.FONT_HERSHEY_DUPLEX, 1.5, (255, 255, 255), 2)
+    if player_scores:
+        text = "   ".join(f"P{i + 1}: {s}" for i, s in enumerate(player_scores))
+        text_w = cv2.getTextSize(text, cv2.FONT_HERSHEY_DUPLEX, 1, 2)[0][0]
+        cv2.putText(frame, text, (center_x - text_w // 2, center_y + 70), cv2.FONT_HERSHEY_DUPLEX, 1,
+                    (200, 200, 200), 2)
+    # 绘制重启/退出提示
+    cv2.putText(frame, "[R] Restart", (center_x - 120, center_y + 120), cv2.FONT_HERSHEY_DUPLEX, 1,
+                (0, 255, 0), 2)
+    cv2.putText(frame, "[Q] Quit", (center_x - 120, center_y + 170), cv2.FONT_HERSHEY_DUPLEX, 1,
+                (0, 100, 255), 2)
+    return frame
+
+
+def draw_countdown(frame, remaining_seconds):
+    """绘制开局倒计时界面"""
+    # 绘制半透明黑色覆盖层
+    overlay = frame.copy()
+    cv2.rectangle(overlay, (0, 0), (WIDTH, HEIGHT), (0, 0, 0), -1)
+    frame = cv2.addWeighted(overlay, 0.7, frame, 0.3, 0)
+
+    # 显示倒计时数字和准备提示
+    if remaining_seconds > 0:
+        cv2.putText(frame, str(remaining_seconds),
+                    (WIDTH // 2 - 50, HEIGHT // 2 + 80),
+                    cv2.FONT_HERSHEY_TRIPLEX, 5, (0, 255, 0), 8)
+        cv2.putText(frame, "GET READY!",
+                    (WIDTH // 2 - 150, HEIGHT // 2 - 50),
+                    cv2.FONT_HERSHEY_DUPLEX, 2, (0, 255, 255), 3)
+    return frame
+
+
+def draw_paused(frame):
+    """绘制暂停界面"""
+    # 绘制半透明黑色覆盖层
+    overlay = frame.copy()
+    cv2.rectangle(overlay, (0, 0), (WIDTH, HEIGHT), (0, 0, 0), -1)
+    frame = cv2.addWeighted(overlay, 0.7, frame, 0.3, 0)
+
+    # 绘制暂停文字和恢复提示
+    cv2.putText(frame, "PAUSED",
+                (WIDTH // 2 - 120, HEIGHT // 2 - 30),
+                cv2.FONT_HERSHEY_TRIPLEX, 2.5, (0, 255, 255), 4)
+    cv2.putText(frame, "Press 'P' to Resume",
+                (WIDTH // 2 - 120, HEIGHT // 2 + 50),
+                cv2.FONT_HERSHEY_DUPLEX, 1, (0, 255, 0), 2)
+    return frame
+
+
+def draw_startup_status(frame, items, scale=1.0, glyphs=GLYPHS):
+    """
+    在左下角绘制启动状态指示
+    :param items: [(名称, 状态)]，状态为'ready'、'loading'或'failed'
+    """
+    s = scale
+    colors = {'ready': (0, 200, 0), 'loading': (0, 200, 255), 'failed': (0, 0, 255)}
+    y = HEIGHT - 30 - (len(items) - 1) * 28
+    for name, status in items:
+        cv2.circle(frame, (int(30 * s), int((y - 6) * s)), max(1, int(7 * s)), colors.get(status, (200, 200, 200)), -1)
+        glyphs.draw_text(frame, f"{name}: {status}", (int(46 * s), int(y * s)), cv2.FONT_HERSHEY_SIMPLEX, 0.6 * s,
+                         (220, 220, 220), _thickness(1, s))
+        y += 28
+    return frame
+
+
+def draw_profiler_panel(frame, profiler, origin=(20, 100)):
+    """绘制性能分析面板：帧率与各阶段耗时（均值/p95，毫秒）"""
+    summary = profiler.summary()
+    stages = sorted(summary['stages'].items(), key=lambda item: -item[1]['mean'])
+    x, y = origin
+    line_h = 22
+    width, height = 300, line_h * (len(stages) + 2) + 10
+
+    # 半透明黑色底板（只混合面板区域）
+    roi = frame[y:y + height, x:x + width]
+    roi[:] = (roi * 0.35).astype(roi.dtype)
+
+    cv2.putText(frame, f"FPS {summary['fps']:.1f}  frame {summary['frame']['mean']:.1f} ms",
+                (x + 8, y + line_h), cv2.FONT_HERSHEY_SIMPLEX, 0.55, PALETTE['highlight'], 1)
+    cv2.putText(frame, "stage            avg    p95", (x + 8, y + 2 * line_h), cv2.FONT_HERSHEY_SIMPLEX, 0.5,
+                (200, 200, 200), 1)
+    for i, (name, stat) in enumerate(stages):
+        cv2.putText(frame, f"{name:<14}{stat['mean']:>6.2f} {stat['p95']:>6.2f}", (x + 8, y + (i + 3) * line_h),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, PALETTE['text'], 1)
+    return frame
@@ -1,6 +1,159 @@
+import math
 import cv2
 import numpy as np
 
+# 混合用的uint8临时缓冲区（只增不减，按ROI尺寸取视图复用，避免逐帧分配）
+_SCRATCH = [np.empty((0, 0, 3), dtype=np.uint8), np.empty((0, 0, 3), dtype=np.uint8)]
+# BGRA拆分的通道映射(源, 目标)：BGR -> 前景缓冲，alpha -> 三通道alpha缓冲的每个通道（目标通道按缓冲顺序连续编号）
+_SPLIT_BGRA = [0, 0, 1, 1, 2, 2, 3, 3, 3, 4, 3, 5]
+
+
+def _scratch(h, w):
+    """获取指定尺寸的复用缓冲区视图：(三通道alpha缓冲, 前景乘积缓冲)"""
+    buf_h, buf_w = _SCRATCH[0].shape[:2]
+    if h > buf_h or w > buf_w:
+        shape = (max(h, buf_h), max(w, buf_w), 3)
+        _SCRATCH[0] = np.empty(shape, dtype=np.uint8)
+        _SCRATCH[1] = np.empty(shape, dtype=np.uint8)
+    return _SCRATCH[0][:h, :w], _SCRATCH[1][:h, :w]
+
+
+def clip_rect(w_bg, h_bg, x, y, w_fg, h_fg):
+    """
+    计算精灵矩形与背景的相交区域
+    :param w_bg: 背景宽度
+    :param h_bg: 背景高度
+    :param x: 精灵左上角x坐标
+    :param y: 精灵左上角y坐标
+    :param w_fg: 精灵宽度
+    :param h_fg: 精灵高度
+    :return: (背景切片, 精灵切片)，完全不可见时返回None
+    """
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + w_fg, w_bg), min(y + h_fg, h_bg)
+    if x0 >= x1 or y0 >= y1:
+        return None
+    return ((slice(y0, y1), slice(x0, x1)),
+            (slice(y0 - y, y1 - y), slice(x0 - x, x1 - x)))
+
+
+def composite_bgra(roi, overlay):
+    """
+    将BGRA图像以定点整数运算混合到ROI（三通道一次处理，原地写入）
+    结果与浮点逐通道混合相差不超过1
+    :param roi: 背景中的目标区域（uint8，3通道，与overlay同尺寸）
+    :param overlay: 叠加图像（uint8，4通道）
+    """
+    h, w = roi.shape[:2]
+    alpha3, fg = _scratch(h, w)
+    # 一次拆出BGR与三通道alpha到复用缓冲（按通道切片得到的是非连续视图，直接参与运算会被隐式复制）
+    cv2.mixChannels([overlay], [fg, alpha3], _SPLIT_BGRA)
+    # 前景*alpha/255
+    cv2.multiply(fg, alpha3, dst=fg, scale=1 / 255)
+    # 背景*(255-alpha)/255 + 前景
+    cv2.bitwise_not(alpha3, dst=alpha3)
+    cv2.multiply(roi, alpha3, dst=roi, scale=1 / 255)
+    cv2.add(roi, fg, dst=roi)
+
+
+def composite_premultiplied(roi, premul, alpha_inv):
+    """
+    将预乘alpha的精灵混合到ROI（原地写入）
+    :param roi: 背景中的目标区域（uint8，3通道，与精灵同尺寸）
+    :param premul: 预乘alpha后的BGR图像
+    :param alpha_inv: 三通道反向alpha
+    """
+    cv2.multiply(roi, alpha_inv, dst=roi, scale=1 / 255)
+    cv2.add(roi, premul, dst=roi)
+
+
+def letterbox(image, size, interpolation=cv2.INTER_LINEAR, dst=None):
+    """
+    保持宽高比把图像缩放到size以内并居中，其余部分填充黑边（宽高比相同时等同于直接缩放）
+    :param size: 输出尺寸(宽, 高)
+    :param dst: 输出缓冲（可选，尺寸须与size一致）
+    :return: 缩放后的图像
+    """
+    w, h = size
+    ih, iw = image.shape[:2]
+    fit = min(w / iw, h / ih)
+    fw, fh = min(w, max(1, round(iw * fit))), min(h, max(1, round(ih * fit)))
+    # 取整造成的1像素差异直接缩放，不留黑线
+    if w - fw <= 1 and h - fh <= 1:
+        return cv2.resize(image, (w, h), dst=dst, interpolation=interpolation)
+    if dst is None:
+        dst = np.zeros((h, w) + image.shape[2:], dtype=image.dtype)
+    else:
+        dst[:] = 0
+    x, y = (w - fw) // 2, (h - fh) // 2
+    dst[y:y + fh, x:x + fw] = cv2.resize(image, (fw, fh), interpolation=interpolation)
+    return dst
+
+
+def rotate_image(image, angle):
+    """
+    旋转图像（旋转后扩展画布，避免图像被裁剪）
+    :param image: 待旋转图像（numpy数组）
+    :param angle: 旋转角度
+    :return: 旋转后的图像
+    """
+    h, w = image.shape[:2]
+    # 计算旋转矩阵（以图像中心为旋转点，旋转angle度，缩放比例1.0）
+    M = cv2.getRotationMatrix2D((w // 2, h // 2), angle, 1.0)
+    # 提取旋转矩阵中的余弦和正弦值，用于计算旋转后的图像尺寸
+    cos = np.abs(M[0, 0])
+    sin = np.abs(M[0, 1])
+    # 计算旋转后图像的新宽高（避免旋转后图像被裁剪）
+    new_w = int((h * sin) + (w * cos))
+    new_h = int((h * cos) + (w * sin))
+    # 调整旋转矩阵，使旋转后的图像居中
+    M[0, 2] += (new_w / 2) - w / 2
+    M[1, 2] += (new_h / 2) - h / 2
+    # 执行旋转变换
+    return cv2.warpAffine(image, M, (new_w, new_h))
+
+
+def premultiply(image):
+    """
+    将BGRA图像预乘alpha，供快速混合使用
+    :param image: 带alpha通道的4通道图像
+    :return: (预乘后的BGR图像, 三通道反向alpha)，均为uint8
+    """
+    alpha = image[:, :, 3]
+    alpha3 = cv2.merge((alpha, alpha, alpha))
+    # 前景预乘alpha（四舍五入到uint8）
+    premul = cv2.multiply(np.ascontiguousarray(image[:, :, :3]), alpha3, scale=1 / 255)
+    # 反向alpha（背景的权重）
+    alpha_inv = cv2.bitwise_not(alpha3)
+    return premul, alpha_inv
+
+
+def blit_premultiplied(background, premul, alpha_inv, x, y):
+    """
+    将预乘alpha的精灵叠加到背景图像上（无需旋转和归一化）
+    :param background: 背景图像（numpy数组）
+    :param premul: 预乘alpha后的BGR图像
+    :param alpha_inv: 三通道反向alpha
+    :param x: 精灵中心的x坐标
+    :param y: 精灵中心的y坐标
+    :return: 叠加后的背景图像
+    """
+    h_bg, w_bg = background.shape[:2]
+    h_fg, w_fg = premul.shape[:2]
+
+    # 计算精灵在背景上的左上角坐标（以传入的x,y为中心，向下取整保证越界时位置连续）
+    x = math.floor(x - w_fg / 2)
+    y = math.floor(y - h_fg / 2)
+
+    # 只混合与背景相交的可见部分，完全不可见时直接返回原背景
+    clip = clip_rect(w_bg, h_bg, x, y, w_fg, h_fg)
+    if clip is None:
+        return background
+    bg_slice, fg_slice = clip
+
+    composite_premultiplied(background[bg_slice], premul[fg_slice], alpha_inv[fg_slice])
+    return background
+
 
 def overlay_transparent(background, overlay, x, y, angle=0):
     """
@@ -16,50 +169,36 @@ def overlay_transparent(background, overlay, x, y, angle=0):
     h_bg, w_bg = background.shape[:2]
     h_fg, w_fg = overlay.shape[:2]
 
+    # 旋转后的外接尺寸不超过对角线长度，完全不可见时跳过旋转
+    half_diag = (h_fg * h_fg + w_fg * w_fg) ** 0.5 / 2
+    if x + half_diag < 0 or y + half_diag < 0 or x - half_diag > w_bg or y - half_diag > h_bg:
+        return background
+
     # 如果需要旋转，先对叠加图像进行旋转变换
     if angle != 0:
-        # 计算旋转矩阵（以图像中心为旋转点，旋转angle度，缩放比例1.0）
-        M = cv2.getRotationMatrix2D((w_fg // 2, h_fg // 2), angle, 1.0)
-        # 提取旋转矩阵中的余弦和正弦值，用于计算旋转后的图像尺寸
-        cos = np.abs(M[0, 0])
-        sin = np.abs(M[0, 1])
-        # 计算旋转后图像的新宽高（避免旋转后图像被裁剪）
-        new_w = int((h_fg * sin) + (w_fg * cos))
-        new_h = int((h_fg * cos) + (w_fg * sin))
-        # 调整旋转矩阵，使旋转后的图像居中
-        M[0, 2] += (new_w / 2) - w_fg / 2
-        M[1, 2] += (new_h / 2) - h_fg / 2
-        # 执行旋转变换
-        overlay = cv2.warpAffine(overlay, M, (new_w, new_h))
+        overlay = rotate_image(overlay, angle)
         # 更新旋转后叠加图像的宽高
         h_fg, w_fg = overlay.shape[:2]
 
-    # 计算叠加图像在背景上的左上角坐标（以传入的x,y为中心）
-    x = int(x - w_fg / 2)
-    y = int(y - h_fg / 2)
+    # 计算叠加图像在背景上的左上角坐标（以传入的x,y为中心，向下取整保证越界时位置连续）
+    x = math.floor(x - w_fg / 2)
+    y = math.floor(y - h_fg / 2)
 
-    # 检查叠加图像是否超出背景范围，超出则直接返回原背景
-    if x < 0 or y < 0 or x + w_fg > w_bg or y + h_fg > h_bg:
+    # 只处理与背景相交的可见部分，完全不可见时直接返回原背景
+    clip = clip_rect(w_bg, h_bg, x, y, w_fg, h_fg)
+    if clip is None:
         return background
+    bg_slice, fg_slice = clip
 
     # 提取背景中对应叠加区域的ROI
-    roi = background[y:y + h_fg, x:x + w_fg]
+    roi = background[bg_slice]
+    overlay = overlay[fg_slice]
 
-    # 处理带alpha通道的叠加逻辑
+    # 处理带alpha通道的叠加逻辑（定点整数混合，原地写入ROI）
     if overlay.shape[2] == 4:
-        # 提取alpha通道并归一化到0-1范围（用于透明度混合）
-        alpha = overlay[:, :, 3] / 255.0
-        # 提取叠加图像的RGB通道
-        overlay_rgb = overlay[:, :, :3]
-        # 计算反向alpha（背景的权重）
-        alpha_inv = 1.0 - alpha
-        # 按通道进行透明度混合：前景*alpha + 背景*alpha_inv
-        for c in range(3):
-            roi[:, :, c] = (alpha * overlay_rgb[:, :, c] + alpha_inv * roi[:, :, c])
+        composite_bgra(roi, overlay)
     else:
         # 无alpha通道时直接覆盖
         roi[:] = overlay
 
-    # 将混合后的ROI放回背景图像
-    background[y:y + h_fg, x:x + w_fg] = roi
     return background